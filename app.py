@@ -1,12 +1,22 @@
-import streamlit as st
-import pandas as pd
-import numpy as np
-from sklearn.preprocessing import StandardScaler
-from kmodes.kprototypes import KPrototypes
-from fpdf import FPDF
-import matplotlib.pyplot as plt
-import seaborn as sns
 import io
+import os
+import tempfile
+from contextlib import contextmanager
+
+import numpy as np
+import pandas as pd
+import streamlit as st
+
+# Hanya modul ringan yang diimpor di sini. Mesin klasterisasi (scikit-learn), PDF (fpdf) dan render grafik
+# (matplotlib/seaborn) diimpor di dalam fungsi saat menunya pertama kali dipakai, lalu tetap tersimpan di
+# sys.modules untuk rerun dan sesi berikutnya. Halaman login dan dasbor tidak memuatnya.
+from klasterisasi.diagnostik import RunLog, StageTimer, stage_rows
+from klasterisasi.grafik import PROFILE_LABELS, ChartCache, profile_values
+from klasterisasi.indeks import StudentIndex
+from klasterisasi.profil import build_cluster_profile
+from klasterisasi.publikasi import ResultStore
+from klasterisasi.skema import ALL_FEATURES_FOR_CLUSTERING, CATEGORICAL_COLS, ID_COLS, NUMERIC_COLS, compact_students
+from klasterisasi.unggah import SUPPORTED_TYPES, read_students
 
 # --- KONSTANTA GLOBAL ---
 PRIMARY_COLOR = "#2C2F7F"
@@ -19,11 +29,45 @@ ACTIVE_BUTTON_BG_COLOR = "#3F51B5"
 ACTIVE_BUTTON_TEXT_COLOR = "#FFFFFF"
 ACTIVE_BUTTON_BORDER_COLOR = "#FFD700"
 
-ID_COLS = ["No", "Nama", "JK", "Kelas"]
-NUMERIC_COLS = ["Rata Rata Nilai Akademik", "Kehadiran"]
-CATEGORICAL_COLS = ["Ekstrakurikuler Komputer", "Ekstrakurikuler Pertanian",
-                    "Ekstrakurikuler Menjahit", "Ekstrakurikuler Pramuka"]
-ALL_FEATURES_FOR_CLUSTERING = NUMERIC_COLS + CATEGORICAL_COLS
+# Restart K-Prototypes: backend "serial", "thread" atau "process"; N_JOBS=-1 memakai semua CPU.
+KPROTO_BACKEND = os.environ.get("KPROTO_BACKEND", "process")
+KPROTO_N_JOBS = int(os.environ.get("KPROTO_N_JOBS", "-1"))
+# Toleransi konvergensi dan percepatan batas jarak, sama dengan opsi --tol/--move-tol CLI (0 = konvergen penuh).
+KPROTO_TOL = float(os.environ.get("KPROTO_TOL", "0"))
+KPROTO_MOVE_TOL = float(os.environ.get("KPROTO_MOVE_TOL", "0"))
+KPROTO_ACCELERATE = os.environ.get("KPROTO_ACCELERATE", "1") != "0"
+K_MIN, K_MAX = 2, 6
+
+# Pembuatan PDF profil massal: backend dan jumlah worker seperti restart K-Prototypes.
+PDF_BACKEND = os.environ.get("PDF_BACKEND", "process")
+PDF_N_JOBS = int(os.environ.get("PDF_N_JOBS", "-1"))
+
+# Cache model hasil fit di disk (dipakai bersama oleh semua sesi).
+MODEL_CACHE_DIR = os.environ.get("KPROTO_CACHE_DIR", os.path.join(os.path.dirname(os.path.abspath(__file__)), ".cache", "model"))
+MODEL_CACHE_MAX_MB = int(os.environ.get("KPROTO_CACHE_MAX_MB", "512"))
+# Cache kolom hasil pembacaan file unggahan, dialamatkan dengan hash isi file.
+TABLE_CACHE_DIR = os.environ.get("KPROTO_TABLE_CACHE_DIR", os.path.join(os.path.dirname(os.path.abspath(__file__)), ".cache", "tabel"))
+TABLE_CACHE_MAX_MB = int(os.environ.get("KPROTO_TABLE_CACHE_MAX_MB", "256"))
+# Hasil klasterisasi yang dipublikasikan untuk Dasbor Kepala Sekolah (dibaca semua sesi lewat memory-map).
+RESULT_STORE_DIR = os.environ.get("KPROTO_RESULT_DIR", os.path.join(os.path.dirname(os.path.abspath(__file__)), ".cache", "hasil"))
+RESULT_STORE_KEEP = int(os.environ.get("KPROTO_RESULT_KEEP", "3"))
+# Grafik profil klaster: "png" (matplotlib, dirender sekali lalu di-cache) atau "native" (st.bar_chart).
+CHART_MODE = os.environ.get("KPROTO_CHART_MODE", "png")
+CHART_CACHE_MAX_MB = int(os.environ.get("KPROTO_CHART_CACHE_MAX_MB", "32"))
+# Log diagnostik per tahap (menu "Diagnostik"); KPROTO_DIAG_MEMORY=1 mengukur puncak alokasi dengan tracemalloc.
+DIAG_DIR = os.environ.get("KPROTO_DIAG_DIR", os.path.join(os.path.dirname(os.path.abspath(__file__)), ".cache", "diagnostik"))
+DIAG_KEEP = int(os.environ.get("KPROTO_DIAG_KEEP", "50"))
+DIAG_TRACE_MEMORY = os.environ.get("KPROTO_DIAG_MEMORY", "0") == "1"
+# Nama sekolah pada header; hasil sekolah lain dari menu "Antrian Sekolah" dipilih di dasbor Kepala Sekolah.
+SCHOOL_NAME = os.environ.get("KPROTO_NAMA_SEKOLAH", "MADRASAH ALIYAH AL-HIKMAH")
+# Antrian klasterisasi banyak sekolah: paling banyak KPROTO_SCHED_WORKERS fit berjalan bersamaan di proses worker.
+SCHED_DIR = os.environ.get("KPROTO_SCHED_DIR", os.path.join(os.path.dirname(os.path.abspath(__file__)), ".cache", "sekolah"))
+SCHED_WORKERS = int(os.environ.get("KPROTO_SCHED_WORKERS", "2"))
+# Klasterisasi "Satu nilai K" berjalan di thread latar belakang; paling banyak KPROTO_FIT_WORKERS fit bersamaan
+# untuk semua sesi.
+FIT_WORKERS = int(os.environ.get("KPROTO_FIT_WORKERS", "2"))
+# Jumlah publikasi (semua sekolah) yang disimpan di memori untuk dasbor.
+RESULT_CACHE_ENTRIES = int(os.environ.get("KPROTO_RESULT_CACHE_ENTRIES", "4"))
 
 # --- CUSTOM CSS & HEADER ---
 custom_css = f"""
@@ -242,7 +286,7 @@ custom_css = f"""
 header_html = f"""
 <div class="custom-header">
     <div><h1>PENGELOMPOKAN SISWA</h1></div>
-    <div class="kanan">MADRASAH ALIYAH AL-HIKMAH</div>
+    <div class="kanan">{SCHOOL_NAME}</div>
 </div>
 """
 
@@ -253,142 +297,339 @@ st.markdown(header_html, unsafe_allow_html=True)
 # --- FUNGSI PEMBANTU ---
 
 def generate_pdf_profil_siswa(nama, data_siswa_dict, klaster, cluster_desc_map):
-    pdf = FPDF()
-    pdf.add_page()
-    pdf.set_font("Arial", "B", 16)
-    pdf.set_text_color(44, 47, 127)
-    pdf.cell(0, 10, "PROFIL SISWA - HASIL KLASTERISASI", ln=True, align='C')
-    pdf.ln(10)
-
-    pdf.set_font("Arial", "", 10)
-    pdf.set_text_color(0, 0, 0)
-    keterangan_umum = (
-        "Laporan ini menyajikan profil detail siswa berdasarkan hasil pengelompokan "
-        "menggunakan Algoritma K-Prototype. Klasterisasi dilakukan berdasarkan "
-        "nilai akademik, kehadiran, dan partisipasi ekstrakurikuler siswa. "
-        "Informasi klaster ini dapat digunakan untuk memahami kebutuhan siswa dan "
-        "merancang strategi pembinaan yang sesuai."
-    )
-    pdf.multi_cell(0, 5, keterangan_umum, align='J')
-    pdf.ln(5)
-
-    pdf.set_font("Arial", "B", 12)
-    pdf.cell(0, 8, f"Nama Siswa: {nama}", ln=True)
-    pdf.cell(0, 8, f"Klaster Hasil: {klaster}", ln=True)
-    pdf.ln(3)
-
-    klaster_desc = cluster_desc_map.get(klaster, "Deskripsi klaster tidak tersedia.")
-    pdf.set_font("Arial", "I", 10)
-    pdf.set_text_color(80, 80, 80)
-    pdf.multi_cell(0, 5, f"Karakteristik Klaster {klaster}: {klaster_desc}", align='J')
-    pdf.ln(5)
-
-    pdf.set_font("Arial", "", 10)
-    pdf.set_text_color(0, 0, 0)
-    ekskul_diikuti = []
-    for col in CATEGORICAL_COLS:
-        val = data_siswa_dict.get(col)
-        if val is not None and (val == 1 or str(val).strip() == '1'):
-            ekskul_diikuti.append(col.replace("Ekstrakurikuler ", ""))
-
-    kehadiran_val = data_siswa_dict.get('Kehadiran', 0)
-    nilai_akademik_val = data_siswa_dict.get('Rata Rata Nilai Akademik', 0)
-
-    display_data = {
-        "Nomor Induk": data_siswa_dict.get("No", "-"),
-        "Jenis Kelamin": data_siswa_dict.get("JK", "-"),
-        "Kelas": data_siswa_dict.get("Kelas", "-"),
-        "Rata-rata Nilai Akademik": f"{nilai_akademik_val:.2f}",
-        "Persentase Kehadiran": f"{kehadiran_val:.2%}",
-        "Ekstrakurikuler yang Diikuti": ", ".join(ekskul_diikuti) if ekskul_diikuti else "Tidak mengikuti ekstrakurikuler",
-    }
-    for key, val in display_data.items():
-        pdf.cell(0, 7, f"{key}: {val}", ln=True)
-    
+    from klasterisasi.laporan import generate_pdf_profil_siswa as render_pdf_profil_siswa
     try:
-        # Menghasilkan PDF sebagai byte string
-        pdf_output = pdf.output(dest='S').encode('latin-1')
-        return bytes(pdf_output)
+        return render_pdf_profil_siswa(nama, data_siswa_dict, klaster, cluster_desc_map)
     except Exception as e:
         st.error(f"Error saat mengonversi PDF: {e}. Coba pastikan tidak ada karakter aneh pada data.")
         return None
 
 
-def preprocess_data(df):
-    df_processed = df.copy()
-    df_processed.columns = [col.strip() for col in df_processed.columns]
-    
-    missing_cols = [col for col in ALL_FEATURES_FOR_CLUSTERING if col not in df_processed.columns]
-    if missing_cols:
-        st.error(f"Kolom-kolom berikut tidak ditemukan: {', '.join(missing_cols)}. Periksa file Excel Anda.")
-        return None, None
-    
-    # Memilih hanya kolom yang akan digunakan untuk clustering
-    df_clean_for_clustering = df_processed[ALL_FEATURES_FOR_CLUSTERING].copy()
+def show_bulk_pdf_download(df_display, indeks, cluster_desc_map, key_prefix):
+    with st.expander("📦 Unduh Semua Profil (ZIP)"):
+        filter_by = st.radio("Saring berdasarkan", ["Semua Siswa", "Kelas", "Klaster"], horizontal=True,
+                             key=f"{key_prefix}_zip_filter")
+        df_pilih = df_display
+        if filter_by != "Semua Siswa":
+            groups = indeks.by_class if filter_by == "Kelas" else indeks.by_cluster
+            pilihan = st.multiselect(f"Pilih {filter_by}", list(groups), key=f"{key_prefix}_zip_pilihan_{filter_by}")
+            df_pilih = df_display.iloc[indeks.positions_for(filter_by, pilihan)]
+        st.write(f"{len(df_pilih)} siswa terpilih.")
 
-    for col in CATEGORICAL_COLS:
-        df_clean_for_clustering[col] = df_clean_for_clustering[col].fillna(0).astype(str)
+        if st.button("Buat ZIP Profil", key=f"{key_prefix}_zip_buat", disabled=df_pilih.empty):
+            from klasterisasi.laporan import iter_records, write_profil_zip
+            progress_bar = st.progress(0.0, text=f"Membuat {len(df_pilih)} PDF profil...")
+            def update_pdf_progress(selesai, total):
+                progress_bar.progress(selesai / total, text=f"{selesai}/{total} PDF selesai")
+            # ZIP ditulis ke file sementara di disk dari baris yang diambil per chunk, bukan dikumpulkan di memori.
+            with tempfile.TemporaryFile() as zip_file:
+                try:
+                    with diagnostic_stage("pdf", rows=len(df_pilih)):
+                        write_profil_zip(zip_file, iter_records(df_pilih), cluster_desc_map, backend=PDF_BACKEND,
+                                         n_jobs=PDF_N_JOBS, progress=update_pdf_progress, total=len(df_pilih))
+                except Exception as e:
+                    progress_bar.empty()
+                    st.error(f"Error saat membuat PDF: {e}. Coba pastikan tidak ada karakter aneh pada data.")
+                else:
+                    progress_bar.empty()
+                    zip_file.seek(0)
+                    # Handle file (raw) diberikan langsung; Streamlit membacanya sekali saat tombol dibuat.
+                    st.download_button(
+                        label="📥 Unduh ZIP Profil",
+                        data=zip_file.raw,
+                        file_name="Profil_Siswa.zip",
+                        mime="application/zip",
+                        key=f"{key_prefix}_zip_unduh",
+                        on_click="ignore"
+                    )
 
-    for col in NUMERIC_COLS:
-        if df_clean_for_clustering[col].isnull().any():
-            mean_val = df_clean_for_clustering[col].mean()
-            df_clean_for_clustering[col] = df_clean_for_clustering[col].fillna(mean_val)
-            st.warning(f"Nilai kosong pada kolom '{col}' diisi dengan rata-rata: {mean_val:.2f}.")
 
-    scaler = StandardScaler()
-    df_clean_for_clustering[NUMERIC_COLS] = scaler.fit_transform(df_clean_for_clustering[NUMERIC_COLS])
-    
+def preprocess_data(df):
+    from klasterisasi.pipeline import preprocess
+    try:
+        df_clean_for_clustering, scaler, warnings = preprocess(df)
+    except ValueError as e:
+        st.error(f"{e} Periksa file Excel Anda.")
+        return None, None
+    for pesan in warnings:
+        st.warning(pesan)
     return df_clean_for_clustering, scaler
 
-def run_kprototypes_clustering(df_preprocessed, n_clusters):
-    X_data = df_preprocessed[ALL_FEATURES_FOR_CLUSTERING]
-    X = X_data.to_numpy()
-    categorical_feature_indices = [X_data.columns.get_loc(c) for c in CATEGORICAL_COLS]
-    
+def run_k_sweep(df_preprocessed, k_values, progress=None):
+    from klasterisasi.pipeline import KPROTO_N_INIT, KPROTO_RANDOM_STATE, encode_features
+    from klasterisasi.sweep import sweep_k
     try:
-        kproto = KPrototypes(n_clusters=n_clusters, init='Huang', n_init=10, verbose=0, random_state=42, n_jobs=1) # n_jobs=1 lebih aman untuk deployment
-        clusters = kproto.fit_predict(X, categorical=categorical_feature_indices)
+        Xnum, Xcat, enc_map, categorical_feature_indices = encode_features(df_preprocessed)
+        rows, models = sweep_k(Xnum, Xcat, enc_map, k_values, init='Huang', n_init=KPROTO_N_INIT, random_state=KPROTO_RANDOM_STATE,
+                               backend=KPROTO_BACKEND, n_jobs=KPROTO_N_JOBS, progress=progress)
     except Exception as e:
-        st.error(f"Terjadi kesalahan saat menjalankan K-Prototypes: {e}. Pastikan data cukup bervariasi.")
+        st.error(f"Terjadi kesalahan saat menjalankan sweep K: {e}. Pastikan data cukup bervariasi.")
         return None, None, None
-        
-    df_clustered = df_preprocessed.copy()
-    df_clustered["Klaster"] = clusters
-    return df_clustered, kproto, categorical_feature_indices
-
-def generate_cluster_descriptions(df_clustered_normalized, n_clusters):
-    cluster_characteristics_map = {}
-    for i in range(n_clusters):
-        cluster_data = df_clustered_normalized[df_clustered_normalized["Klaster"] == i]
-        if cluster_data.empty:
-            continue
-
-        avg_scaled_values = cluster_data[NUMERIC_COLS].mean()
-        mode_values = cluster_data[CATEGORICAL_COLS].mode().iloc[0]
-        
-        desc = ""
-        # Deskripsi Nilai Akademik
-        if avg_scaled_values["Rata Rata Nilai Akademik"] > 0.75: desc += "Nilai akademik sangat tinggi. "
-        elif avg_scaled_values["Rata Rata Nilai Akademik"] > 0.25: desc += "Nilai akademik di atas rata-rata. "
-        elif avg_scaled_values["Rata Rata Nilai Akademik"] < -0.75: desc += "Nilai akademik sangat rendah. "
-        elif avg_scaled_values["Rata Rata Nilai Akademik"] < -0.25: desc += "Nilai akademik di bawah rata-rata. "
-        else: desc += "Nilai akademik rata-rata. "
-
-        # Deskripsi Kehadiran
-        if avg_scaled_values["Kehadiran"] > 0.75: desc += "Kehadiran sangat tinggi. "
-        elif avg_scaled_values["Kehadiran"] > 0.25: desc += "Kehadiran di atas rata-rata. "
-        elif avg_scaled_values["Kehadiran"] < -0.75: desc += "Kehadiran sangat rendah. "
-        elif avg_scaled_values["Kehadiran"] < -0.25: desc += "Kehadiran di bawah rata-rata. "
-        else: desc += "Kehadiran rata-rata. "
-        
-        ekskul_aktif_modes = [col for col in CATEGORICAL_COLS if mode_values[col] == '1']
-        if ekskul_aktif_modes:
-            desc += f"Aktif di ekstrakurikuler: {', '.join([c.replace('Ekstrakurikuler ', '') for c in ekskul_aktif_modes])}."
+    return pd.DataFrame(rows), models, categorical_feature_indices
+
+def run_incremental_clustering(previous, df_new):
+    from klasterisasi.inkremental import recluster_incremental
+    try:
+        hasil = recluster_incremental(previous, df_new)
+    except ValueError as e:
+        st.error(f"{e} Gunakan mode 'Satu nilai K' untuk klasterisasi penuh.")
+        return None
+    for pesan in hasil["warnings"]:
+        st.warning(pesan)
+    return hasil
+
+def run_stability_analysis(n_boot, sample_frac, progress=None):
+    """Analisis stabilitas partisi sesi ini; hasilnya berbentuk lampiran publikasi (meta, array)."""
+    import time
+    from klasterisasi.pipeline import KPROTO_RANDOM_STATE, encode_features
+    from klasterisasi.stabilitas import cluster_stability, stability_table
+    try:
+        Xnum, Xcat, enc_map, _ = encode_features(st.session_state.df_preprocessed_for_clustering)
+        hasil = cluster_stability(Xnum, Xcat, enc_map, st.session_state.df_clustered["Klaster"].to_numpy(),
+                                  st.session_state.n_clusters, st.session_state.kproto_model.gamma, n_boot=n_boot,
+                                  sample_frac=sample_frac, random_state=KPROTO_RANDOM_STATE, backend=KPROTO_BACKEND,
+                                  n_jobs=KPROTO_N_JOBS, progress=progress)
+    except ValueError as e:
+        st.error(f"Analisis stabilitas gagal: {e}")
+        return None
+    meta = {"waktu": time.strftime("%Y-%m-%d %H:%M:%S"), "n_boot": hasil["n_boot"], "n_gagal": hasil["n_gagal"],
+            "metode": hasil["metode"], "proporsi_sampel": hasil["proporsi_sampel"], "tabel": stability_table(hasil)}
+    return meta, {"ko_penugasan": hasil["ko_penugasan"]}
+
+def show_cluster_stability(stabilitas, df_clustered):
+    """Tabel stabilitas per klaster dan daftar siswa yang paling ambigu."""
+    meta, arrays = stabilitas
+    st.subheader("Stabilitas Klaster")
+    st.caption(f"{meta['n_boot']} {meta['metode']} ({meta['proporsi_sampel']:.0%} siswa) di-fit ulang dengan K yang "
+               f"sama, dihitung {meta['waktu']}." + (f" {meta['n_gagal']} resampling gagal dan dilewati."
+                                                     if meta["n_gagal"] else ""))
+    tabel = pd.DataFrame(meta["tabel"])
+    tabel.insert(1, "Jumlah Siswa", df_clustered["Klaster"].value_counts().reindex(tabel["Klaster"], fill_value=0).values)
+    tabel["Siswa Ambigu"] = tabel["Siswa Ambigu"] * 100
+    st.dataframe(tabel, use_container_width=True, hide_index=True, column_config={
+        "Jaccard Rata-rata": st.column_config.NumberColumn(format="%.2f"),
+        "Jaccard Minimum": st.column_config.NumberColumn(format="%.2f"),
+        "Siswa Ambigu": st.column_config.NumberColumn("Siswa Ambigu (%)", format="%.1f"),
+    })
+    st.caption("Jaccard membandingkan setiap klaster dengan klaster paling mirip di setiap resampling: ≥ 0,85 sangat "
+               "stabil, 0,75–0,85 stabil, 0,6–0,75 lemah, < 0,6 kemungkinan bukan kelompok yang nyata. Siswa ambigu "
+               "tetap satu klaster dengan kurang dari separuh teman seklasternya.")
+    ko_penugasan = arrays["ko_penugasan"]
+    if len(ko_penugasan) != len(df_clustered):
+        return
+    with st.expander("Siswa paling ambigu"):
+        n_tampil = min(50, len(ko_penugasan))
+        # Hanya n_tampil siswa terendah yang diurutkan.
+        terendah = np.argpartition(ko_penugasan, n_tampil - 1)[:n_tampil]
+        terendah = terendah[np.argsort(ko_penugasan[terendah], kind="stable")]
+        kolom = [col for col in ID_COLS + ["Klaster"] if col in df_clustered.columns]
+        df_ambigu = df_clustered.iloc[terendah][kolom].assign(**{"Frekuensi Ko-penugasan": ko_penugasan[terendah]})
+        st.dataframe(df_ambigu, use_container_width=True, hide_index=True, column_config={
+            "Frekuensi Ko-penugasan": st.column_config.ProgressColumn(min_value=0., max_value=1., format="%.2f"),
+        })
+
+def stability_caption(stabilitas, klaster):
+    if stabilitas is None:
+        return
+    baris = next((row for row in stabilitas[0]["tabel"] if row["Klaster"] == klaster), None)
+    if baris is not None:
+        st.caption(f"Stabilitas: **{baris['Status']}** (Jaccard {baris['Jaccard Rata-rata']:.2f})")
+
+@st.cache_resource
+def get_model_cache():
+    from klasterisasi.cache import ModelCache
+    return ModelCache(MODEL_CACHE_DIR, max_bytes=MODEL_CACHE_MAX_MB * 1024 * 1024)
+
+@st.cache_resource
+def get_result_store(directory=RESULT_STORE_DIR):
+    return ResultStore(directory, keep=RESULT_STORE_KEEP)
+
+@st.cache_resource(max_entries=RESULT_CACHE_ENTRIES)
+def load_published_result(versi, directory=RESULT_STORE_DIR):
+    # Satu salinan per proses untuk semua sesi dasbor; profil dan indeks ikut dihitung sekali.
+    hasil = get_result_store(directory).load(versi)
+    hasil["cluster_profile"] = build_cluster_profile(hasil["df_normalized"], hasil["n_clusters"],
+                                                     NUMERIC_COLS, CATEGORICAL_COLS)
+    hasil["student_index"] = StudentIndex(hasil["df_clustered"])
+    return hasil
+
+@st.cache_resource
+def get_scheduler():
+    from klasterisasi.penjadwal import JobScheduler
+    return JobScheduler(SCHED_DIR, max_workers=SCHED_WORKERS, keep=RESULT_STORE_KEEP)
+
+@st.cache_resource
+def get_fit_runner():
+    from klasterisasi.latar import FitRunner
+    return FitRunner(max_workers=FIT_WORKERS)
+
+def start_background_clustering(df_preprocessed, k, cache_key):
+    from klasterisasi.pipeline import KPROTO_N_INIT, KPROTO_RANDOM_STATE
+    handle = get_fit_runner().submit(
+        df_preprocessed, k, n_init=KPROTO_N_INIT, random_state=KPROTO_RANDOM_STATE, backend=KPROTO_BACKEND,
+        n_jobs=KPROTO_N_JOBS, tol=KPROTO_TOL, move_tol=KPROTO_MOVE_TOL, accelerate=KPROTO_ACCELERATE,
+        timer=current_diagnostic_run(),
+        context={"cache_key": cache_key, "df_preprocessed": df_preprocessed})
+    # Id fit hanya disimpan di session state: hasil dan data fit tidak boleh dapat diambil sesi lain.
+    st.session_state.clustering_task = handle.id
+
+def collect_background_clustering():
+    """Pantau fit latar belakang sesi ini; simpan hasilnya begitu selesai."""
+    fit_id = st.session_state.get("clustering_task")
+    if fit_id is None:
+        return None
+    handle = get_fit_runner().get(fit_id)
+    if handle is None:
+        # Server dimulai ulang atau handle sudah dibuang.
+        st.session_state.clustering_task = None
+        return None
+    if not handle.done():
+        return handle
+
+    from klasterisasi.paralel import FitCancelled
+    st.session_state.clustering_task = None
+    get_fit_runner().discard(fit_id)
+    k = handle.n_clusters
+    try:
+        df_clustered_normalized, kproto_model, cat_indices = handle.result()
+    except FitCancelled:
+        st.session_state.clustering_notice = ("warning", f"Klasterisasi dengan {k} klaster dibatalkan.")
+    except Exception as e:
+        st.session_state.clustering_notice = (
+            "error", f"Terjadi kesalahan saat menjalankan K-Prototypes: {e}. Pastikan data cukup bervariasi.")
+    else:
+        if st.session_state.df_preprocessed_for_clustering is not handle.context["df_preprocessed"]:
+            st.session_state.clustering_notice = (
+                "warning", "Data diunggah atau diproses ulang selama klasterisasi berjalan; hasilnya diabaikan.")
         else:
-            desc += "Cenderung tidak aktif di ekstrakurikuler."
-            
-        cluster_characteristics_map[i] = desc
-    return cluster_characteristics_map
+            store_clustering_result(df_clustered_normalized, kproto_model, cat_indices, k,
+                                    cache_key=handle.context["cache_key"])
+            st.session_state.clustering_notice = (
+                "success", f"Klasterisasi dengan {k} klaster selesai! Data siap dilihat oleh Kepala Sekolah.")
+    if handle.timer is not None:
+        save_diagnostic_run(handle.timer)
+    return None
+
+def show_background_clustering(handle):
+    # Hanya bagian progres yang dimuat ulang berkala; skrip halaman tidak menunggu fit.
+    @st.fragment(run_every=1)
+    def render():
+        status = handle.status()
+        if handle.done():
+            st.rerun()
+        restart_text = f"Restart {status['restart_selesai']}/{status['restart_total']} selesai"
+        if status["cost_terbaik"] is not None:
+            restart_text += f" (cost terbaik: {status['cost_terbaik']:.2f})"
+        st.progress(status["restart_selesai"] / status["restart_total"], text=restart_text)
+        if status["status"] == "menunggu":
+            st.caption("Menunggu klasterisasi lain selesai...")
+        for run in status["berjalan"]:
+            st.caption(f"Restart {run['restart']}: iterasi {run['iterasi']}, cost {run['cost']:.2f}")
+        st.caption(f"Berjalan {status['detik']:.0f} detik.")
+        if status["membatalkan"]:
+            st.caption("Membatalkan setelah iterasi berjalan selesai...")
+        elif st.button("⛔ Batalkan Klasterisasi", key="batal_klasterisasi"):
+            handle.cancel()
+            st.rerun()
+
+    st.info(f"Klasterisasi dengan {handle.n_clusters} klaster berjalan di latar belakang. Menu lain tetap dapat "
+            "dibuka; hasilnya disimpan otomatis setelah selesai.")
+    render()
+
+@st.cache_resource
+def get_run_log():
+    return RunLog(DIAG_DIR, keep=DIAG_KEEP)
+
+def start_diagnostic_run(label):
+    st.session_state.diagnostic_run = StageTimer(label=label, source="app", trace_memory=DIAG_TRACE_MEMORY)
+
+def current_diagnostic_run():
+    # Satu run diagnostik per data yang diunggah.
+    if st.session_state.get("diagnostic_run") is None:
+        start_diagnostic_run("Dasbor Kepala Sekolah" if st.session_state.get("role") == "kepala_sekolah" else None)
+    return st.session_state.diagnostic_run
+
+def save_diagnostic_run(timer):
+    try:
+        get_run_log().save(timer.to_record())
+    except OSError:
+        # Diagnostik tidak boleh mengganggu alur kerja operator.
+        pass
+
+@contextmanager
+def diagnostic_stage(name, rows=None):
+    # Catatan run disimpan ulang setiap tahap selesai.
+    timer = current_diagnostic_run()
+    with timer.stage(name, rows=rows) as info:
+        yield info
+    save_diagnostic_run(timer)
+
+@st.cache_resource
+def get_chart_cache():
+    return ChartCache(max_bytes=CHART_CACHE_MAX_MB * 1024 * 1024)
+
+def show_cluster_profile_chart(profil, klaster, palette):
+    if CHART_MODE == "native":
+        st.caption(f"Profil Rata-rata Klaster {klaster}")
+        st.bar_chart(pd.Series(profile_values(profil, klaster), index=[l.replace("\n", " ") for l in PROFILE_LABELS]))
+        return
+    # Versi profil berganti setiap klasterisasi baru, jadi grafik lama tidak pernah tertampil lagi.
+    def render():
+        from klasterisasi.grafik import render_profile_png
+        with diagnostic_stage("grafik", rows=1):
+            return render_profile_png(profil, klaster, palette)
+    png = get_chart_cache().get_or_render((profil["versi"], klaster, palette), render)
+    st.image(png)
+
+def clustering_cache_key(df_preprocessed, n_clusters):
+    from klasterisasi.cache import ModelCache
+    from klasterisasi.pipeline import KPROTO_N_INIT, KPROTO_RANDOM_STATE, encode_features
+    Xnum, Xcat, enc_map, _ = encode_features(df_preprocessed)
+    # Toleransi dan percepatan ikut kunci: fit yang berhenti lebih awal tidak boleh dipakai untuk fit penuh.
+    return ModelCache.make_key(Xnum, Xcat, enc_map, n_clusters=n_clusters, init='Huang', n_init=KPROTO_N_INIT,
+                               random_state=KPROTO_RANDOM_STATE, gamma=None, tol=KPROTO_TOL,
+                               move_tol=KPROTO_MOVE_TOL, accelerate=KPROTO_ACCELERATE)
+
+def store_clustering_result(df_clustered_normalized, kproto_model, cat_indices, k,
+                            cluster_characteristics_map=None, cache_key=None, scaler_stats=None):
+    from klasterisasi.inkremental import ScalerStats
+    from klasterisasi.pipeline import generate_cluster_descriptions
+    # df_original sudah bertipe ringkas; assign tidak menyalin kolom yang lain.
+    df_final = st.session_state.df_original.assign(Klaster=df_clustered_normalized['Klaster'])
+
+    # Data ternormalisasi dan agregat per klaster dihitung sekali di sini, lalu dipakai ulang oleh deskripsi dan semua dasbor.
+    with diagnostic_stage("deskripsi", rows=len(df_clustered_normalized)):
+        profil = build_cluster_profile(df_clustered_normalized, k, NUMERIC_COLS, CATEGORICAL_COLS)
+        if cluster_characteristics_map is None:
+            cluster_characteristics_map = generate_cluster_descriptions(df_clustered_normalized, k, profil)
+    st.session_state.df_clustered = df_final
+    st.session_state.kproto_model = kproto_model
+    st.session_state.categorical_features_indices = cat_indices
+    st.session_state.n_clusters = k
+    st.session_state.cluster_characteristics_map = cluster_characteristics_map
+    st.session_state.cluster_profile = profil
+    # Indeks No/Klaster/Kelas -> posisi baris untuk halaman profil siswa.
+    st.session_state.student_index = StudentIndex(df_final)
+    # Statistik scaler yang dapat diperbarui per baris, untuk klasterisasi inkremental saat data diunggah ulang.
+    st.session_state.scaler_stats = scaler_stats if scaler_stats is not None else ScalerStats.from_frame(st.session_state.df_original)
+
+    # Analisis stabilitas milik partisi sebelumnya tidak berlaku lagi.
+    st.session_state.cluster_stability = None
+    try:
+        st.session_state.published_version = get_result_store().publish(df_final, df_clustered_normalized, k,
+                                                                         cluster_characteristics_map)
+    except OSError as e:
+        st.session_state.published_version = None
+        st.warning(f"Hasil klasterisasi tidak dapat dipublikasikan ke Dasbor Kepala Sekolah: {e}")
+
+    if cache_key is not None:
+        scaler = st.session_state.scaler
+        scaler_params = {"mean": scaler.mean_, "scale": scaler.scale_, "var": scaler.var_} if scaler is not None else None
+        try:
+            get_model_cache().save(cache_key, kproto_model, cluster_characteristics_map, scaler_params, cat_indices)
+        except OSError as e:
+            st.warning(f"Hasil klasterisasi tidak dapat disimpan ke cache: {e}")
+    return df_final
 
 # --- INISIALISASI SESSION STATE ---
 def init_session_state():
@@ -401,7 +642,18 @@ def init_session_state():
         'kproto_model': None,
         'categorical_features_indices': None,
         'n_clusters': 3,
+        'k_sweep': None,
+        'cluster_profile': None,
+        'student_index': None,
+        'scaler_stats': None,
+        'previous_clustering': None,
         'cluster_characteristics_map': {},
+        'diagnostic_run': None,
+        'diagnostic_upload': None,
+        'clustering_task': None,
+        'clustering_notice': None,
+        'published_version': None,
+        'cluster_stability': None,
         'current_menu': "Unggah Data",
         'kepsek_current_menu': "Lihat Hasil Klasterisasi"
     }
@@ -417,11 +669,13 @@ def show_operator_tu_page():
     
     menu_options = [
         "Unggah Data", "Praproses & Normalisasi Data", "Klasterisasi Data",
-        "Prediksi Siswa Baru", "Visualisasi & Profil Klaster", "Profil Siswa Individual"
+        "Prediksi Siswa Baru", "Visualisasi & Profil Klaster", "Profil Siswa Individual", "Antrian Sekolah",
+        "Diagnostik"
     ]
     icon_map = {
         "Unggah Data": "⬆", "Praproses & Normalisasi Data": "⚙️", "Klasterisasi Data": "📊",
-        "Prediksi Siswa Baru": "🔮", "Visualisasi & Profil Klaster": "📈", "Profil Siswa Individual": "👤"
+        "Prediksi Siswa Baru": "🔮", "Visualisasi & Profil Klaster": "📈", "Profil Siswa Individual": "👤",
+        "Antrian Sekolah": "🏫", "Diagnostik": "🩺"
     }
     
     for option in menu_options:
@@ -434,18 +688,37 @@ def show_operator_tu_page():
         init_session_state() # Reset state
         st.rerun()
 
+    clustering_task = collect_background_clustering()
+
     # == KONTEN HALAMAN BERDASARKAN MENU ==
     if st.session_state.current_menu == "Unggah Data":
         st.header("1. Unggah Data Siswa")
-        st.info("Unggah file Excel (.xlsx) berisi data siswa. Pastikan nama kolom sesuai template.")
-        uploaded_file = st.file_uploader("Pilih File Excel", type=["xlsx"])
+        st.info("Unggah file Excel (.xlsx), CSV, atau Parquet berisi data siswa. Pastikan nama kolom sesuai template.")
+        uploaded_file = st.file_uploader("Pilih File Data Siswa", type=list(SUPPORTED_TYPES))
         if uploaded_file:
+            # Setiap file yang baru diunggah memulai run diagnostik baru.
+            upload_id = getattr(uploaded_file, "file_id", uploaded_file.name)
+            if st.session_state.diagnostic_upload != upload_id:
+                start_diagnostic_run(uploaded_file.name)
+                st.session_state.diagnostic_upload = upload_id
             try:
-                df = pd.read_excel(uploaded_file, engine='openpyxl')
+                with diagnostic_stage("baca") as info:
+                    df = compact_students(read_students(uploaded_file, cache_dir=TABLE_CACHE_DIR,
+                                                        max_bytes=TABLE_CACHE_MAX_MB * 1024 * 1024))
+                    info["baris"] = len(df)
                 st.session_state.df_original = df
+                # Hasil klasterisasi data lama disimpan sebagai titik awal klasterisasi inkremental.
+                if st.session_state.df_clustered is not None:
+                    st.session_state.previous_clustering = {
+                        "df": st.session_state.df_clustered, "model": st.session_state.kproto_model,
+                        "scaler": st.session_state.scaler, "stats": st.session_state.scaler_stats,
+                    }
                 # Reset state selanjutnya jika data baru diunggah
                 st.session_state.df_preprocessed_for_clustering = None
                 st.session_state.df_clustered = None
+                st.session_state.k_sweep = None
+                st.session_state.cluster_profile = None
+                st.session_state.student_index = None
                 st.success("Data berhasil diunggah! Lihat preview di bawah.")
                 st.dataframe(df.head(), use_container_width=True)
             except Exception as e:
@@ -458,109 +731,260 @@ def show_operator_tu_page():
         else:
             st.info("Klik tombol di bawah untuk membersihkan dan menormalisasi data agar siap dianalisis.")
             if st.button("Jalankan Praproses"):
-                with st.spinner("Memproses data..."):
+                with st.spinner("Memproses data..."), diagnostic_stage("praproses", rows=len(st.session_state.df_original)):
                     df_preprocessed, scaler = preprocess_data(st.session_state.df_original)
                     if df_preprocessed is not None:
                         st.session_state.df_preprocessed_for_clustering = df_preprocessed
                         st.session_state.scaler = scaler
+                        st.session_state.k_sweep = None
                         st.success("Praproses dan normalisasi selesai!")
                         st.subheader("Data Setelah Praproses (Fitur untuk Klasterisasi):")
                         st.dataframe(df_preprocessed.head(), use_container_width=True)
 
     elif st.session_state.current_menu == "Klasterisasi Data":
         st.header("3. Jalankan Klasterisasi K-Prototypes")
+        from klasterisasi.pipeline import attach_labels
         if st.session_state.df_preprocessed_for_clustering is None:
             st.warning("Jalankan praproses data di menu sebelumnya terlebih dahulu.")
         else:
-            st.info("Pilih jumlah klaster (K) yang diinginkan, lalu jalankan algoritma.")
-            k = st.slider("Pilih Jumlah Klaster (K)", 2, 6, st.session_state.n_clusters)
-            if st.button("Jalankan Klasterisasi"):
-                with st.spinner(f"Mengelompokkan data ke dalam {k} klaster..."):
-                    df_clustered_normalized, kproto_model, cat_indices = run_kprototypes_clustering(
-                        st.session_state.df_preprocessed_for_clustering, k
-                    )
-                    if df_clustered_normalized is not None:
-                        df_final = st.session_state.df_original.copy()
-                        df_final['Klaster'] = df_clustered_normalized['Klaster']
-                        
-                        st.session_state.df_clustered = df_final
-                        st.session_state.kproto_model = kproto_model
-                        st.session_state.categorical_features_indices = cat_indices
-                        st.session_state.n_clusters = k
-                        st.session_state.cluster_characteristics_map = generate_cluster_descriptions(
-                            df_clustered_normalized, k
-                        )
-                        st.success(f"Klasterisasi dengan {k} klaster selesai! Data siap dilihat oleh Kepala Sekolah.")
+            mode_options = ["Satu nilai K", f"Sweep K ({K_MIN}–{K_MAX})"]
+            if st.session_state.previous_clustering is not None:
+                mode_options.append("Inkremental (dari hasil sebelumnya)")
+            mode = st.radio("Mode Klasterisasi", mode_options, horizontal=True)
+            if mode == "Inkremental (dari hasil sebelumnya)":
+                previous = st.session_state.previous_clustering
+                k = previous["model"].n_clusters
+                st.info(f"Data baru dibandingkan dengan data sebelumnya berdasarkan kolom No. Klasterisasi dimulai "
+                        f"dari centroid hasil sebelumnya (K = {k}), sehingga hanya siswa di sekitar perubahan yang "
+                        "berpindah klaster dan nomor klaster tetap sama.")
+                if st.button("Jalankan Klasterisasi Inkremental"):
+                    with st.spinner("Memperbarui klaster dari hasil sebelumnya..."), \
+                            diagnostic_stage("klasterisasi inkremental", rows=len(st.session_state.df_original)):
+                        hasil = run_incremental_clustering(previous, st.session_state.df_original)
+                    if hasil is not None:
+                        st.session_state.df_preprocessed_for_clustering = hasil["df_clustered_normalized"].drop(columns="Klaster")
+                        st.session_state.scaler = hasil["scaler"]
+                        df_final = store_clustering_result(hasil["df_clustered_normalized"], hasil["model"],
+                                                           hasil["categorical_indices"], k, scaler_stats=hasil["stats"])
+                        ringkasan = hasil["ringkasan"]
+                        st.success(f"Klasterisasi inkremental selesai dalam {ringkasan['iterasi']} iterasi: "
+                                   f"{ringkasan['tambah']} siswa baru, {ringkasan['hapus']} dihapus, "
+                                   f"{ringkasan['ubah']} berubah, {ringkasan['pindah_klaster']} siswa lama pindah klaster.")
+                        st.subheader("Siswa yang Pindah Klaster:")
+                        st.dataframe(hasil["pindah"], use_container_width=True, hide_index=True)
+                        st.subheader("Data Hasil Klasterisasi:")
+                        st.dataframe(df_final, use_container_width=True)
+            elif mode == "Satu nilai K":
+                st.info("Pilih jumlah klaster (K) yang diinginkan, lalu jalankan algoritma.")
+                k = st.slider("Pilih Jumlah Klaster (K)", K_MIN, K_MAX, st.session_state.n_clusters)
+                notice = st.session_state.clustering_notice
+                if notice is not None:
+                    st.session_state.clustering_notice = None
+                    getattr(st, notice[0])(notice[1])
+                    if notice[0] == "success":
+                        st.subheader("Data Hasil Klasterisasi:")
+                        st.dataframe(st.session_state.df_clustered, use_container_width=True)
+                if clustering_task is not None:
+                    show_background_clustering(clustering_task)
+                elif st.button("Jalankan Klasterisasi"):
+                    with diagnostic_stage("muat cache model", rows=len(st.session_state.df_preprocessed_for_clustering)):
+                        cache_key = clustering_cache_key(st.session_state.df_preprocessed_for_clustering, k)
+                        cached = get_model_cache().load(cache_key)
+                    if cached is not None:
+                        df_clustered_normalized = attach_labels(st.session_state.df_preprocessed_for_clustering,
+                                                                cached["model"].labels_, k)
+                        df_final = store_clustering_result(df_clustered_normalized, cached["model"],
+                                                           cached["categorical_indices"], k,
+                                                           cluster_characteristics_map=cached["cluster_characteristics_map"])
+                        st.success(f"Klasterisasi dengan {k} klaster dimuat dari cache (data dan parameter sama). "
+                                   "Data siap dilihat oleh Kepala Sekolah.")
+                        st.subheader("Data Hasil Klasterisasi:")
+                        st.dataframe(df_final, use_container_width=True)
+                    else:
+                        start_background_clustering(st.session_state.df_preprocessed_for_clustering, k, cache_key)
+                        st.rerun()
+            else:
+                st.info(f"Semua nilai K dari {K_MIN} sampai {K_MAX} di-fit sekaligus. Bandingkan cost dan silhouette, "
+                        "lalu pilih K yang akan digunakan tanpa perlu menjalankan ulang klasterisasi.")
+                if st.button("Jalankan Sweep K"):
+                    with st.spinner(f"Mengelompokkan data untuk K = {K_MIN} sampai {K_MAX}..."):
+                        progress_bar = st.progress(0.0, text="Menjalankan sweep K...")
+
+                        def update_sweep_progress(selesai, total, pesan):
+                            progress_bar.progress(min(selesai / total, 1.0), text=pesan)
+
+                        with diagnostic_stage("sweep K", rows=len(st.session_state.df_preprocessed_for_clustering)):
+                            df_sweep, sweep_models, cat_indices = run_k_sweep(
+                                st.session_state.df_preprocessed_for_clustering, range(K_MIN, K_MAX + 1),
+                                progress=update_sweep_progress
+                            )
+                        progress_bar.empty()
+                        if df_sweep is not None:
+                            st.session_state.k_sweep = {"tabel": df_sweep, "models": sweep_models,
+                                                        "cat_indices": cat_indices}
+
+                if st.session_state.k_sweep is not None:
+                    df_sweep = st.session_state.k_sweep["tabel"]
+                    st.subheader("Hasil Sweep K")
+                    st.dataframe(df_sweep.rename(columns={
+                        "cost": "Cost", "silhouette": "Silhouette (jarak campuran)", "iterasi": "Iterasi",
+                        "waktu_fit_detik": "Waktu Fit (detik)", "warm_start_terpilih": "Hasil Warm Start"
+                    }), use_container_width=True, hide_index=True)
+                    col1, col2 = st.columns(2)
+                    with col1:
+                        st.markdown("**Kurva Elbow (Cost)**")
+                        st.line_chart(df_sweep.set_index("K")["cost"])
+                    with col2:
+                        st.markdown("**Silhouette per K**")
+                        st.line_chart(df_sweep.set_index("K")["silhouette"])
+
+                    k_options = df_sweep["K"].tolist()
+                    k_pilih = st.selectbox("Pilih K yang akan digunakan", k_options,
+                                           index=int(df_sweep["silhouette"].fillna(-1).values.argmax()))
+                    if st.button("Gunakan K Ini"):
+                        kproto_model = st.session_state.k_sweep["models"][k_pilih]
+                        df_clustered_normalized = attach_labels(st.session_state.df_preprocessed_for_clustering,
+                                                                kproto_model.labels_, k_pilih)
+                        df_final = store_clustering_result(df_clustered_normalized, kproto_model,
+                                                           st.session_state.k_sweep["cat_indices"], k_pilih)
+                        st.success(f"Klasterisasi dengan {k_pilih} klaster disimpan! Data siap dilihat oleh Kepala Sekolah.")
                         st.subheader("Data Hasil Klasterisasi:")
                         st.dataframe(df_final, use_container_width=True)
 
     # Lanjutan fungsi lain (Prediksi, Visualisasi, Profil Individual) ditempatkan di sini...
     elif st.session_state.current_menu == "Prediksi Siswa Baru":
         st.header("4. Prediksi Klaster Siswa Baru")
+        from klasterisasi.artefak import MODEL_SUFFIX, load_model_artifact, model_artifact_bytes
+        from klasterisasi.prediksi import predict_students
         if st.session_state.kproto_model is None:
-            st.warning("Lakukan klasterisasi di menu 'Klasterisasi Data' untuk melatih model terlebih dahulu.")
+            st.warning("Lakukan klasterisasi di menu 'Klasterisasi Data' untuk melatih model terlebih dahulu, "
+                       "atau muat model yang pernah diunduh.")
+            file_model = st.file_uploader("Muat Model Tersimpan", type=[MODEL_SUFFIX.lstrip(".")], key="muat_model")
+            if file_model:
+                try:
+                    artefak = load_model_artifact(file_model)
+                except ValueError as e:
+                    st.error(f"Gagal memuat model: {e}")
+                else:
+                    st.session_state.kproto_model = artefak.model
+                    st.session_state.scaler = artefak.scaler
+                    st.session_state.categorical_features_indices = artefak.categorical_indices
+                    st.session_state.n_clusters = artefak.n_clusters
+                    st.session_state.cluster_characteristics_map = artefak.cluster_characteristics_map
+                    st.rerun()
         else:
-            st.info("Masukkan data siswa baru untuk memprediksi klasternya.")
-            with st.form("form_prediksi"):
-                col1, col2 = st.columns(2)
-                with col1:
-                    input_rata_nilai = st.number_input("Rata-rata Nilai Akademik (0-100)", 0.0, 100.0, 75.0)
-                    input_kehadiran = st.number_input("Persentase Kehadiran (0-1)", 0.0, 1.0, 0.95, format="%.2f")
-                with col2:
-                    st.write("Keikutsertaan Ekstrakurikuler:")
-                    input_ekskul = [st.checkbox(col.replace("Ekstrakurikuler ", ""), key=f"pred_{col}") for col in CATEGORICAL_COLS]
-                
-                submitted = st.form_submit_button("Prediksi Klaster")
-                if submitted:
-                    input_numeric = [input_rata_nilai, input_kehadiran]
-                    normalized_numeric = st.session_state.scaler.transform([input_numeric])[0]
-                    input_cat = [1 if val else 0 for val in input_ekskul]
-                    
-                    new_student_data = np.array(list(normalized_numeric) + input_cat, dtype=object).reshape(1, -1)
-                    
-                    predicted_cluster = st.session_state.kproto_model.predict(
-                        new_student_data, categorical=st.session_state.categorical_features_indices
-                    )
-                    pred_cluster_num = predicted_cluster[0]
+            st.download_button(
+                label="💾 Unduh Model",
+                data=model_artifact_bytes(st.session_state.kproto_model, st.session_state.scaler,
+                                          st.session_state.cluster_characteristics_map,
+                                          categorical_indices=st.session_state.categorical_features_indices),
+                file_name=f"model_klaster_{st.session_state.n_clusters}{MODEL_SUFFIX}",
+                mime="application/octet-stream",
+                help="Model (centroid, parameter normalisasi dan deskripsi klaster) untuk prediksi tanpa "
+                     "klasterisasi ulang, di aplikasi ini maupun lewat `python -m klasterisasi prediksi`."
+            )
+            tab_satu, tab_banyak = st.tabs(["Satu Siswa", "Unggah Banyak Siswa"])
+            with tab_satu:
+                st.info("Masukkan data siswa baru untuk memprediksi klasternya.")
+                with st.form("form_prediksi"):
+                    col1, col2 = st.columns(2)
+                    with col1:
+                        input_rata_nilai = st.number_input("Rata-rata Nilai Akademik (0-100)", 0.0, 100.0, 75.0)
+                        input_kehadiran = st.number_input("Persentase Kehadiran (0-1)", 0.0, 1.0, 0.95, format="%.2f")
+                    with col2:
+                        st.write("Keikutsertaan Ekstrakurikuler:")
+                        input_ekskul = [st.checkbox(col.replace("Ekstrakurikuler ", ""), key=f"pred_{col}") for col in CATEGORICAL_COLS]
+
+                    submitted = st.form_submit_button("Prediksi Klaster")
+                    if submitted:
+                        new_student = pd.DataFrame([[input_rata_nilai, input_kehadiran] + [1 if val else 0 for val in input_ekskul]],
+                                                   columns=ALL_FEATURES_FOR_CLUSTERING)
+                        df_pred = predict_students(new_student, st.session_state.scaler, st.session_state.kproto_model,
+                                                   NUMERIC_COLS, CATEGORICAL_COLS)
+                        pred_cluster_num = int(df_pred["Klaster"].iloc[0])
+
+                        st.success(f"Hasil Prediksi: Siswa ini masuk ke **Klaster {pred_cluster_num}**")
+                        desc = st.session_state.cluster_characteristics_map.get(pred_cluster_num, "Deskripsi tidak ada.")
+                        st.markdown(f"**Karakteristik Klaster:** *{desc}*")
+
+            with tab_banyak:
+                st.info("Unggah file Excel (.xlsx), CSV, atau Parquet berisi data siswa baru dengan kolom yang sama seperti data latih.")
+                file_baru = st.file_uploader("Pilih File Siswa Baru", type=list(SUPPORTED_TYPES), key="prediksi_batch")
+                if file_baru:
+                    try:
+                        df_baru = read_students(file_baru, cache_dir=TABLE_CACHE_DIR, max_bytes=TABLE_CACHE_MAX_MB * 1024 * 1024)
+                        df_pred = predict_students(df_baru, st.session_state.scaler, st.session_state.kproto_model,
+                                                   NUMERIC_COLS, CATEGORICAL_COLS,
+                                                   st.session_state.cluster_characteristics_map)
+                    except Exception as e:
+                        st.error(f"Gagal memprediksi file: {e}")
+                    else:
+                        st.success(f"{len(df_pred)} siswa berhasil diprediksi.")
+                        st.bar_chart(df_pred["Klaster"].value_counts().sort_index())
+                        st.dataframe(df_pred.head(100), use_container_width=True)
+
+                        nama_file = os.path.splitext(file_baru.name)[0]
+                        if file_baru.name.lower().endswith(".csv"):
+                            data_unduh, ekstensi, mime = df_pred.to_csv(index=False).encode("utf-8"), "csv", "text/csv"
+                        else:
+                            buffer = io.BytesIO()
+                            df_pred.to_excel(buffer, index=False, engine='openpyxl')
+                            data_unduh, ekstensi = buffer.getvalue(), "xlsx"
+                            mime = "application/vnd.openxmlformats-officedocument.spreadsheetml.sheet"
+                        st.download_button(
+                            label="📥 Unduh Hasil Prediksi",
+                            data=data_unduh,
+                            file_name=f"{nama_file}_berlabel.{ekstensi}",
+                            mime=mime
+                        )
 
-                    st.success(f"Hasil Prediksi: Siswa ini masuk ke **Klaster {pred_cluster_num}**")
-                    desc = st.session_state.cluster_characteristics_map.get(pred_cluster_num, "Deskripsi tidak ada.")
-                    st.markdown(f"**Karakteristik Klaster:** *{desc}*")
-    
     elif st.session_state.current_menu == "Visualisasi & Profil Klaster":
         st.header("5. Visualisasi & Profil Klaster")
         if st.session_state.df_clustered is None:
             st.warning("Jalankan klasterisasi di menu 'Klasterisasi Data' terlebih dahulu.")
         else:
             st.info("Berikut adalah visualisasi profil untuk setiap klaster yang terbentuk.")
+            profil = st.session_state.cluster_profile
+            with st.expander("🔁 Analisis Stabilitas Klaster", expanded=st.session_state.cluster_stability is None):
+                from klasterisasi.stabilitas import STABILITY_N_BOOT, STABILITY_SAMPLE_FRAC
+                st.write("Klasterisasi diulang pada banyak subsampel siswa untuk memeriksa apakah klaster yang "
+                         "ditampilkan tetap muncul. Hasilnya ikut ditampilkan di Dasbor Kepala Sekolah.")
+                col1, col2 = st.columns(2)
+                n_boot = col1.number_input("Jumlah resampling", min_value=5, max_value=200, value=STABILITY_N_BOOT, step=5)
+                sample_frac = col2.slider("Proporsi siswa per subsampel", 0.5, 0.95, STABILITY_SAMPLE_FRAC, 0.05)
+                if st.button("Jalankan Analisis Stabilitas"):
+                    progress_bar = st.progress(0.0, text="Menjalankan resampling...")
+
+                    def update_stability_progress(selesai, total):
+                        progress_bar.progress(selesai / total, text=f"Resampling {selesai}/{total} selesai")
+
+                    with diagnostic_stage("stabilitas", rows=len(st.session_state.df_clustered)):
+                        stabilitas = run_stability_analysis(int(n_boot), sample_frac, progress=update_stability_progress)
+                    progress_bar.empty()
+                    if stabilitas is not None:
+                        st.session_state.cluster_stability = stabilitas
+                        if st.session_state.published_version is not None:
+                            try:
+                                get_result_store().attach(st.session_state.published_version, "stabilitas", *stabilitas)
+                            except OSError as e:
+                                st.warning(f"Hasil analisis stabilitas tidak dapat dipublikasikan: {e}")
+            if st.session_state.cluster_stability is not None:
+                show_cluster_stability(st.session_state.cluster_stability, st.session_state.df_clustered)
             for i in range(st.session_state.n_clusters):
+                if profil["jumlah"][i] == 0:
+                    continue
                 st.markdown(f"---")
                 st.subheader(f"Klaster {i}")
-                
-                cluster_data_original = st.session_state.df_clustered[st.session_state.df_clustered["Klaster"] == i]
-                
-                # Perlu data ternormalisasi untuk visualisasi yang konsisten
-                df_normalized_temp, _ = preprocess_data(st.session_state.df_original)
-                df_normalized_temp['Klaster'] = st.session_state.df_clustered['Klaster']
-                cluster_data_normalized = df_normalized_temp[df_normalized_temp["Klaster"] == i]
 
                 col1, col2 = st.columns([1, 2])
                 with col1:
-                    st.metric("Jumlah Siswa", len(cluster_data_original))
+                    st.metric("Jumlah Siswa", int(profil["jumlah"][i]))
+                    stability_caption(st.session_state.cluster_stability, i)
                     desc = st.session_state.cluster_characteristics_map.get(i, "")
                     st.markdown(f"**Ringkasan:** *{desc}*")
 
                 with col2:
-                    values_numeric = cluster_data_normalized[NUMERIC_COLS].mean().tolist()
-                    values_ekskul = [int(cluster_data_normalized[col].mode().iloc[0]) for col in CATEGORICAL_COLS]
-                    values_plot = values_numeric + values_ekskul
-                    labels_plot = ["Nilai (Norm)", "Hadir (Norm)"] + [c.replace("Ekstrakurikuler ", "Ekskul\n") for c in CATEGORICAL_COLS]
-                    
-                    fig, ax = plt.subplots()
-                    sns.barplot(x=labels_plot, y=values_plot, ax=ax, palette="viridis")
-                    ax.set_ylabel("Rata-rata (Ternormalisasi / Biner)")
-                    ax.set_title(f"Profil Rata-rata Klaster {i}")
-                    st.pyplot(fig)
+                    show_cluster_profile_chart(profil, i, "viridis")
 
     elif st.session_state.current_menu == "Profil Siswa Individual":
         st.header("6. Lihat Profil Siswa Individual")
@@ -568,9 +992,13 @@ def show_operator_tu_page():
             st.warning("Jalankan klasterisasi di menu 'Klasterisasi Data' terlebih dahulu.")
         else:
             df_display = st.session_state.df_clustered
-            nama_terpilih = st.selectbox("Pilih Nama Siswa", df_display["Nama"].unique())
-            if nama_terpilih:
-                siswa_data = df_display[df_display["Nama"] == nama_terpilih].iloc[0]
+            indeks = st.session_state.student_index
+            show_bulk_pdf_download(df_display, indeks, st.session_state.cluster_characteristics_map, "operator")
+            siswa_terpilih = st.selectbox("Pilih Nama Siswa", indeks.keys, format_func=indeks.label)
+            if siswa_terpilih is not None:
+                posisi = indeks.position(siswa_terpilih)
+                siswa_data = df_display.iloc[posisi]
+                nama_terpilih = str(siswa_data['Nama'])
                 klaster_siswa = siswa_data['Klaster']
                 
                 st.success(f"Siswa **{nama_terpilih}** berada di **Klaster {klaster_siswa}**.")
@@ -602,15 +1030,109 @@ def show_operator_tu_page():
 
                 with col2:
                     st.subheader("Siswa Lain di Klaster yang Sama")
-                    siswa_lain = df_display[
-                        (df_display['Klaster'] == klaster_siswa) & 
-                        (df_display['Nama'] != nama_terpilih)
-                    ][["Nama", "Kelas"]]
+                    siswa_lain = df_display.iloc[indeks.cluster_members(klaster_siswa, exclude=posisi)][["Nama", "Kelas"]]
                     if not siswa_lain.empty:
                         st.dataframe(siswa_lain, use_container_width=True)
                     else:
                         st.info("Tidak ada siswa lain di klaster ini.")
 
+    elif st.session_state.current_menu == "Antrian Sekolah":
+        show_school_queue_page()
+
+    elif st.session_state.current_menu == "Diagnostik":
+        show_diagnostics_page()
+
+JOB_STATUS_LABELS = {"menunggu": "⏳ Menunggu", "berjalan": "⚙️ Berjalan", "selesai": "✅ Selesai",
+                     "gagal": "❌ Gagal", "dibatalkan": "⛔ Dibatalkan"}
+
+def show_school_queue_page():
+    st.header("Antrian Klasterisasi Sekolah")
+    st.info("Unggah roster beberapa sekolah sekaligus. Setiap roster diproses (praproses, klasterisasi, deskripsi) "
+            f"di latar belakang, paling banyak {SCHED_WORKERS} bersamaan, dan hasilnya dipublikasikan per sekolah "
+            "untuk dasbor Kepala Sekolah. Halaman ini dapat ditinggalkan selama pekerjaan berjalan.")
+    scheduler = get_scheduler()
+
+    with st.form("antrian_sekolah", clear_on_submit=True):
+        files = st.file_uploader("Pilih File Roster Sekolah", type=list(SUPPORTED_TYPES), accept_multiple_files=True)
+        n_clusters = st.number_input("Jumlah Klaster (K)", min_value=2, max_value=10, value=3, step=1)
+        names = st.text_area("Nama Sekolah (satu per baris, sesuai urutan file; kosong = nama file)")
+        submitted = st.form_submit_button("Masukkan ke Antrian")
+    if submitted:
+        if not files:
+            st.warning("Pilih minimal satu file roster.")
+        else:
+            school_names = [line.strip() for line in names.splitlines() if line.strip()]
+            for i, uploaded in enumerate(files):
+                school = school_names[i] if i < len(school_names) else os.path.splitext(uploaded.name)[0]
+                try:
+                    scheduler.submit(school, uploaded.getvalue(), uploaded.name, int(n_clusters))
+                except (OSError, ValueError) as e:
+                    st.error(f"Gagal memasukkan '{uploaded.name}' ke antrian: {e}")
+            st.success(f"{len(files)} roster dimasukkan ke antrian.")
+
+    show_job_table(scheduler)
+
+def show_job_table(scheduler):
+    jobs = scheduler.jobs()
+    active = any(job["status"] in ("menunggu", "berjalan") for job in jobs)
+
+    # Hanya tabel ini yang dimuat ulang berkala (selama ada pekerjaan aktif), bukan seluruh halaman.
+    @st.fragment(run_every=2 if active else None)
+    def render():
+        jobs = scheduler.jobs()
+        if not jobs:
+            st.caption("Antrian kosong.")
+            return
+        st.dataframe(pd.DataFrame([{
+            "Sekolah": job["sekolah"], "File": job["file"], "K": job["k"],
+            "Status": JOB_STATUS_LABELS.get(job["status"], job["status"]), "Tahap": job.get("tahap"),
+            "Progres": job.get("progres", 0.), "Siswa": job.get("n_siswa"), "Keterangan": job.get("pesan"),
+            "Dibuat": job["dibuat"], "Selesai": job.get("selesai"), "Versi": job.get("versi"),
+        } for job in jobs]), use_container_width=True, hide_index=True,
+            column_config={"Progres": st.column_config.ProgressColumn("Progres", min_value=0., max_value=1.)})
+
+        for job in jobs:
+            if job["status"] not in ("menunggu", "berjalan"):
+                continue
+            col1, col2 = st.columns([3, 1])
+            col1.write(f"**{job['sekolah']}** — {job['file']}")
+            if job.get("batal_diminta"):
+                col2.caption("Menunggu restart berjalan selesai untuk dibatalkan...")
+            elif col2.button("⛔ Batalkan", key=f"batal_{job['id']}"):
+                scheduler.cancel(job["id"])
+                st.rerun()
+        if not any(job["status"] in ("menunggu", "berjalan") for job in jobs) and active:
+            # Hentikan pemuatan ulang berkala setelah semua pekerjaan selesai.
+            st.rerun()
+
+    render()
+
+def show_diagnostics_page():
+    st.header("Diagnostik Kinerja")
+    st.info("Waktu nyata, waktu CPU, puncak memori dan jumlah baris setiap tahap pada run terakhir "
+            "(aplikasi dan CLI yang memakai folder log yang sama).")
+    n_runs = st.number_input("Jumlah run terakhir", min_value=1, max_value=max(DIAG_KEEP, 1), value=min(10, max(DIAG_KEEP, 1)))
+    records = get_run_log().recent(int(n_runs))
+    if not records:
+        st.warning("Belum ada run yang tercatat.")
+        return
+
+    df_tahap = pd.DataFrame(stage_rows(records)).rename(columns={
+        "run": "Run", "mulai": "Mulai", "sumber": "Sumber", "keterangan": "Keterangan", "tahap": "Tahap",
+        "baris": "Baris", "waktu_detik": "Waktu (detik)", "cpu_detik": "CPU (detik)",
+        "memori_puncak_mb": "Puncak Memori Tahap (MB)", "rss_maks_mb": "RSS Maks Proses (MB)"})
+    st.dataframe(df_tahap, use_container_width=True, hide_index=True)
+
+    st.subheader("Total Waktu per Tahap")
+    st.bar_chart(df_tahap.pivot_table(index="Tahap", columns="Run", values="Waktu (detik)", aggfunc="sum"))
+
+    st.download_button(
+        label="📥 Ekspor JSON",
+        data=get_run_log().export_json(int(n_runs)).encode("utf-8"),
+        file_name="diagnostik_klasterisasi.json",
+        mime="application/json"
+    )
+
 def show_kepala_sekolah_page():
     st.sidebar.title("MENU NAVIGASI KEPSEK")
     st.sidebar.markdown("---")
@@ -631,69 +1153,78 @@ def show_kepala_sekolah_page():
     # == KONTEN HALAMAN BERDASARKAN MENU ==
     st.title("👨‍💼 Dasbor Kepala Sekolah")
     
-    if st.session_state.df_clustered is None or st.session_state.df_clustered.empty:
+    # Hasil dibaca dari publikasi terbaru Operator TU, bukan dari sesi browser operator.
+    # Sekolah dari menu "Antrian Sekolah" memiliki folder publikasi masing-masing.
+    from klasterisasi.penjadwal import list_schools
+    schools = list_schools(SCHED_DIR)
+    if not schools or get_result_store().latest() is not None:
+        schools = {RESULT_STORE_DIR: SCHOOL_NAME, **schools}
+    directory = next(iter(schools))
+    if len(schools) > 1:
+        directory = st.sidebar.selectbox("Sekolah", list(schools), format_func=schools.get, key="kepsek_sekolah")
+    versi = get_result_store(directory).latest()
+    try:
+        hasil = load_published_result(versi, directory) if versi is not None else None
+    except (OSError, ValueError):
+        hasil = None
+    if hasil is None or hasil["df_clustered"].empty:
         st.warning("Data klasterisasi belum tersedia. Mohon minta Operator TU untuk memproses data terlebih dahulu.")
         return
+    st.caption(f"Hasil klasterisasi {schools[directory]} dipublikasikan pada {hasil['waktu']}.")
 
     if st.session_state.kepsek_current_menu == "Lihat Hasil Klasterisasi":
         st.header("Hasil Klasterisasi Siswa")
         st.info("Tabel di bawah ini adalah data siswa yang telah dikelompokkan.")
-        st.dataframe(st.session_state.df_clustered, use_container_width=True)
+        st.dataframe(hasil["df_clustered"], use_container_width=True)
         
         st.subheader("Jumlah Siswa per Klaster")
-        cluster_counts = st.session_state.df_clustered["Klaster"].value_counts().sort_index()
-        st.bar_chart(cluster_counts)
+        st.bar_chart(hasil["cluster_profile"]["jumlah"].rename("count"))
 
     elif st.session_state.kepsek_current_menu == "Visualisasi & Profil Klaster":
         st.header("Visualisasi dan Interpretasi Profil Klaster")
         st.info("Visualisasi ini membantu memahami karakteristik utama setiap kelompok siswa.")
-        
-        # Perlu data ternormalisasi untuk visualisasi yang konsisten
-        df_normalized_temp, _ = preprocess_data(st.session_state.df_original)
-        if df_normalized_temp is None:
-             st.error("Gagal memproses ulang data untuk visualisasi.")
-             return
-             
-        df_normalized_temp['Klaster'] = st.session_state.df_clustered['Klaster']
-
-        for i in range(st.session_state.n_clusters):
+        profil = hasil["cluster_profile"]
+        # Lampiran dibaca setiap rerun: analisis stabilitas dapat ditambahkan setelah hasil dipublikasikan.
+        try:
+            stabilitas = get_result_store(directory).load_attachment(versi, "stabilitas")
+        except (OSError, ValueError):
+            stabilitas = None
+        if stabilitas is not None:
+            show_cluster_stability(stabilitas, hasil["df_clustered"])
+        else:
+            st.caption("Analisis stabilitas klaster belum dijalankan oleh Operator TU untuk hasil ini.")
+
+        for i in range(hasil["n_clusters"]):
+            if profil["jumlah"][i] == 0:
+                continue
             st.markdown(f"---")
             st.subheader(f"Klaster {i}")
-            
-            cluster_data_original = st.session_state.df_clustered[st.session_state.df_clustered["Klaster"] == i]
-            cluster_data_normalized = df_normalized_temp[df_normalized_temp["Klaster"] == i]
 
             col1, col2 = st.columns([1, 2])
             with col1:
-                st.metric("Jumlah Siswa", len(cluster_data_original))
-                desc = st.session_state.cluster_characteristics_map.get(i, "Deskripsi tidak tersedia.")
+                st.metric("Jumlah Siswa", int(profil["jumlah"][i]))
+                stability_caption(stabilitas, i)
+                desc = hasil["cluster_characteristics_map"].get(i, "Deskripsi tidak tersedia.")
                 st.markdown(f"**Ringkasan Karakteristik:**")
                 st.info(f"{desc}")
 
             with col2:
-                values_numeric = cluster_data_normalized[NUMERIC_COLS].mean().tolist()
-                values_ekskul = [int(cluster_data_normalized[col].mode().iloc[0]) for col in CATEGORICAL_COLS]
-                values_plot = values_numeric + values_ekskul
-                labels_plot = ["Nilai (Norm)", "Hadir (Norm)"] + [c.replace("Ekstrakurikuler ", "Ekskul\n") for c in CATEGORICAL_COLS]
-                
-                fig, ax = plt.subplots()
-                sns.barplot(x=labels_plot, y=values_plot, ax=ax, palette="plasma")
-                ax.set_ylabel("Rata-rata (Ternormalisasi / Biner)")
-                ax.set_title(f"Profil Rata-rata Klaster {i}")
-                plt.tight_layout()
-                st.pyplot(fig)
+                show_cluster_profile_chart(profil, i, "plasma")
 
     elif st.session_state.kepsek_current_menu == "Lihat Profil Siswa":
         st.header("Lihat Profil Siswa Individual")
-        df_display = st.session_state.df_clustered
+        df_display = hasil["df_clustered"]
+        indeks = hasil["student_index"]
+        show_bulk_pdf_download(df_display, indeks, hasil["cluster_characteristics_map"], "kepsek")
         
-        nama_terpilih = st.selectbox("Pilih Nama Siswa", df_display["Nama"].unique(), key="kepsek_select_student")
-        if nama_terpilih:
-            siswa_data = df_display[df_display["Nama"] == nama_terpilih].iloc[0]
+        siswa_terpilih = st.selectbox("Pilih Nama Siswa", indeks.keys, format_func=indeks.label, key="kepsek_select_student")
+        if siswa_terpilih is not None:
+            siswa_data = df_display.iloc[indeks.position(siswa_terpilih)]
+            nama_terpilih = str(siswa_data['Nama'])
             klaster_siswa = siswa_data['Klaster']
             
             st.success(f"Siswa **{nama_terpilih}** berada di **Klaster {klaster_siswa}**.")
-            desc = st.session_state.cluster_characteristics_map.get(klaster_siswa, "")
+            desc = hasil["cluster_characteristics_map"].get(klaster_siswa, "")
             st.markdown(f"**Karakteristik Klaster:** *{desc}*")
             st.markdown("---")
             
@@ -0,0 +1 @@
+"""Komponen pendukung aplikasi klasterisasi siswa K-Prototypes."""
@@ -0,0 +1,192 @@
+"""Artefak model K-Prototypes untuk deployment yang hanya melakukan prediksi.
+
+Satu file berisi semua yang dibutuhkan untuk memprediksi klaster siswa
+baru: centroid numerik dan kategorikal, ``enc_map``, rata-rata dan skala
+scaler, gamma, skema kolom, serta deskripsi klaster. Susunan file::
+
+    MAGIC (8 byte) | panjang header (uint64 little-endian) | header JSON | array ...
+
+Setiap array diletakkan pada offset kelipatan 64 byte sehingga dapat
+dibaca langsung dari memory-map tanpa salinan. Modul ini hanya memerlukan
+NumPy dan pandas (tanpa scikit-learn atau Streamlit).
+"""
+
+import json
+import mmap
+import os
+import struct
+import tempfile
+import time
+
+import numpy as np
+
+from klasterisasi.kprototypes import KPrototypes
+from klasterisasi.prediksi import predict_students
+from klasterisasi.skema import ALL_FEATURES_FOR_CLUSTERING, CATEGORICAL_COLS, NUMERIC_COLS
+
+MAGIC = b"KPROTO\x00\x01"
+# Naikkan bila isi header atau susunan array berubah.
+ARTIFACT_VERSION = 1
+MODEL_SUFFIX = ".kproto"
+_ALIGN = 64
+
+
+class ScalerParams:
+    """Parameter ``StandardScaler`` yang dipakai prediksi (``mean_``, ``scale_``, ``var_``) tanpa scikit-learn."""
+
+    def __init__(self, mean, scale, var=None):
+        self.mean_ = np.asarray(mean, dtype=np.float64)
+        self.scale_ = np.asarray(scale, dtype=np.float64)
+        self.var_ = np.square(self.scale_) if var is None else np.asarray(var, dtype=np.float64)
+
+    def transform(self, X):
+        return (np.asarray(X, dtype=np.float64) - self.mean_) / self.scale_
+
+
+def _as_storable(arr):
+    # Kategori teks disimpan sebagai unicode lebar tetap (tanpa pickle).
+    arr = np.asarray(arr)
+    return arr.astype(str) if arr.dtype == object else np.ascontiguousarray(arr)
+
+
+def model_artifact_bytes(model, scaler, cluster_characteristics_map=None, numeric_cols=NUMERIC_COLS,
+                         categorical_cols=CATEGORICAL_COLS, categorical_indices=None):
+    """Serialisasi model ter-fit beserta scaler dan deskripsi klaster menjadi bytes artefak."""
+    arrays = {
+        "centroids_num": np.ascontiguousarray(model._centroids_num, dtype=np.float64),
+        "centroids_cat": np.ascontiguousarray(model._centroids_cat),
+        "scaler_mean": np.asarray(scaler.mean_, dtype=np.float64),
+        "scaler_scale": np.asarray(scaler.scale_, dtype=np.float64),
+        "scaler_var": np.asarray(getattr(scaler, "var_", np.square(scaler.scale_)), dtype=np.float64),
+    }
+    for i, categories in enumerate(model._enc_map):
+        arrays[f"enc_map_{i}"] = _as_storable(categories)
+    if categorical_indices is None:
+        categorical_indices = [ALL_FEATURES_FOR_CLUSTERING.index(c) for c in categorical_cols]
+
+    specs, offset = {}, 0
+    for name, arr in arrays.items():
+        offset = -(-offset // _ALIGN) * _ALIGN
+        specs[name] = {"dtype": arr.dtype.str, "shape": list(arr.shape), "offset": offset}
+        offset += arr.nbytes
+    header = json.dumps({
+        "format": ARTIFACT_VERSION,
+        "dibuat": time.strftime("%Y-%m-%d %H:%M:%S"),
+        "n_clusters": int(model._centroids_num.shape[0]),
+        "gamma": float(model.gamma),
+        "cost": float(model.cost_),
+        "n_iter": int(model.n_iter_),
+        "params": {"n_clusters": model.n_clusters, "max_iter": model.max_iter, "init": model.init,
+                   "n_init": model.n_init, "random_state": model.random_state},
+        "numeric_cols": list(numeric_cols),
+        "categorical_cols": list(categorical_cols),
+        "categorical_indices": [int(i) for i in categorical_indices],
+        "n_categorical": len(model._enc_map),
+        "cluster_characteristics_map": {str(k): v for k, v in (cluster_characteristics_map or {}).items()},
+        "arrays": specs,
+    }, ensure_ascii=False).encode("utf-8")
+
+    # Data array dimulai pada batas _ALIGN dari awal file.
+    prefix_len = len(MAGIC) + 8 + len(header)
+    data_start = -(-prefix_len // _ALIGN) * _ALIGN
+    buffer = bytearray(data_start + offset)
+    buffer[:len(MAGIC)] = MAGIC
+    buffer[len(MAGIC):len(MAGIC) + 8] = struct.pack("<Q", len(header))
+    buffer[len(MAGIC) + 8:prefix_len] = header
+    for name, arr in arrays.items():
+        start = data_start + specs[name]["offset"]
+        buffer[start:start + arr.nbytes] = arr.tobytes()
+    return bytes(buffer)
+
+
+def save_model_artifact(path, model, scaler, cluster_characteristics_map=None, numeric_cols=NUMERIC_COLS,
+                        categorical_cols=CATEGORICAL_COLS, categorical_indices=None):
+    """Tulis artefak model ke ``path`` secara atomik; mengembalikan ``path``."""
+    data = model_artifact_bytes(model, scaler, cluster_characteristics_map, numeric_cols, categorical_cols,
+                                categorical_indices)
+    directory = os.path.dirname(os.path.abspath(path))
+    os.makedirs(directory, exist_ok=True)
+    fd, tmp_path = tempfile.mkstemp(dir=directory, suffix=".tmp")
+    try:
+        with os.fdopen(fd, "wb") as f:
+            f.write(data)
+        os.replace(tmp_path, path)
+    except BaseException:
+        if os.path.exists(tmp_path):
+            os.remove(tmp_path)
+        raise
+    return path
+
+
+class ModelArtifact:
+    """Model hasil ``load_model_artifact``: siap dipakai ``predict`` dan halaman prediksi.
+
+    ``model`` adalah ``KPrototypes`` dengan centroid dari artefak (tanpa
+    label data latih), ``scaler`` berupa ``ScalerParams``. Array centroid
+    dan scaler adalah view read-only atas isi file.
+    """
+
+    def __init__(self, header, arrays):
+        self.meta = {key: value for key, value in header.items() if key != "arrays"}
+        self.numeric_cols = header["numeric_cols"]
+        self.categorical_cols = header["categorical_cols"]
+        self.categorical_indices = header["categorical_indices"]
+        self.n_clusters = header["n_clusters"]
+        self.cluster_characteristics_map = {int(k): v for k, v in header["cluster_characteristics_map"].items()}
+        self.scaler = ScalerParams(arrays["scaler_mean"], arrays["scaler_scale"], arrays["scaler_var"])
+
+        enc_map = [arrays[f"enc_map_{i}"] for i in range(header["n_categorical"])]
+        # Kategori teks dikembalikan ke object seperti enc_map hasil fit.
+        enc_map = [categories.astype(object) if categories.dtype.kind == "U" else categories
+                   for categories in enc_map]
+        self.model = KPrototypes(**header["params"])
+        result = ((arrays["centroids_num"], arrays["centroids_cat"]), np.empty(0, dtype=np.uint16),
+                  header["cost"], header["n_iter"], [header["cost"]])
+        self.model.set_result(result, header["gamma"], enc_map)
+
+    def predict(self, df_new, with_descriptions=True):
+        """Salinan ``df_new`` dengan kolom Klaster (dan deskripsinya bila ``with_descriptions``)."""
+        return predict_students(df_new, self.scaler, self.model, self.numeric_cols, self.categorical_cols,
+                                self.cluster_characteristics_map if with_descriptions else None)
+
+
+def _parse(buffer):
+    try:
+        view = memoryview(buffer)
+        if bytes(view[:len(MAGIC)]) != MAGIC:
+            raise ValueError("File bukan artefak model K-Prototypes.")
+        (header_len,) = struct.unpack("<Q", view[len(MAGIC):len(MAGIC) + 8])
+        prefix_len = len(MAGIC) + 8 + header_len
+        header = json.loads(bytes(view[len(MAGIC) + 8:prefix_len]).decode("utf-8"))
+    except (struct.error, UnicodeDecodeError) as e:
+        raise ValueError("File artefak model rusak.") from e
+    if header.get("format") != ARTIFACT_VERSION:
+        raise ValueError("Versi artefak model tidak dikenali.")
+    data_start = -(-prefix_len // _ALIGN) * _ALIGN
+    arrays = {}
+    for name, spec in header["arrays"].items():
+        dtype, shape = np.dtype(spec["dtype"]), tuple(spec["shape"])
+        count = int(np.prod(shape, dtype=np.int64))
+        if count == 0:
+            arrays[name] = np.empty(shape, dtype=dtype)
+            continue
+        arrays[name] = np.frombuffer(buffer, dtype=dtype, count=count,
+                                     offset=data_start + spec["offset"]).reshape(shape)
+    return ModelArtifact(header, arrays)
+
+
+def load_model_artifact(source):
+    """Muat artefak dari path (memory-map read-only) atau dari bytes / objek file (mis. unggahan Streamlit).
+
+    Melempar ValueError bila isi file bukan artefak model yang dikenali.
+    """
+    if isinstance(source, (bytes, bytearray, memoryview)):
+        return _parse(source)
+    if hasattr(source, "read"):
+        if hasattr(source, "seek"):
+            source.seek(0)
+        return _parse(source.read())
+    with open(source, "rb") as f:
+        # Mapping tetap hidup selama array (view atasnya) masih dipakai.
+        buffer = mmap.mmap(f.fileno(), 0, access=mmap.ACCESS_READ)
+    return _parse(buffer)
@@ -0,0 +1,135 @@
+"""Cache model K-Prototypes di disk, dialamatkan dengan hash data dan parameter fit."""
+
+import hashlib
+import json
+import os
+import tempfile
+
+import numpy as np
+
+from klasterisasi.kprototypes import KPrototypes
+
+# Naikkan bila algoritma berubah sehingga hasil lama tidak lagi valid.
+CACHE_VERSION = 2
+
+
+def _as_saveable(arr):
+    # np.savez tanpa pickle tidak bisa menyimpan array object.
+    arr = np.asarray(arr)
+    return arr.astype(str) if arr.dtype == object else arr
+
+
+class ModelCache:
+    """Simpan hasil fit (centroid, label, parameter scaler, deskripsi klaster).
+
+    Setiap entri adalah satu file ``<key>.npz`` yang ditulis secara atomik.
+    Waktu modifikasi file diperbarui setiap kali entri dibaca, dan entri yang
+    paling lama tidak dipakai dihapus bila total ukuran melebihi ``max_bytes``.
+    """
+
+    def __init__(self, directory, max_bytes=512 * 1024 * 1024):
+        self.directory = directory
+        self.max_bytes = max_bytes
+
+    @staticmethod
+    def make_key(Xnum, Xcat, enc_map, **params):
+        # params: semua parameter yang memengaruhi hasil fit, termasuk tol, move_tol dan accelerate.
+        h = hashlib.blake2b(digest_size=20)
+        for arr in (Xnum, Xcat):
+            arr = np.ascontiguousarray(arr)
+            h.update(f"{arr.dtype.str}{arr.shape}".encode())
+            h.update(arr.data)
+        for categories in enc_map:
+            h.update(repr(np.asarray(categories).tolist()).encode())
+        h.update(json.dumps({"versi": CACHE_VERSION, **params}, sort_keys=True, default=str).encode())
+        return h.hexdigest()
+
+    def _path(self, key):
+        return os.path.join(self.directory, f"{key}.npz")
+
+    def load(self, key):
+        path = self._path(key)
+        try:
+            with np.load(path, allow_pickle=False) as data:
+                meta = json.loads(str(data["meta"]))
+                arrays = {name: data[name] for name in data.files if name != "meta"}
+            os.utime(path)
+        except (OSError, ValueError, KeyError):
+            # Entri tidak ada, sedang dihapus proses lain, atau rusak.
+            return None
+
+        enc_map = [arrays[f"enc_map_{i}"] for i in range(meta["n_categorical"])]
+        model = KPrototypes(**meta["params"])
+        result = ((arrays["centroids_num"], arrays["centroids_cat"]), arrays["labels"],
+                  meta["cost"], meta["n_iter"], meta["epoch_costs"])
+        model.set_result(result, meta["gamma"], enc_map)
+        return {
+            "model": model,
+            "cluster_characteristics_map": {int(k): v for k, v in meta["cluster_characteristics_map"].items()},
+            "scaler": {name[len("scaler_"):]: arr for name, arr in arrays.items() if name.startswith("scaler_")},
+            "categorical_indices": meta["categorical_indices"],
+        }
+
+    def save(self, key, model, cluster_characteristics_map=None, scaler_params=None,
+             categorical_indices=None):
+        os.makedirs(self.directory, exist_ok=True)
+        meta = {
+            "params": {"n_clusters": model.n_clusters, "max_iter": model.max_iter, "init": model.init,
+                       "n_init": model.n_init, "random_state": model.random_state, "tol": model.tol,
+                       "move_tol": model.move_tol, "accelerate": model.accelerate},
+            "gamma": float(model.gamma),
+            "cost": float(model.cost_),
+            "n_iter": int(model.n_iter_),
+            "epoch_costs": [float(c) for c in model.epoch_costs_],
+            "n_categorical": len(model._enc_map),
+            "categorical_indices": list(categorical_indices or []),
+            "cluster_characteristics_map": {str(k): v for k, v in (cluster_characteristics_map or {}).items()},
+        }
+        arrays = {
+            "meta": np.array(json.dumps(meta)),
+            "centroids_num": model._centroids_num,
+            "centroids_cat": model._centroids_cat,
+            "labels": model.labels_,
+        }
+        for i, categories in enumerate(model._enc_map):
+            arrays[f"enc_map_{i}"] = _as_saveable(categories)
+        for name, arr in (scaler_params or {}).items():
+            arrays[f"scaler_{name}"] = _as_saveable(arr)
+
+        fd, tmp_path = tempfile.mkstemp(dir=self.directory, suffix=".tmp")
+        try:
+            with os.fdopen(fd, "wb") as f:
+                np.savez(f, **arrays)
+            os.replace(tmp_path, self._path(key))
+        except BaseException:
+            if os.path.exists(tmp_path):
+                os.remove(tmp_path)
+            raise
+        self._evict(keep=key)
+
+    def _evict(self, keep=None):
+        evict_lru(self.directory, self.max_bytes, keep=self._path(keep) if keep is not None else None)
+
+
+def evict_lru(directory, max_bytes, keep=None, suffix=".npz"):
+    """Hapus file ``*suffix`` yang paling lama tidak dipakai sampai total ukuran <= ``max_bytes``."""
+    entries = []
+    with os.scandir(directory) as it:
+        for entry in it:
+            if entry.name.endswith(suffix):
+                try:
+                    stat = entry.stat()
+                except FileNotFoundError:
+                    continue
+                entries.append((stat.st_mtime, stat.st_size, entry.path))
+    total = sum(size for _, size, _ in entries)
+    for _, size, path in sorted(entries):
+        if total <= max_bytes:
+            break
+        if keep is not None and path == keep:
+            continue
+        try:
+            os.remove(path)
+        except FileNotFoundError:
+            pass
+        total -= size
@@ -0,0 +1,246 @@
+"""Antarmuka baris perintah: ``python -m klasterisasi cluster --input data.xlsx --k 4 --out hasil/``."""
+
+import argparse
+import json
+import os
+import sys
+from concurrent.futures import ProcessPoolExecutor, as_completed
+
+from klasterisasi.artefak import load_model_artifact
+from klasterisasi.diagnostik import RunLog, StageTimer
+from klasterisasi.minibatch import MINIBATCH_BATCH_ROWS, run_streaming_pipeline
+from klasterisasi.paralel import BACKENDS, mp_context, resolve_n_jobs
+from klasterisasi.pipeline import KPROTO_MOVE_TOL, KPROTO_N_INIT, KPROTO_RANDOM_STATE, KPROTO_TOL, run_pipeline
+from klasterisasi.sintetis import generate_roster, write_roster
+from klasterisasi.tolok_ukur import PDF_ROWS, STAGES, compare_results, run_benchmark
+from klasterisasi.unggah import STREAM_CHUNK_ROWS, read_students
+
+
+def _run_one(input_path, args, backend, n_jobs):
+    timer = StageTimer(label=os.path.basename(input_path), source="cli", trace_memory=args.trace_memory)
+    try:
+        if args.mini_batch:
+            return run_streaming_pipeline(input_path, args.k, args.out, chunk_rows=args.chunk_rows,
+                                          batch_rows=args.batch_rows, n_epochs=args.epochs, n_init=args.n_init,
+                                          random_state=args.random_state, backend=backend, n_jobs=n_jobs,
+                                          timer=timer, save_model=args.save_model)
+        return run_pipeline(input_path, args.k, args.out, n_init=args.n_init, random_state=args.random_state,
+                            backend=backend, n_jobs=n_jobs, cache_dir=args.cache_dir, timer=timer,
+                            save_model=args.save_model, tol=args.tol, move_tol=args.move_tol)
+    except Exception as e:
+        return {"input": os.path.abspath(input_path), "error": f"{type(e).__name__}: {e}"}
+    finally:
+        # Run yang gagal tetap dicatat sampai tahap terakhir yang sempat berjalan.
+        if args.log_dir:
+            try:
+                RunLog(args.log_dir, keep=args.log_keep).save(timer.to_record())
+            except OSError as e:
+                print(f"Catatan diagnostik tidak dapat disimpan: {e}", file=sys.stderr)
+
+
+def _report(summary, stream):
+    if "error" in summary:
+        print(f"GAGAL {summary['input']}: {summary['error']}", file=stream)
+        return
+    waktu = ", ".join(f"{name}={seconds:.2f}s" for name, seconds in summary["waktu_detik"].items())
+    print(f"OK {summary['input']} -> {summary['hasil']} (n={summary['n_siswa']}, "
+          f"cost={summary['cost']:.4f}; {waktu})", file=stream)
+    for pesan in summary["peringatan"]:
+        print(f"  peringatan: {pesan}", file=stream)
+
+
+def cmd_cluster(args):
+    n_files = resolve_n_jobs(args.parallel_files, len(args.input))
+    # Bila beberapa file diproses bersamaan, restart di dalam tiap file dijalankan serial
+    # agar jumlah proses tidak melebihi jumlah CPU.
+    backend, n_jobs = (args.backend, args.n_jobs) if n_files == 1 else ("serial", 1)
+
+    summaries = []
+    if n_files == 1:
+        for input_path in args.input:
+            summaries.append(_run_one(input_path, args, backend, n_jobs))
+            _report(summaries[-1], sys.stdout)
+    else:
+        with ProcessPoolExecutor(max_workers=n_files, mp_context=mp_context()) as executor:
+            futures = [executor.submit(_run_one, input_path, args, backend, n_jobs) for input_path in args.input]
+            for future in as_completed(futures):
+                summaries.append(future.result())
+                _report(summaries[-1], sys.stdout)
+
+    if args.json:
+        json.dump(summaries, sys.stdout, ensure_ascii=False, indent=2)
+        print()
+    return 1 if any("error" in summary for summary in summaries) else 0
+
+
+def cmd_diagnostik(args):
+    print(RunLog(args.log_dir).export_json(args.n))
+    return 0
+
+
+def cmd_prediksi(args):
+    artefak = load_model_artifact(args.model)
+    os.makedirs(args.out, exist_ok=True)
+    status = 0
+    for input_path in args.input:
+        try:
+            df_pred = artefak.predict(read_students(input_path))
+            stem, ext = os.path.splitext(os.path.basename(input_path))
+            if ext.lower() == ".csv":
+                hasil_path = os.path.join(args.out, f"{stem}_berlabel.csv")
+                df_pred.to_csv(hasil_path, index=False)
+            else:
+                hasil_path = os.path.join(args.out, f"{stem}_berlabel.xlsx")
+                df_pred.to_excel(hasil_path, index=False, engine='openpyxl')
+        except Exception as e:
+            print(f"GAGAL {os.path.abspath(input_path)}: {type(e).__name__}: {e}")
+            status = 1
+        else:
+            print(f"OK {os.path.abspath(input_path)} -> {os.path.abspath(hasil_path)} (n={len(df_pred)})")
+    return status
+
+
+def cmd_sintetis(args):
+    df = generate_roster(args.rows, n_clusters=args.k, separation=args.separation, flip=args.flip,
+                         missing=args.missing, random_state=args.random_state)
+    print(f"{len(df)} siswa sintetis ditulis ke {write_roster(df, args.out)}")
+    return 0
+
+
+def _report_comparison(comparison, stream):
+    for item in comparison:
+        rasio = f"{item['rasio_waktu']:.2f}x" if item["rasio_waktu"] is not None else "-"
+        line = (f"n={item['n_siswa']:>9} {item['tahap']:<13} {item['waktu_lama']:9.3f}s -> "
+                f"{item['waktu_baru']:9.3f}s ({rasio})")
+        if item.get("rasio_memori") is not None:
+            line += f", memori {item['memori_lama_mb']:.1f} -> {item['memori_baru_mb']:.1f} MB ({item['rasio_memori']:.2f}x)"
+        print(line, file=stream)
+
+
+def cmd_tolok_ukur(args):
+    def report(n_rows, results):
+        for row in results:
+            if row["n_siswa"] != n_rows:
+                continue
+            line = f"n={n_rows:>9} {row['tahap']:<13} {row['waktu_detik']:9.3f}s"
+            if row["baris_per_detik"] is not None:
+                line += f" {row['baris_per_detik']:12.0f} baris/s"
+            if "memori_puncak_mb" in row:
+                line += f" {row['memori_puncak_mb']:9.1f} MB"
+            if row.get("modul_berat"):
+                line += f" (modul berat termuat: {', '.join(row['modul_berat'])})"
+            print(line, flush=True)
+
+    hasil = run_benchmark(args.sizes, progress=report, startup_app=args.startup, n_clusters=args.k, stages=args.stages, repeat=args.repeat,
+                          measure_memory=not args.no_memory, file_format=args.format, separation=args.separation,
+                          n_init=args.n_init, random_state=args.random_state, backend=args.backend,
+                          n_jobs=args.n_jobs, pdf_rows=args.pdf_rows, work_dir=args.work_dir)
+    with open(args.out, "w", encoding="utf-8") as f:
+        json.dump(hasil, f, ensure_ascii=False, indent=2)
+    print(f"Hasil tolok ukur ditulis ke {args.out}")
+    if args.baseline:
+        with open(args.baseline, encoding="utf-8") as f:
+            _report_comparison(compare_results(json.load(f), hasil), sys.stdout)
+    return 0
+
+
+def cmd_banding(args):
+    with open(args.lama, encoding="utf-8") as f:
+        old = json.load(f)
+    with open(args.baru, encoding="utf-8") as f:
+        new = json.load(f)
+    _report_comparison(compare_results(old, new), sys.stdout)
+    return 0
+
+
+def build_parser():
+    parser = argparse.ArgumentParser(prog="python -m klasterisasi",
+                                     description="Klasterisasi data siswa K-Prototypes tanpa antarmuka web.")
+    sub = parser.add_subparsers(dest="command", required=True)
+
+    cluster = sub.add_parser("cluster", help="praproses, klasterisasi dan tulis hasil untuk satu atau banyak file")
+    cluster.add_argument("--input", nargs="+", required=True, help="file .xlsx, .csv atau .parquet data siswa")
+    cluster.add_argument("--k", type=int, required=True, help="jumlah klaster")
+    cluster.add_argument("--out", required=True, help="folder keluaran")
+    cluster.add_argument("--n-init", type=int, default=KPROTO_N_INIT, help="jumlah restart K-Prototypes")
+    cluster.add_argument("--random-state", type=int, default=KPROTO_RANDOM_STATE)
+    cluster.add_argument("--tol", type=float, default=KPROTO_TOL,
+                         help="hentikan restart bila cost turun tidak lebih dari proporsi ini (0 = sampai konvergen)")
+    cluster.add_argument("--move-tol", type=float, default=KPROTO_MOVE_TOL,
+                         help="hentikan restart bila proporsi siswa yang pindah klaster tidak lebih dari nilai ini")
+    cluster.add_argument("--backend", choices=BACKENDS, default="process",
+                         help="backend restart dalam satu file")
+    cluster.add_argument("--n-jobs", type=int, default=-1, help="jumlah worker restart (-1 = semua CPU)")
+    cluster.add_argument("--parallel-files", type=int, default=1,
+                         help="jumlah file yang diproses bersamaan (-1 = semua CPU)")
+    cluster.add_argument("--cache-dir", help="folder cache kolom agar file yang sama tidak di-parse ulang")
+    cluster.add_argument("--json", action="store_true", help="cetak ringkasan semua file sebagai JSON")
+    cluster.add_argument("--mini-batch", action="store_true",
+                         help="baca file bertahap dan klaster dengan K-Prototypes mini-batch (untuk data sangat "
+                              "besar); hasil ditulis sebagai CSV dan --cache-dir diabaikan")
+    cluster.add_argument("--chunk-rows", type=int, default=STREAM_CHUNK_ROWS,
+                         help="jumlah baris per potongan file pada mode mini-batch")
+    cluster.add_argument("--batch-rows", type=int, default=MINIBATCH_BATCH_ROWS,
+                         help="jumlah baris per pembaruan centroid pada mode mini-batch")
+    cluster.add_argument("--epochs", type=int, default=1, help="jumlah lintasan pembaruan centroid mini-batch")
+    cluster.add_argument("--save-model", action="store_true",
+                         help="tulis artefak model <nama>_model.kproto untuk perintah prediksi / deployment prediksi")
+    cluster.add_argument("--log-dir", help="folder log diagnostik (waktu, CPU, memori dan jumlah baris per tahap); "
+                                           "sama dengan KPROTO_DIAG_DIR aplikasi agar tampil di menu Diagnostik")
+    cluster.add_argument("--log-keep", type=int, default=50, help="jumlah run terakhir yang disimpan di --log-dir")
+    cluster.add_argument("--trace-memory", action="store_true",
+                         help="ukur puncak alokasi memori per tahap dengan tracemalloc (memperlambat proses)")
+    cluster.set_defaults(func=cmd_cluster)
+
+    prediksi = sub.add_parser("prediksi", help="beri label klaster pada siswa baru dengan artefak model tersimpan")
+    prediksi.add_argument("--model", required=True, help="file artefak .kproto (dari cluster --save-model)")
+    prediksi.add_argument("--input", nargs="+", required=True, help="file .xlsx, .csv atau .parquet siswa baru")
+    prediksi.add_argument("--out", required=True, help="folder keluaran")
+    prediksi.set_defaults(func=cmd_prediksi)
+
+    diagnostik = sub.add_parser("diagnostik", help="ekspor catatan run terakhir dari folder log diagnostik")
+    diagnostik.add_argument("--log-dir", required=True, help="folder log diagnostik")
+    diagnostik.add_argument("--n", type=int, help="jumlah run terakhir (bawaan: semua)")
+    diagnostik.set_defaults(func=cmd_diagnostik)
+
+    sintetis = sub.add_parser("sintetis", help="tulis data siswa sintetis sesuai template kolom")
+    sintetis.add_argument("--rows", type=int, required=True, help="jumlah siswa")
+    sintetis.add_argument("--out", required=True, help="file keluaran .xlsx, .csv atau .parquet")
+    sintetis.add_argument("--k", type=int, default=4, help="jumlah kelompok asal")
+    sintetis.add_argument("--separation", type=float, default=1.0,
+                          help="jarak antarpusat kelompok (0 = tanpa struktur klaster)")
+    sintetis.add_argument("--flip", type=float, default=0.1, help="peluang flag ekstrakurikuler dibalik")
+    sintetis.add_argument("--missing", type=float, default=0.0, help="proporsi nilai numerik yang dikosongkan")
+    sintetis.add_argument("--random-state", type=int, default=KPROTO_RANDOM_STATE)
+    sintetis.set_defaults(func=cmd_sintetis)
+
+    tolok = sub.add_parser("tolok-ukur", help="ukur waktu, throughput dan memori setiap tahap pada data sintetis")
+    tolok.add_argument("--sizes", type=int, nargs="*", default=[1_000, 10_000],
+                       help="jumlah siswa per ukuran (kosongkan untuk mengukur --startup saja)")
+    tolok.add_argument("--startup", metavar="APP", help="ukur juga cold start halaman login app.py di interpreter baru")
+    tolok.add_argument("--out", required=True, help="file hasil JSON")
+    tolok.add_argument("--baseline", help="file hasil JSON lama untuk dibandingkan")
+    tolok.add_argument("--stages", nargs="+", choices=STAGES, default=list(STAGES), help="tahap yang diukur")
+    tolok.add_argument("--k", type=int, default=4, help="jumlah klaster (dan kelompok asal data sintetis)")
+    tolok.add_argument("--separation", type=float, default=1.0)
+    tolok.add_argument("--format", choices=("csv", "xlsx", "parquet"), default="csv", help="format file tahap baca")
+    tolok.add_argument("--repeat", type=int, default=1, help="jumlah pengulangan pengukuran waktu per tahap")
+    tolok.add_argument("--no-memory", action="store_true", help="lewati lintasan pengukuran memori (tracemalloc)")
+    tolok.add_argument("--n-init", type=int, default=KPROTO_N_INIT)
+    tolok.add_argument("--random-state", type=int, default=KPROTO_RANDOM_STATE)
+    tolok.add_argument("--backend", choices=BACKENDS, default="serial")
+    tolok.add_argument("--n-jobs", type=int, default=1)
+    tolok.add_argument("--pdf-rows", type=int, default=PDF_ROWS, help="jumlah siswa pada tahap pdf")
+    tolok.add_argument("--work-dir", help="folder file roster sementara (bawaan: folder temp sistem)")
+    tolok.set_defaults(func=cmd_tolok_ukur)
+
+    banding = sub.add_parser("banding", help="bandingkan dua file hasil tolok ukur")
+    banding.add_argument("lama")
+    banding.add_argument("baru")
+    banding.set_defaults(func=cmd_banding)
+    return parser
+
+
+def main(argv=None):
+    args = build_parser().parse_args(argv)
+    return args.func(args)
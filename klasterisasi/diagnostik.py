@@ -0,0 +1,172 @@
+"""Pengukuran waktu dan memori per tahap pipeline, serta log run terakhir di disk.
+
+Setiap tahap (baca, praproses, klasterisasi, deskripsi, grafik, PDF)
+dicatat dengan waktu nyata, waktu CPU proses, puncak memori dan jumlah
+baris. Satu run disimpan sebagai satu file JSON sehingga beberapa proses
+(sesi Streamlit, CLI) dapat menulis ke folder log yang sama.
+"""
+
+import json
+import os
+import sys
+import tempfile
+import time
+import tracemalloc
+import uuid
+from contextlib import contextmanager
+
+try:
+    import resource
+except ImportError:  # Windows
+    resource = None
+
+# Naikkan bila susunan catatan run berubah.
+LOG_VERSION = 1
+
+
+def _rss_peak_mb():
+    # ru_maxrss: kilobyte di Linux, byte di macOS. Nilainya puncak sepanjang umur proses.
+    if resource is None:
+        return None
+    peak = resource.getrusage(resource.RUSAGE_SELF).ru_maxrss
+    return peak / (1024 * 1024) if sys.platform == "darwin" else peak / 1024
+
+
+class StageTimer:
+    """Catat setiap tahap pipeline sesuai urutan dijalankan.
+
+    ``timings`` berisi total detik per nama tahap; ``stages`` berisi satu
+    catatan per pemanggilan ``stage`` dengan ``waktu_detik``, ``cpu_detik``
+    (waktu CPU seluruh proses, termasuk thread lain), ``rss_maks_mb``
+    (puncak RSS proses sejauh ini) dan ``baris`` bila diisi pemanggil lewat
+    dict yang di-yield. Dengan ``trace_memory=True`` puncak alokasi Python
+    dan NumPy selama tahap itu dicatat sebagai ``memori_puncak_mb``
+    (tracemalloc memperlambat kode yang banyak membuat objek kecil).
+    """
+
+    def __init__(self, label=None, source="cli", trace_memory=False):
+        self.run_id = f"{time.strftime('%Y%m%d-%H%M%S')}-{uuid.uuid4().hex[:8]}"
+        self.started = time.strftime("%Y-%m-%d %H:%M:%S")
+        self.label = label
+        self.source = source
+        self.trace_memory = trace_memory
+        self.timings = {}
+        self.stages = []
+
+    @contextmanager
+    def stage(self, name, rows=None):
+        info = {"tahap": name}
+        if rows is not None:
+            info["baris"] = int(rows)
+        started_tracing = self.trace_memory and not tracemalloc.is_tracing()
+        if started_tracing:
+            tracemalloc.start()
+        if self.trace_memory:
+            tracemalloc.reset_peak()
+            traced_start = tracemalloc.get_traced_memory()[0]
+        start, cpu_start = time.perf_counter(), time.process_time()
+        try:
+            yield info
+        finally:
+            elapsed = time.perf_counter() - start
+            info["waktu_detik"] = elapsed
+            info["cpu_detik"] = time.process_time() - cpu_start
+            if self.trace_memory:
+                info["memori_puncak_mb"] = max(tracemalloc.get_traced_memory()[1] - traced_start, 0) / (1024 * 1024)
+                if started_tracing:
+                    tracemalloc.stop()
+            rss = _rss_peak_mb()
+            if rss is not None:
+                info["rss_maks_mb"] = rss
+            self.timings[name] = self.timings.get(name, 0.) + elapsed
+            self.stages.append(info)
+
+    def to_record(self):
+        """Catatan run siap-JSON untuk ``RunLog``."""
+        return {
+            "format": LOG_VERSION,
+            "id": self.run_id,
+            "mulai": self.started,
+            "sumber": self.source,
+            "keterangan": self.label,
+            "pid": os.getpid(),
+            "tahap": list(self.stages),
+            "total_detik": sum(self.timings.values()),
+        }
+
+
+class RunLog:
+    """Log run terakhir di ``directory``: satu file ``<id>.json`` per run.
+
+    ``save`` menulis (atau menimpa) catatan run secara atomik, sehingga run
+    yang masih berjalan dapat disimpan ulang setiap kali tahap baru selesai.
+    Hanya ``keep`` run yang paling baru diperbarui yang disimpan.
+    """
+
+    def __init__(self, directory, keep=50):
+        self.directory = directory
+        self.keep = keep
+
+    def save(self, record):
+        os.makedirs(self.directory, exist_ok=True)
+        fd, tmp_path = tempfile.mkstemp(dir=self.directory, suffix=".tmp")
+        try:
+            with os.fdopen(fd, "w", encoding="utf-8") as f:
+                json.dump(record, f, ensure_ascii=False)
+            os.replace(tmp_path, os.path.join(self.directory, f"{record['id']}.json"))
+        except BaseException:
+            if os.path.exists(tmp_path):
+                os.remove(tmp_path)
+            raise
+        self._prune()
+
+    def _entries(self):
+        entries = []
+        try:
+            with os.scandir(self.directory) as it:
+                for entry in it:
+                    if entry.name.endswith(".json"):
+                        try:
+                            entries.append((entry.stat().st_mtime, entry.path))
+                        except FileNotFoundError:
+                            continue
+        except FileNotFoundError:
+            return []
+        # Paling baru diperbarui lebih dulu.
+        return [path for _, path in sorted(entries, reverse=True)]
+
+    def recent(self, n=None):
+        """Hingga ``n`` catatan run terbaru (semua bila None), yang paling baru lebih dulu."""
+        records = []
+        for path in self._entries():
+            if n is not None and len(records) >= n:
+                break
+            try:
+                with open(path, encoding="utf-8") as f:
+                    record = json.load(f)
+            except (OSError, ValueError):
+                # Sedang dihapus proses lain atau rusak.
+                continue
+            if record.get("format") == LOG_VERSION:
+                records.append(record)
+        return records
+
+    def export_json(self, n=None):
+        return json.dumps(self.recent(n), ensure_ascii=False, indent=2)
+
+    def _prune(self):
+        for path in self._entries()[self.keep:]:
+            try:
+                os.remove(path)
+            except FileNotFoundError:
+                pass
+
+
+def stage_rows(records):
+    """Ratakan catatan run menjadi satu baris per tahap (untuk tabel), urut seperti ``records``."""
+    rows = []
+    for record in records:
+        for info in record["tahap"]:
+            rows.append({"run": record["id"], "mulai": record["mulai"], "sumber": record["sumber"],
+                         "keterangan": record["keterangan"], **info})
+    return rows
@@ -0,0 +1,70 @@
+"""Grafik profil klaster yang dirender sekali per versi profil dan disimpan sebagai bytes PNG.
+
+matplotlib dan seaborn baru diimpor saat grafik pertama dirender, sehingga
+label, nilai profil dan cache dapat dipakai tanpa memuat keduanya.
+"""
+
+import io
+import threading
+from collections import OrderedDict
+
+from klasterisasi.skema import CATEGORICAL_COLS, NUMERIC_COLS
+
+PROFILE_LABELS = ["Nilai (Norm)", "Hadir (Norm)"] + [c.replace("Ekstrakurikuler ", "Ekskul\n") for c in CATEGORICAL_COLS]
+
+
+def profile_values(profil, cluster):
+    """Rata-rata numerik ternormalisasi lalu modus flag (0/1) satu klaster, urut seperti PROFILE_LABELS."""
+    return (profil["rata_rata"].loc[cluster, NUMERIC_COLS].tolist()
+            + [int(profil["modus"].loc[cluster, col]) for col in CATEGORICAL_COLS])
+
+
+def render_profile_png(profil, cluster, palette="viridis", dpi=200):
+    import seaborn as sns
+    from matplotlib.figure import Figure
+
+    # Figure dibuat tanpa pyplot sehingga tidak terdaftar (dan tidak menumpuk) di state global matplotlib.
+    fig = Figure()
+    try:
+        ax = fig.subplots()
+        sns.barplot(x=PROFILE_LABELS, y=profile_values(profil, cluster), hue=PROFILE_LABELS, legend=False,
+                    ax=ax, palette=palette)
+        ax.set_ylabel("Rata-rata (Ternormalisasi / Biner)")
+        ax.set_title(f"Profil Rata-rata Klaster {cluster}")
+        fig.tight_layout()
+        buffer = io.BytesIO()
+        fig.savefig(buffer, format="png", dpi=dpi, bbox_inches="tight")
+        return buffer.getvalue()
+    finally:
+        fig.clear()
+
+
+class ChartCache:
+    """Cache LRU bytes grafik yang dibatasi total ukurannya, aman dipakai banyak thread.
+
+    ``get_or_render(key, render)`` memanggil ``render()`` hanya bila ``key``
+    belum ada. Kunci sebaiknya memuat versi profil klaster sehingga grafik
+    model lama tidak pernah terpakai lagi dan akhirnya tergusur.
+    """
+
+    def __init__(self, max_bytes=32 * 1024 * 1024):
+        self.max_bytes = max_bytes
+        self._entries = OrderedDict()
+        self._total = 0
+        self._lock = threading.Lock()
+
+    def get_or_render(self, key, render):
+        with self._lock:
+            if key in self._entries:
+                self._entries.move_to_end(key)
+                return self._entries[key]
+        # Dirender di luar lock; dua sesi yang merender grafik yang sama bersamaan hanya membuang sedikit kerja.
+        data = render()
+        with self._lock:
+            if key not in self._entries:
+                self._entries[key] = data
+                self._total += len(data)
+            while self._total > self.max_bytes and len(self._entries) > 1:
+                _, old = self._entries.popitem(last=False)
+                self._total -= len(old)
+        return data
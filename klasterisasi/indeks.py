@@ -0,0 +1,54 @@
+"""Indeks pencarian siswa yang dibangun sekali setelah klasterisasi."""
+
+import numpy as np
+
+
+class StudentIndex:
+    """Posisi baris per siswa, per Klaster dan per Kelas pada tabel hasil klasterisasi.
+
+    Siswa dikenali dengan kolom "No" bila kolom itu ada dan unik (nama bisa
+    kembar), dan dengan posisi baris bila tidak. ``keys`` dan ``label``
+    disiapkan untuk selectbox: nama yang kembar diberi keterangan No-nya.
+    """
+
+    def __init__(self, df):
+        n_rows = len(df)
+        if "No" in df.columns and df["No"].notna().all() and df["No"].is_unique:
+            self.keys = df["No"].tolist()
+        else:
+            self.keys = list(range(n_rows))
+        self._position = dict(zip(self.keys, range(n_rows)))
+
+        names = df["Nama"].astype(str).tolist() if "Nama" in df.columns else [str(key) for key in self.keys]
+        counts = {}
+        for name in names:
+            counts[name] = counts.get(name, 0) + 1
+        self._label = {key: (name if counts[name] == 1 else f"{name} (No {key})")
+                       for key, name in zip(self.keys, names)}
+
+        self.by_cluster = self._group_positions(df, "Klaster")
+        self.by_class = self._group_positions(df, "Kelas")
+
+    @staticmethod
+    def _group_positions(df, col):
+        if col not in df.columns:
+            return {}
+        # groupby.indices memberi posisi baris (bukan label index) per nilai dalam satu lintasan.
+        return {value: positions.astype(np.intp)
+                for value, positions in df.groupby(col, observed=True, sort=True).indices.items()}
+
+    def label(self, key):
+        return self._label[key]
+
+    def position(self, key):
+        return self._position[key]
+
+    def cluster_members(self, cluster, exclude=None):
+        members = self.by_cluster.get(cluster, np.empty(0, dtype=np.intp))
+        return members if exclude is None else members[members != exclude]
+
+    def positions_for(self, col, values):
+        """Posisi baris (terurut) yang nilai ``col`` ("Klaster" atau "Kelas") ada di ``values``."""
+        groups = self.by_cluster if col == "Klaster" else self.by_class
+        parts = [groups[value] for value in values if value in groups]
+        return np.sort(np.concatenate(parts)) if parts else np.empty(0, dtype=np.intp)
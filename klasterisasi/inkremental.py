@@ -0,0 +1,243 @@
+"""Klasterisasi ulang inkremental saat data siswa diunggah ulang dengan sedikit perubahan.
+
+Data baru dibandingkan dengan data sebelumnya berdasarkan kolom "No".
+Statistik scaler diperbarui hanya dengan baris yang ditambah, dihapus atau
+berubah. Siswa yang tidak berubah memulai dari klaster lamanya; hanya
+siswa baru/berubah yang dihitung jaraknya ke centroid lama, lalu
+K-Prototypes dilanjutkan dengan batas jarak (``kprototypes_resume``)
+sehingga jarak ke semua centroid hanya dihitung untuk siswa yang mungkin
+berpindah. Bila perubahannya besar, semua siswa ditetapkan ulang dari
+centroid lama seperti klasterisasi penuh.
+"""
+
+import numpy as np
+import pandas as pd
+from sklearn.preprocessing import StandardScaler
+
+from klasterisasi.kprototypes import KPrototypes, kprototypes_resume, kprototypes_single, labels_cost
+from klasterisasi.pipeline import attach_labels
+from klasterisasi.prediksi import transform_features
+from klasterisasi.skema import (ALL_FEATURES_FOR_CLUSTERING, CATEGORICAL_COLS, FLAG_DTYPE, NUMERIC_COLS,
+                                NUMERIC_DTYPE, categorical_as_str, compact_students)
+
+# Proporsi siswa yang ditambah/dihapus/berubah di atas batas ini: semua siswa ditetapkan ulang dari centroid lama.
+INCREMENTAL_MAX_CHANGE = 0.3
+
+
+class ScalerStats:
+    """Statistik ``StandardScaler`` per kolom yang dapat ditambah dan dikurangi per baris.
+
+    Disimpan jumlah nilai terisi, rata-rata dan M2 (jumlah kuadrat selisih
+    dari rata-rata), digabung dengan rumus Chan. Nilai kosong tidak ikut
+    dihitung; karena praproses mengisinya dengan rata-rata, variansnya adalah
+    M2 / jumlah baris, sama seperti scaler yang di-fit ulang dari awal.
+    """
+
+    def __init__(self, n_features):
+        self.n_rows = 0
+        self.count = np.zeros(n_features)
+        self.mean = np.zeros(n_features)
+        self.m2 = np.zeros(n_features)
+
+    @classmethod
+    def from_frame(cls, df, columns=NUMERIC_COLS):
+        return cls(len(columns)).add_frame(df, columns)
+
+    def add_frame(self, df, columns=NUMERIC_COLS):
+        # Nilai yang bukan angka dianggap kosong, seperti pada praproses.
+        return self.add(_numeric_values(df, columns))
+
+    def copy(self):
+        other = ScalerStats(self.mean.size)
+        other.n_rows, other.count, other.mean, other.m2 = self.n_rows, self.count.copy(), self.mean.copy(), self.m2.copy()
+        return other
+
+    @staticmethod
+    def _summary(values):
+        valid = ~np.isnan(values)
+        count = valid.sum(axis=0).astype(np.float64)
+        total = np.where(valid, values, 0.).sum(axis=0)
+        mean = np.divide(total, count, out=np.zeros_like(total), where=count > 0)
+        m2 = np.square(np.where(valid, values - mean, 0.)).sum(axis=0)
+        return count, mean, m2
+
+    def add(self, values):
+        values = np.asarray(values, dtype=np.float64).reshape(-1, self.mean.size)
+        count, mean, m2 = self._summary(values)
+        total = self.count + count
+        delta = mean - self.mean
+        weight = np.divide(count, total, out=np.zeros_like(total), where=total > 0)
+        self.m2 = self.m2 + m2 + np.square(delta) * self.count * weight
+        self.mean = self.mean + delta * weight
+        self.count = total
+        self.n_rows += values.shape[0]
+        return self
+
+    def remove(self, values):
+        values = np.asarray(values, dtype=np.float64).reshape(-1, self.mean.size)
+        count, mean, m2 = self._summary(values)
+        rest = self.count - count
+        rest_mean = np.divide(self.count * self.mean - count * mean, rest, out=np.zeros_like(rest), where=rest > 0)
+        delta = mean - rest_mean
+        weight = np.divide(rest * count, self.count, out=np.zeros_like(rest), where=self.count > 0)
+        # Pembulatan bisa membuat M2 sedikit negatif saat hampir semua baris dihapus.
+        self.m2 = np.maximum(self.m2 - m2 - np.square(delta) * weight, 0.)
+        self.mean = rest_mean
+        self.count = rest
+        self.n_rows -= values.shape[0]
+        return self
+
+    def to_scaler(self, feature_names=NUMERIC_COLS):
+        scaler = StandardScaler()
+        scaler.n_features_in_ = self.mean.size
+        scaler.feature_names_in_ = np.asarray(feature_names, dtype=object)
+        scaler.n_samples_seen_ = self.n_rows
+        scaler.mean_ = self.mean.copy()
+        scaler.var_ = self.m2 / max(self.n_rows, 1)
+        scale = np.sqrt(scaler.var_)
+        # Seperti sklearn: kolom konstan tidak dibagi nol.
+        scaler.scale_ = np.where(scale < 10 * np.finfo(np.float64).eps, 1., scale)
+        return scaler
+
+
+def _numeric_values(df, columns=NUMERIC_COLS):
+    return df[columns].apply(pd.to_numeric, errors="coerce").to_numpy(dtype=np.float64)
+
+
+def _flag_values(df):
+    if all(df[col].dtype == FLAG_DTYPE for col in CATEGORICAL_COLS):
+        return df[CATEGORICAL_COLS].to_numpy()
+    return np.column_stack([categorical_as_str(df[col]).to_numpy() for col in CATEGORICAL_COLS])
+
+
+def diff_students(df_old, df_new, key="No"):
+    """Bandingkan dua tabel siswa berdasarkan ``key``.
+
+    Mengembalikan dict berisi posisi baris: ``tambah`` (hanya di data baru),
+    ``hapus`` (hanya di data lama), serta pasangan ``ubah_lama``/``ubah_baru``
+    dan ``tetap_lama``/``tetap_baru`` untuk siswa yang fiturnya berubah atau
+    tidak. Melempar ValueError bila ``key`` tidak ada, kosong, atau tidak unik.
+    """
+    for name, df in (("lama", df_old), ("baru", df_new)):
+        if key not in df.columns or df[key].isna().any() or not df[key].is_unique:
+            raise ValueError(f"Kolom '{key}' pada data {name} harus ada, terisi, dan unik.")
+
+    old_pos = pd.Index(df_old[key]).get_indexer(df_new[key])
+    added = old_pos < 0
+    new_matched = np.flatnonzero(~added)
+    old_matched = old_pos[~added]
+    removed = np.setdiff1d(np.arange(len(df_old)), old_matched)
+
+    num_old = _numeric_values(df_old.iloc[old_matched])
+    num_new = _numeric_values(df_new.iloc[new_matched])
+    same_num = (num_old == num_new) | (np.isnan(num_old) & np.isnan(num_new))
+    flags_old = _flag_values(compact_students(df_old.iloc[old_matched][CATEGORICAL_COLS]))
+    flags_new = _flag_values(compact_students(df_new.iloc[new_matched][CATEGORICAL_COLS]))
+    if flags_old.dtype != flags_new.dtype:
+        flags_old, flags_new = flags_old.astype(str), flags_new.astype(str)
+    changed = ~(same_num.all(axis=1) & (flags_old == flags_new).all(axis=1))
+
+    return {
+        "tambah": np.flatnonzero(added),
+        "hapus": removed,
+        "ubah_lama": old_matched[changed],
+        "ubah_baru": new_matched[changed],
+        "tetap_lama": old_matched[~changed],
+        "tetap_baru": new_matched[~changed],
+    }
+
+
+def recluster_incremental(previous, df_new, max_iter=100):
+    """Klasterisasi ulang ``df_new`` mulai dari hasil klasterisasi sebelumnya.
+
+    ``previous`` adalah dict berisi ``df`` (data lama dengan kolom Klaster),
+    ``model`` (KPrototypes ter-fit), ``scaler`` dan ``stats`` (ScalerStats
+    data lama). K dan gamma sama dengan model lama, dan nomor klaster tetap
+    sejalan dengan hasil sebelumnya. Siswa yang tidak berubah memulai dari
+    label lamanya; bila proporsi perubahan melebihi
+    ``INCREMENTAL_MAX_CHANGE`` semua siswa ditetapkan ulang ke centroid lama
+    terdekat terlebih dahulu. Mengembalikan dict berisi data
+    ternormalisasi berlabel, model, scaler, stats, ringkasan perubahan dan
+    tabel siswa yang berpindah klaster. Melempar ValueError bila data tidak
+    dapat diproses secara inkremental (kolom No tidak unik, kategori baru,
+    atau ada klaster yang menjadi kosong); jalankan klasterisasi penuh.
+    """
+    df_old, old_model, old_scaler = previous["df"], previous["model"], previous["scaler"]
+    df_new = compact_students(df_new)
+    missing_cols = [col for col in ALL_FEATURES_FOR_CLUSTERING if col not in df_new.columns]
+    if missing_cols:
+        raise ValueError(f"Kolom-kolom berikut tidak ditemukan: {', '.join(missing_cols)}.")
+    diff = diff_students(df_old, df_new)
+
+    # Statistik scaler: kurangi baris lama yang hilang/berubah, tambah baris baru/berubah.
+    stats = previous["stats"].copy()
+    stats.remove(_numeric_values(df_old.iloc[np.concatenate([diff["hapus"], diff["ubah_lama"]])]))
+    stats.add(_numeric_values(df_new.iloc[np.concatenate([diff["tambah"], diff["ubah_baru"]])]))
+    scaler = stats.to_scaler()
+
+    warnings = []
+    for col, n_valid, mean_val in zip(NUMERIC_COLS, stats.count, stats.mean):
+        if n_valid < stats.n_rows:
+            warnings.append(f"Nilai kosong pada kolom '{col}' diisi dengan rata-rata: {mean_val:.2f}.")
+
+    Xnum, Xcat = transform_features(df_new, scaler, old_model, NUMERIC_COLS, CATEGORICAL_COLS)
+    if (Xcat == np.iinfo(Xcat.dtype).max).any():
+        raise ValueError("Data baru berisi kategori ekstrakurikuler yang belum dikenal model.")
+
+    # Centroid numerik lama dipetakan ke skala baru: nilai asli tetap, hanya normalisasinya yang bergeser.
+    centroids_raw = old_model._centroids_num * np.asarray(old_scaler.scale_) + np.asarray(old_scaler.mean_)
+    init = [(centroids_raw - scaler.mean_) / scaler.scale_, old_model._centroids_cat]
+    n_clusters = old_model.n_clusters
+    n_categories = max(len(c) for c in old_model._enc_map)
+    fresh = np.concatenate([diff["tambah"], diff["ubah_baru"]])
+    full = len(fresh) + len(diff["hapus"]) > INCREMENTAL_MAX_CHANGE * max(len(df_new), 1)
+    try:
+        if full:
+            result = kprototypes_single(Xnum, Xcat, n_clusters, max_iter, old_model.gamma, init, 0, n_categories)
+        else:
+            memb = np.empty(len(df_new), dtype=np.intp)
+            memb[diff["tetap_baru"]] = df_old["Klaster"].to_numpy()[diff["tetap_lama"]]
+            memb[fresh] = labels_cost(Xnum[fresh], Xcat[fresh], init[0], init[1], old_model.gamma)[0]
+            result = kprototypes_resume(Xnum, Xcat, memb, n_clusters, max_iter, old_model.gamma, 0, n_categories)
+    except ValueError:
+        raise ValueError("Salah satu klaster lama tidak lagi memiliki anggota.") from None
+
+    model = KPrototypes(n_clusters=n_clusters, max_iter=max_iter, init=old_model.init, n_init=old_model.n_init,
+                        random_state=old_model.random_state, n_jobs=old_model.n_jobs, backend=old_model.backend)
+    model.set_result(result, old_model.gamma, old_model._enc_map)
+
+    df_preprocessed = pd.DataFrame(
+        {**{col: Xnum[:, i].astype(NUMERIC_DTYPE) for i, col in enumerate(NUMERIC_COLS)},
+         **{col: df_new[col] for col in CATEGORICAL_COLS}},
+        index=df_new.index)
+
+    old_pos = np.concatenate([diff["ubah_lama"], diff["tetap_lama"]])
+    new_pos = np.concatenate([diff["ubah_baru"], diff["tetap_baru"]])
+    old_labels = df_old["Klaster"].to_numpy()[old_pos]
+    new_labels = model.labels_[new_pos]
+    moved = old_labels != new_labels
+    id_cols = [col for col in ("No", "Nama", "Kelas") if col in df_new.columns]
+    df_moved = df_new.iloc[new_pos[moved]][id_cols].assign(**{
+        "Klaster Lama": old_labels[moved],
+        "Klaster Baru": new_labels[moved],
+        "Data Berubah": np.isin(new_pos[moved], diff["ubah_baru"]),
+    })
+
+    return {
+        "df_clustered_normalized": attach_labels(df_preprocessed, model.labels_, n_clusters),
+        "model": model,
+        "scaler": scaler,
+        "stats": stats,
+        "categorical_indices": [ALL_FEATURES_FOR_CLUSTERING.index(c) for c in CATEGORICAL_COLS],
+        "warnings": warnings,
+        "ringkasan": {
+            "tambah": len(diff["tambah"]),
+            "hapus": len(diff["hapus"]),
+            "ubah": len(diff["ubah_baru"]),
+            "tetap": len(diff["tetap_baru"]),
+            "pindah_klaster": int(moved.sum()),
+            "iterasi": int(model.n_iter_),
+            "mode": "penuh" if full else "inkremental",
+        },
+        "pindah": df_moved,
+    }
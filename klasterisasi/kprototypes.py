@@ -0,0 +1,743 @@
+"""Mesin K-Prototypes berbasis NumPy untuk data campuran numerik dan kategorikal.
+
+Algoritma mengikuti ``kmodes.kprototypes.KPrototypes`` (inisialisasi Huang/Cao,
+pembaruan centroid per titik, pemilihan run terbaik berdasarkan cost) sehingga
+partisi yang dihasilkan sama untuk seed yang sama. Bedanya, fitur numerik
+disimpan sebagai matriks float64 dan fitur kategorikal sebagai kode uint8,
+lalu jarak campuran (Euclidean kuadrat + gamma * Hamming) dihitung untuk
+banyak titik sekaligus dengan operasi NumPy. Bila semua atribut kategorikal
+berupa flag 0/1, jarak Hamming dihitung atas bitset uint64 (XOR + popcount)
+sehingga biayanya hampir tidak bertambah dengan jumlah flag.
+"""
+
+import numpy as np
+
+from klasterisasi.paralel import progress_callback, run_parallel
+
+# Batas percobaan inisialisasi (sama dengan kmodes).
+MAX_INIT_TRIES = 20
+RAISE_INIT_TRIES = 100
+
+# Ukuran blok baris saat menghitung jarak secara batch.
+CHUNK_ROWS = 65536
+BLOCK_MIN = 64
+BLOCK_MAX = 65536
+
+# Kelonggaran relatif saat membandingkan batas jarak, untuk galat pembulatan akumulator pergeseran.
+BOUND_SLACK = 1e-9
+# Blok yang lebih kecil dihitung langsung: overhead memeriksa batas lebih mahal dari jaraknya.
+BOUND_MIN_ROWS = 256
+
+# Field SharedProgress yang diisi setiap restart (lihat kprototypes_single).
+MONITOR_FIELDS = ("mulai", "iterasi", "cost", "selesai")
+
+# Flag 0/1 dipaketkan per 64 atribut ke satu word (lihat pack_flags).
+BITSET_DTYPE = np.uint64
+WORD_BITS = 64
+
+if hasattr(np, "bitwise_count"):
+    popcount = np.bitwise_count
+else:
+    _POPCOUNT8 = np.array([bin(i).count("1") for i in range(256)], dtype=np.uint8)
+
+    def popcount(words):
+        # NumPy < 2.0 belum punya bitwise_count: jumlah bit per byte dari tabel.
+        words = np.ascontiguousarray(words)
+        return _POPCOUNT8[words.view(np.uint8)].reshape(words.shape + (-1,)).sum(axis=-1, dtype=np.uint8)
+
+
+def check_random_state(seed):
+    if seed is None or seed is np.random:
+        return np.random.mtrand._rand
+    if isinstance(seed, (int, np.integer)):
+        return np.random.RandomState(seed)
+    if isinstance(seed, np.random.RandomState):
+        return seed
+    raise ValueError(f"{seed!r} tidak dapat dipakai sebagai random_state.")
+
+
+def split_num_cat(X, categorical):
+    X = X.values if hasattr(X, "iloc") else np.asarray(X)
+    if isinstance(categorical, (int, np.integer)):
+        categorical = [categorical]
+    categorical = list(categorical)
+    num_idx = [ii for ii in range(X.shape[1]) if ii not in categorical]
+    Xnum = np.ascontiguousarray(X[:, num_idx], dtype=np.float64)
+    Xcat = np.asarray(X[:, categorical])
+    return Xnum, Xcat
+
+
+def column_stats(Xnum):
+    # Dihitung per kolom yang bersebelahan di memori (urutan Fortran, seperti
+    # matriks numerik di kmodes) agar hasil penjumlahannya identik.
+    Xnum = np.asfortranarray(Xnum)
+    return np.mean(Xnum, axis=0), np.std(Xnum, axis=0)
+
+
+def estimate_gamma(Xnum):
+    return 0.5 * np.mean(column_stats(Xnum)[1])
+
+
+def _code_dtype(n_categories):
+    # Satu nilai disisakan sebagai penanda kategori yang tidak dikenal.
+    return np.uint8 if n_categories < np.iinfo(np.uint8).max else np.uint16
+
+
+def encode_categorical(Xcat, enc_map=None):
+    """Ubah nilai kategorikal menjadi kode bilangan bulat kecil per kolom.
+
+    ``enc_map`` berisi array nilai unik (terurut) per kolom. Saat prediksi,
+    nilai yang tidak dikenal diberi kode penanda yang tidak pernah sama
+    dengan centroid mana pun.
+    """
+    n_points, n_attrs = Xcat.shape
+    if enc_map is None:
+        enc_map = []
+        columns = []
+        for iattr in range(n_attrs):
+            if Xcat.dtype == np.uint8:
+                # Flag uint8: kategori dari bincount, tanpa pengurutan per kolom (hasil sama dengan np.unique).
+                categories = np.flatnonzero(np.bincount(Xcat[:, iattr], minlength=256)).astype(np.uint8)
+                lookup = np.zeros(256, dtype=np.intp)
+                lookup[categories] = np.arange(len(categories))
+                codes = lookup[Xcat[:, iattr]]
+            else:
+                categories, codes = np.unique(Xcat[:, iattr], return_inverse=True)
+            enc_map.append(categories)
+            columns.append(codes)
+        dtype = _code_dtype(max(len(c) for c in enc_map))
+        Xenc = np.empty((n_points, n_attrs), dtype=dtype)
+        for iattr, codes in enumerate(columns):
+            Xenc[:, iattr] = codes.reshape(-1)
+        return Xenc, enc_map
+
+    dtype = _code_dtype(max(len(c) for c in enc_map))
+    unknown = np.iinfo(dtype).max
+    Xenc = np.empty((n_points, n_attrs), dtype=dtype)
+    for iattr, categories in enumerate(enc_map):
+        values = Xcat[:, iattr]
+        try:
+            pos = np.searchsorted(categories, values).clip(0, len(categories) - 1)
+            known = categories[pos] == values
+            Xenc[:, iattr] = np.where(known, pos, unknown)
+        except TypeError:
+            # Tipe nilai berbeda dengan saat fit (mis. int vs str).
+            lookup = {val: code for code, val in enumerate(categories)}
+            Xenc[:, iattr] = np.fromiter((lookup.get(val, unknown) for val in values),
+                                         dtype=dtype, count=n_points)
+    return Xenc, enc_map
+
+
+def decode_categorical(codes, enc_map):
+    return np.column_stack([enc_map[iattr][codes[:, iattr]] for iattr in range(codes.shape[1])])
+
+
+def pack_flags(codes):
+    """Paketkan kode 0/1 bentuk (n_points, n_attrs) menjadi bitset (n_points, ceil(n_attrs / 64)) uint64.
+
+    Bit ke-i word ke-j adalah atribut ``64 * j + i``; bit sisa di word
+    terakhir selalu 0 sehingga tidak memengaruhi jarak Hamming.
+    """
+    n_points, n_attrs = codes.shape
+    n_words = -(-n_attrs // WORD_BITS)
+    packed = np.packbits(codes, axis=1, bitorder="little")
+    words = np.zeros((n_points, n_words * np.dtype(BITSET_DTYPE).itemsize), dtype=np.uint8)
+    words[:, :packed.shape[1]] = packed
+    return words.view(BITSET_DTYPE)
+
+
+def hamming(Xcat, centroids_cat):
+    """Jarak Hamming setiap baris ke setiap centroid, bentuk (n_points, n_clusters).
+
+    Kode kategori dibandingkan per atribut; bitset (``pack_flags``) lewat
+    XOR + popcount per word.
+    """
+    if Xcat.dtype == BITSET_DTYPE:
+        # Dijumlahkan per word: tanpa array perantara (n_points, n_clusters, n_words).
+        dist = popcount(Xcat[:, :1] ^ centroids_cat[:, 0]).astype(np.intp)
+        for iword in range(1, Xcat.shape[1]):
+            dist += popcount(Xcat[:, iword:iword + 1] ^ centroids_cat[:, iword])
+        return dist
+    return (Xcat[:, None, :] != centroids_cat[None, :, :]).sum(axis=2, dtype=np.intp)
+
+
+def hamming_rows(Xcat, centroids_cat):
+    """Jarak Hamming baris ke baris yang bersesuaian, bentuk (n_points,)."""
+    diff = popcount(Xcat ^ centroids_cat) if Xcat.dtype == BITSET_DTYPE else Xcat != centroids_cat
+    return diff.sum(axis=1, dtype=np.intp)
+
+
+def dissim_parts(Xnum, Xcat, centroids_num, centroids_cat):
+    """Euclidean kuadrat bagian numerik dan Hamming bagian kategorikal, masing-masing (n_points, n_clusters).
+
+    ``Xcat`` dan ``centroids_cat`` berupa kode kategori atau keduanya bitset ``pack_flags``.
+    """
+    num = ((Xnum[:, None, :] - centroids_num[None, :, :]) ** 2).sum(axis=2)
+    return num, hamming(Xcat, centroids_cat)
+
+
+def mixed_dissim(Xnum, Xcat, centroids_num, centroids_cat, gamma):
+    """Jarak campuran semua titik ke semua centroid, bentuk (n_points, n_clusters)."""
+    num, cat = dissim_parts(Xnum, Xcat, centroids_num, centroids_cat)
+    return num + gamma * cat
+
+
+class AssignBounds:
+    """Batas jarak per titik untuk melewati titik yang pasti tetap di klasternya.
+
+    Jarak campuran d = e^2 + gamma * h, dengan e jarak Euclidean bagian
+    numerik dan h jarak Hamming; keduanya metrik, jadi bila centroid
+    bergeser sejauh (de, dh), e dan h ke centroid itu berubah paling banyak
+    de dan dh. Seperti Hamerly, setiap titik menyimpan batas atas e dan h ke
+    centroid klasternya dan batas bawah (minimum masing-masing) ke centroid
+    lain. Pergeseran centroid sejak sinkronisasi terakhir dijumlahkan per
+    klaster (untuk batas atas) dan sebagai total pergeseran terbesar (untuk
+    batas bawah) oleh ``sync``, sehingga perpindahan satu titik tidak
+    memperbarui batas semua titik. Titik hanya dilewati bila batas atas
+    jaraknya ke centroid sendiri lebih kecil dari batas bawah ke semua
+    centroid lain, jadi argmin-nya sama dengan menghitung semua jarak.
+
+    ``sync`` harus dipanggil dengan centroid terkini sebelum ``uncertain``
+    atau ``tighten``; titik yang klasternya berubah di luar pemeriksaan
+    batas harus di-``invalidate``. ``evaluated`` menghitung pasangan
+    titik-centroid yang jaraknya dihitung lewat objek ini.
+    """
+
+    def __init__(self, n_points, centroids_num, centroids_cat):
+        # Batas atas disimpan dikurangi drift klaster saat dihitung, batas bawah ditambah total drift.
+        self.upper_e = np.full(n_points, np.inf)
+        self.upper_h = np.full(n_points, np.inf)
+        self.lower_e = np.full(n_points, -np.inf)
+        self.lower_h = np.full(n_points, -np.inf)
+        self.drift_e = np.zeros(centroids_num.shape[0])
+        self.drift_h = np.zeros(centroids_num.shape[0])
+        self.total_e = 0.
+        self.total_h = 0.
+        self.evaluated = 0
+        self._ref_num = centroids_num.copy()
+        self._ref_cat = centroids_cat.copy()
+
+    def sync(self, centroids_num, centroids_cat):
+        """Catat pergeseran centroid sejak ``sync`` sebelumnya."""
+        de = np.sqrt(((centroids_num - self._ref_num) ** 2).sum(axis=1))
+        dh = hamming_rows(centroids_cat, self._ref_cat)
+        if de.any() or dh.any():
+            self.drift_e += de
+            self.drift_h += dh
+            self.total_e += de.max()
+            self.total_h += dh.max()
+            self._ref_num[...] = centroids_num
+            self._ref_cat[...] = centroids_cat
+
+    def uncertain(self, start, stop, memb, gamma):
+        """Mask titik ``start:stop`` yang mungkin lebih dekat ke centroid lain dan harus dihitung."""
+        own = memb[start:stop]
+        upper_e = self.upper_e[start:stop] + self.drift_e[own]
+        upper_e += BOUND_SLACK * (1. + upper_e)
+        upper_h = self.upper_h[start:stop] + self.drift_h[own]
+        lower_e = self.lower_e[start:stop] - self.total_e
+        lower_e = np.maximum(lower_e - BOUND_SLACK * (1. + np.abs(lower_e) + self.total_e), 0.)
+        lower_h = np.maximum(self.lower_h[start:stop] - self.total_h, 0.)
+        return (upper_e * upper_e + gamma * upper_h) * (1. + BOUND_SLACK) >= lower_e * lower_e + gamma * lower_h
+
+    @classmethod
+    def from_separation(cls, Xnum, Xcat, memb, centroids_num, centroids_cat):
+        """Batas awal dari jarak setiap titik ke centroid klasternya saja.
+
+        Seperti Elkan: untuk titik x di klaster a dan centroid lain b,
+        e(x, b) >= e(c_a, c_b) - e(x, a) (begitu pula h), jadi batas bawah
+        diambil dari jarak antarcentroid terdekat dikurangi jarak ke centroid
+        sendiri. Dipakai saat keanggotaan sudah diketahui (mis. label hasil
+        sebelumnya) sehingga titik yang jelas berada di tengah klasternya
+        tidak perlu dihitung jaraknya ke semua centroid.
+        """
+        n_points = Xnum.shape[0]
+        bounds = cls(n_points, centroids_num, centroids_cat)
+        sep_e = np.sqrt(((centroids_num[:, None, :] - centroids_num[None, :, :]) ** 2).sum(axis=2))
+        sep_h = hamming(centroids_cat, centroids_cat).astype(np.float64)
+        np.fill_diagonal(sep_e, np.inf)
+        np.fill_diagonal(sep_h, np.inf)
+        sep_e, sep_h = sep_e.min(axis=1), sep_h.min(axis=1)
+        for start in range(0, n_points, CHUNK_ROWS):
+            stop = min(start + CHUNK_ROWS, n_points)
+            own = memb[start:stop]
+            e = np.sqrt(((Xnum[start:stop] - centroids_num[own]) ** 2).sum(axis=1))
+            h = hamming_rows(Xcat[start:stop], centroids_cat[own]).astype(np.float64)
+            bounds.upper_e[start:stop], bounds.upper_h[start:stop] = e, h
+            bounds.lower_e[start:stop], bounds.lower_h[start:stop] = sep_e[own] - e, sep_h[own] - h
+        bounds.evaluated += n_points
+        return bounds
+
+    def tighten(self, idx, num, cat, memb):
+        """Perbarui batas titik ``idx`` dari jarak lengkapnya (hasil ``dissim_parts``)."""
+        self.evaluated += num.size
+        rows = np.arange(len(idx))
+        own = memb[idx]
+        e, h = np.sqrt(num), cat.astype(np.float64)
+        self.upper_e[idx] = e[rows, own] - self.drift_e[own]
+        self.upper_h[idx] = h[rows, own] - self.drift_h[own]
+        e[rows, own] = np.inf
+        h[rows, own] = np.inf
+        self.lower_e[idx] = e.min(axis=1) + self.total_e
+        self.lower_h[idx] = h.min(axis=1) + self.total_h
+
+    def tighten_upper(self, idx, num_own, cat_own, own):
+        """Perbarui batas atas titik ``idx`` dari jarak ke centroid klasternya saja."""
+        self.evaluated += len(idx)
+        self.upper_e[idx] = np.sqrt(num_own) - self.drift_e[own]
+        self.upper_h[idx] = cat_own - self.drift_h[own]
+
+    def invalidate(self, idx):
+        self.upper_e[idx] = np.inf
+
+
+def labels_cost(Xnum, Xcat, centroids_num, centroids_cat, gamma, memb=None, bounds=None):
+    """Label centroid terdekat dan total cost.
+
+    Dengan ``bounds`` (``AssignBounds`` untuk keanggotaan ``memb``), titik
+    yang pasti tetap di klasternya hanya dihitung jaraknya ke centroid
+    sendiri; hasilnya sama dengan menghitung semua jarak.
+    """
+    if bounds is not None:
+        return _labels_cost_bounded(Xnum, Xcat, centroids_num, centroids_cat, gamma, memb, bounds)
+    n_points = Xnum.shape[0]
+    labels = np.empty(n_points, dtype=np.uint16)
+    min_costs = np.empty(n_points, dtype=np.float64)
+    for start in range(0, n_points, CHUNK_ROWS):
+        stop = min(start + CHUNK_ROWS, n_points)
+        dist = mixed_dissim(Xnum[start:stop], Xcat[start:stop], centroids_num, centroids_cat, gamma)
+        best = dist.argmin(axis=1)
+        labels[start:stop] = best
+        min_costs[start:stop] = dist[np.arange(stop - start), best]
+    # Dijumlahkan berurutan (bukan pairwise) agar cost identik dengan kmodes.
+    cost = np.add.accumulate(min_costs)[-1] if n_points else 0.
+    return labels, cost
+
+
+def _labels_cost_bounded(Xnum, Xcat, centroids_num, centroids_cat, gamma, memb, bounds):
+    n_points = Xnum.shape[0]
+    labels = np.empty(n_points, dtype=np.uint16)
+    min_costs = np.empty(n_points, dtype=np.float64)
+    bounds.sync(centroids_num, centroids_cat)
+    for start in range(0, n_points, CHUNK_ROWS):
+        stop = min(start + CHUNK_ROWS, n_points)
+        uncertain = bounds.uncertain(start, stop, memb, gamma)
+        labels[start:stop] = memb[start:stop]
+
+        idx = start + np.flatnonzero(~uncertain)
+        if idx.size:
+            own = memb[idx]
+            num_own = ((Xnum[idx] - centroids_num[own]) ** 2).sum(axis=1)
+            cat_own = hamming_rows(Xcat[idx], centroids_cat[own])
+            min_costs[idx] = num_own + gamma * cat_own
+            bounds.tighten_upper(idx, num_own, cat_own, own)
+
+        idx = start + np.flatnonzero(uncertain)
+        if idx.size:
+            num, cat = dissim_parts(Xnum[idx], Xcat[idx], centroids_num, centroids_cat)
+            dist = num + gamma * cat
+            best = dist.argmin(axis=1)
+            labels[idx] = best
+            min_costs[idx] = dist[np.arange(idx.size), best]
+            bounds.tighten(idx, num, cat, memb)
+    cost = np.add.accumulate(min_costs)[-1] if n_points else 0.
+    return labels, cost
+
+
+def init_huang(Xcat, n_clusters, random_state):
+    n_attrs = Xcat.shape[1]
+    centroids = np.empty((n_clusters, n_attrs), dtype=Xcat.dtype)
+    for iattr in range(n_attrs):
+        # Sampling sesuai frekuensi nilai atribut (Huang [1997]).
+        centroids[:, iattr] = random_state.choice(np.sort(Xcat[:, iattr]), n_clusters)
+    # Centroid yang disampling bisa menghasilkan klaster kosong, jadi ganti
+    # dengan titik terdekat yang belum dipakai centroid lain.
+    for ik in range(n_clusters):
+        ndx = np.argsort(np.sum(Xcat != centroids[ik], axis=1))
+        taken = (Xcat[ndx][:, None, :] == centroids[None, :, :]).all(axis=2).any(axis=1)
+        free = np.flatnonzero(~taken)
+        first = free[0] if free.size else ndx.shape[0] - 1
+        centroids[ik] = Xcat[ndx[min(first, ndx.shape[0] - 1)]]
+    return centroids
+
+
+def init_cao(Xcat, n_clusters):
+    n_points, n_attrs = Xcat.shape
+    centroids = np.empty((n_clusters, n_attrs), dtype=Xcat.dtype)
+    dens = np.zeros(n_points)
+    for iattr in range(n_attrs):
+        _, inverse, counts = np.unique(Xcat[:, iattr], return_inverse=True, return_counts=True)
+        dens += counts[inverse.reshape(-1)] / float(n_points) / float(n_attrs)
+    centroids[0] = Xcat[np.argmax(dens)]
+    for ik in range(1, n_clusters):
+        dd = np.empty((ik, n_points))
+        for ikk in range(ik):
+            dd[ikk] = np.sum(Xcat != centroids[ikk], axis=1) * dens
+        centroids[ik] = Xcat[np.argmax(np.min(dd, axis=0))]
+    return centroids
+
+
+def _category_counts(Xcat, labels, n_clusters, n_categories):
+    # freq[k, atribut, kode] = banyaknya titik di klaster k dengan kode tersebut.
+    n_attrs = Xcat.shape[1]
+    freq = np.zeros((n_clusters, n_attrs, n_categories), dtype=np.int64)
+    for iattr in range(n_attrs):
+        flat = np.bincount(labels * n_categories + Xcat[:, iattr],
+                           minlength=n_clusters * n_categories)
+        freq[:, iattr, :] = flat.reshape(n_clusters, n_categories)
+    return freq
+
+
+def _move_point(ipoint, to_clust, from_clust, Xnum, Xcat, memb, cl_attr_sum,
+                cl_memb_sum, cl_attr_freq, centroids_cat, centroids_bits=None):
+    point_num = Xnum[ipoint]
+    cl_attr_sum[to_clust] += point_num
+    cl_attr_sum[from_clust] -= point_num
+    cl_memb_sum[to_clust] += 1
+    cl_memb_sum[from_clust] -= 1
+    memb[ipoint] = to_clust
+
+    # Frekuensi kategori dan modus centroid diperbarui seperti kmodes._move_point_cat,
+    # untuk semua atribut sekaligus (setiap atribut tidak bergantung pada yang lain).
+    to_freq, from_freq = cl_attr_freq[to_clust].reshape(-1), cl_attr_freq[from_clust].reshape(-1)
+    to_cent, from_cent = centroids_cat[to_clust], centroids_cat[from_clust]
+    offsets = np.arange(0, to_freq.size, cl_attr_freq.shape[2])
+    curattr = Xcat[ipoint]
+    pos = offsets + curattr
+    to_freq[pos] += 1
+    better = to_freq[offsets + to_cent] < to_freq[pos]
+    to_cent[better] = curattr[better]
+    from_freq[pos] -= 1
+    reset = from_cent == curattr
+    if reset.any():
+        # Bila frekuensi maksimum kembar, kode terkecil yang dipilih.
+        from_cent[reset] = cl_attr_freq[from_clust][reset].argmax(axis=1)
+    if centroids_bits is not None:
+        packed = centroids_bits.view(np.uint8)
+        n_bytes = -(-Xcat.shape[1] // 8)
+        packed[to_clust, :n_bytes] = np.packbits(to_cent, bitorder="little")
+        packed[from_clust, :n_bytes] = np.packbits(from_cent, bitorder="little")
+
+
+def _kprototypes_iter(Xnum, Xcat, centroids_num, centroids_cat, memb, cl_attr_sum,
+                      cl_memb_sum, cl_attr_freq, gamma, random_state, bounds=None, Xbits=None,
+                      centroids_bits=None):
+    """Satu iterasi: setiap titik dipindah ke centroid terdekat secara berurutan.
+
+    Centroid berubah setiap kali ada titik yang pindah, sehingga hasilnya
+    bergantung pada urutan titik. Jarak dihitung per blok; semua titik
+    sebelum perpindahan pertama dalam blok pasti tidak berpindah, jadi
+    pemindaian dilanjutkan tepat setelah titik yang pindah. Dengan
+    ``bounds``, pada blok besar hanya titik yang menurut ``AssignBounds``
+    mungkin berpindah yang dihitung jaraknya. Bila ``Xbits`` diberikan,
+    jarak Hamming dihitung atas bitset dan ``centroids_bits`` ikut
+    diperbarui setiap perpindahan (``bounds`` juga memakai bitset).
+    """
+    n_points = Xnum.shape[0]
+    Xdist, cdist = (Xcat, centroids_cat) if Xbits is None else (Xbits, centroids_bits)
+    moves = 0
+    start = 0
+    block = BLOCK_MIN
+    while start < n_points:
+        stop = min(start + block, n_points)
+        if bounds is None or stop - start < BOUND_MIN_ROWS:
+            idx = slice(start, stop)
+            dist = mixed_dissim(Xnum[start:stop], Xdist[start:stop], centroids_num, cdist, gamma)
+        else:
+            bounds.sync(centroids_num, cdist)
+            idx = start + np.flatnonzero(bounds.uncertain(start, stop, memb, gamma))
+            if idx.size == 0:
+                start = stop
+                block = min(block * 2, BLOCK_MAX)
+                continue
+            num, cat = dissim_parts(Xnum[idx], Xdist[idx], centroids_num, cdist)
+            dist = num + gamma * cat
+            # Batas dihitung terhadap centroid sebelum perpindahan di bawah.
+            bounds.tighten(idx, num, cat, memb)
+        best = dist.argmin(axis=1)
+        changed = np.flatnonzero(best != memb[idx])
+        if changed.size == 0:
+            start = stop
+            block = min(block * 2, BLOCK_MAX)
+            continue
+
+        ipoint = start + changed[0] if isinstance(idx, slice) else idx[changed[0]]
+        clust = best[changed[0]]
+        old_clust = memb[ipoint]
+        moves += 1
+        _move_point(ipoint, clust, old_clust, Xnum, Xcat, memb, cl_attr_sum,
+                    cl_memb_sum, cl_attr_freq, centroids_cat, centroids_bits)
+        for curc in (clust, old_clust):
+            if cl_memb_sum[curc]:
+                centroids_num[curc] = cl_attr_sum[curc] / cl_memb_sum[curc]
+            else:
+                centroids_num[curc] = 0.
+
+        # Klaster kosong diisi ulang dengan titik acak dari klaster terbesar.
+        if not cl_memb_sum[old_clust]:
+            from_clust = np.bincount(memb, minlength=len(cl_memb_sum)).argmax()
+            choices = np.flatnonzero(memb == from_clust)
+            rindx = random_state.choice(choices)
+            _move_point(rindx, old_clust, from_clust, Xnum, Xcat, memb, cl_attr_sum,
+                        cl_memb_sum, cl_attr_freq, centroids_cat, centroids_bits)
+            if bounds is not None:
+                bounds.invalidate(rindx)
+
+        if bounds is not None:
+            bounds.invalidate(ipoint)
+        start = ipoint + 1
+        block = BLOCK_MIN
+    return moves
+
+
+def kprototypes_single(Xnum, Xcat, n_clusters, max_iter, gamma, init, random_state,
+                       n_categories=None, init_no=0, monitor=None, accelerate=True, tol=0., move_tol=0.):
+    """Satu restart K-Prototypes.
+
+    ``accelerate`` memakai ``AssignBounds`` untuk melewati perhitungan
+    jarak yang tidak dapat mengubah keanggotaan (hasil tetap sama).
+    Iterasi berhenti bila tidak ada titik yang pindah atau cost tidak turun,
+    atau lebih awal bila cost turun tidak lebih dari ``tol`` (relatif) atau
+    titik yang pindah tidak lebih dari ``move_tol`` (proporsi titik).
+    ``monitor``: SharedProgress dengan MONITOR_FIELDS; baris ``init_no``
+    diperbarui setiap iterasi dan restart berhenti dengan FitCancelled
+    bila pembatalan diminta.
+    """
+    args = (Xnum, Xcat, n_clusters, max_iter, gamma, init, random_state, n_categories, init_no, accelerate, tol,
+            move_tol)
+    if monitor is None:
+        return _kprototypes_single(*args)
+    try:
+        monitor.check_cancelled()
+        monitor.update(init_no, mulai=1.)
+        result = _kprototypes_single(*args, monitor)
+        monitor.update(init_no, selesai=1.)
+        return result
+    finally:
+        monitor.close()
+
+
+def _kprototypes_single(Xnum, Xcat, n_clusters, max_iter, gamma, init, random_state, n_categories, init_no,
+                        accelerate, tol, move_tol, monitor=None):
+    random_state = check_random_state(random_state)
+    n_points, n_num = Xnum.shape
+    n_attrs = Xcat.shape[1]
+    if n_categories is None:
+        n_categories = int(Xcat.max()) + 1 if Xcat.size else 1
+    # Semua atribut flag 0/1: jarak Hamming dihitung atas bitset, kode tetap dipakai untuk frekuensi dan modus.
+    Xbits = pack_flags(Xcat) if n_categories <= 2 and n_attrs else None
+    Xdist = Xcat if Xbits is None else Xbits
+
+    init_tries = 0
+    while True:
+        init_tries += 1
+        if isinstance(init, str) and init.lower() == "huang":
+            centroids_cat = init_huang(Xcat, n_clusters, random_state)
+        elif isinstance(init, str) and init.lower() == "cao":
+            centroids_cat = init_cao(Xcat, n_clusters)
+        elif isinstance(init, str) and init.lower() == "random":
+            seeds = random_state.choice(range(n_points), n_clusters)
+            centroids_cat = Xcat[seeds]
+        elif isinstance(init, (list, tuple)):
+            centroids_num = np.array(np.atleast_2d(init[0]), dtype=np.float64)
+            centroids_cat = np.array(np.atleast_2d(init[1]), dtype=Xcat.dtype)
+            if centroids_num.shape != (n_clusters, n_num) or centroids_cat.shape != (n_clusters, n_attrs):
+                raise ValueError("Bentuk centroid awal tidak sesuai dengan jumlah klaster/atribut.")
+        else:
+            raise NotImplementedError("Metode inisialisasi tidak didukung.")
+
+        if not isinstance(init, (list, tuple)):
+            # Bagian numerik diambil dari distribusi normal di sekitar rata-rata data.
+            meanx, stdx = column_stats(Xnum)
+            centroids_num = meanx + random_state.randn(n_clusters, n_num) * stdx
+
+        cdist = centroids_cat if Xbits is None else pack_flags(centroids_cat)
+        memb, _ = labels_cost(Xnum, Xdist, centroids_num, cdist, gamma)
+        memb = memb.astype(np.intp)
+        if np.bincount(memb, minlength=n_clusters).min() > 0:
+            break
+
+        if isinstance(init, (list, tuple)):
+            # Centroid awal tetap: mencoba ulang tidak akan mengubah hasil.
+            raise ValueError("Centroid awal menghasilkan klaster kosong.")
+        if init_tries == MAX_INIT_TRIES:
+            init = "random"
+        elif init_tries == RAISE_INIT_TRIES:
+            raise ValueError("Inisialisasi klaster gagal. Pertimbangkan menentukan centroid awal secara manual.")
+
+    return _kprototypes_run(Xnum, Xcat, Xbits, memb, n_clusters, n_categories, max_iter, gamma, random_state,
+                            init_no, accelerate, tol, move_tol, monitor)
+
+
+def kprototypes_resume(Xnum, Xcat, memb, n_clusters, max_iter, gamma, random_state=0, n_categories=None, tol=0.,
+                       move_tol=0.):
+    """Lanjutkan K-Prototypes dari keanggotaan ``memb`` (mis. label hasil sebelumnya) tanpa inisialisasi.
+
+    Centroid dihitung dari ``memb`` lalu iterasi berjalan seperti
+    ``kprototypes_single``. Batas ``AssignBounds`` awal diambil dari jarak
+    titik ke centroid klasternya dan jarak antarcentroid
+    (``AssignBounds.from_separation``), jadi hanya titik yang mungkin lebih
+    dekat ke centroid lain yang dihitung jaraknya ke semua centroid.
+    Melempar ValueError bila ada klaster tanpa anggota.
+    """
+    memb = np.asarray(memb, dtype=np.intp).copy()
+    if np.bincount(memb, minlength=n_clusters).min() == 0:
+        raise ValueError("Keanggotaan awal menghasilkan klaster kosong.")
+    if n_categories is None:
+        n_categories = int(Xcat.max()) + 1 if Xcat.size else 1
+    Xbits = pack_flags(Xcat) if n_categories <= 2 and Xcat.shape[1] else None
+    return _kprototypes_run(Xnum, Xcat, Xbits, memb, n_clusters, n_categories, max_iter, gamma,
+                            check_random_state(random_state), 0, True, tol, move_tol, seeded=True)
+
+
+def _kprototypes_run(Xnum, Xcat, Xbits, memb, n_clusters, n_categories, max_iter, gamma, random_state, init_no,
+                     accelerate, tol, move_tol, monitor=None, seeded=False):
+    # Iterasi K-Prototypes dari keanggotaan awal memb; seeded: batas awal diambil dari memb (kprototypes_resume).
+    n_points, n_num = Xnum.shape
+    Xdist = Xcat if Xbits is None else Xbits
+    cl_memb_sum = np.bincount(memb, minlength=n_clusters).astype(np.float64)
+    cl_attr_sum = np.zeros((n_clusters, n_num), dtype=np.float64)
+    for iattr in range(n_num):
+        cl_attr_sum[:, iattr] = np.bincount(memb, weights=Xnum[:, iattr], minlength=n_clusters)
+    cl_attr_freq = _category_counts(Xcat, memb, n_clusters, n_categories)
+
+    centroids_num = cl_attr_sum / cl_memb_sum[:, None]
+    centroids_cat = cl_attr_freq.argmax(axis=2).astype(Xcat.dtype)
+    centroids_bits = None if Xbits is None else pack_flags(centroids_cat)
+    cdist = centroids_cat if Xbits is None else centroids_bits
+
+    bounds = None
+    if accelerate and seeded:
+        bounds = AssignBounds.from_separation(Xnum, Xdist, memb, centroids_num, cdist)
+    elif accelerate:
+        bounds = AssignBounds(n_points, centroids_num, cdist)
+    labels, cost = labels_cost(Xnum, Xdist, centroids_num, cdist, gamma, memb, bounds)
+    epoch_costs = [cost]
+    if monitor is not None:
+        monitor.update(init_no, iterasi=0, cost=cost)
+    itr = 0
+    converged = False
+    while itr < max_iter and not converged:
+        itr += 1
+        moves = _kprototypes_iter(Xnum, Xcat, centroids_num, centroids_cat, memb, cl_attr_sum,
+                                  cl_memb_sum, cl_attr_freq, gamma, random_state, bounds, Xbits, centroids_bits)
+        labels, ncost = labels_cost(Xnum, Xdist, centroids_num, cdist, gamma, memb, bounds)
+        converged = (moves == 0) or (ncost >= cost) or (cost - ncost <= tol * cost) \
+            or (moves <= move_tol * n_points)
+        epoch_costs.append(ncost)
+        cost = ncost
+        if monitor is not None:
+            monitor.update(init_no, iterasi=itr, cost=cost)
+            monitor.check_cancelled()
+
+    return (centroids_num, centroids_cat), labels, cost, itr, epoch_costs
+
+
+class KPrototypes:
+    """K-Prototypes untuk data campuran numerik/kategorikal.
+
+    Antarmukanya mengikuti ``kmodes.kprototypes.KPrototypes``: ``fit``,
+    ``fit_predict`` dan ``predict`` menerima argumen ``categorical`` berisi
+    indeks kolom kategorikal, dan hasilnya tersedia di ``cluster_centroids_``,
+    ``labels_``, ``cost_``, ``n_iter_`` dan ``gamma``.
+
+    Restart ``n_init`` dijalankan dengan ``backend`` "serial", "thread" atau
+    "process" memakai ``n_jobs`` worker (-1 = semua CPU). Seed setiap restart
+    diambil sebelum eksekusi dan run terbaik dipilih berdasarkan cost sesuai
+    urutan restart, sehingga hasilnya sama untuk semua backend.
+
+    ``accelerate`` melewati perhitungan jarak yang tidak dapat mengubah
+    keanggotaan (lihat ``AssignBounds``); partisinya sama dengan tanpa
+    percepatan. ``tol`` dan ``move_tol`` menghentikan restart lebih awal
+    (lihat ``kprototypes_single``); nilai 0 sama dengan kmodes.
+
+    ``verbose`` hanya diterima agar antarmukanya sama dengan kmodes; progres
+    dilaporkan lewat callback ``progress`` dan ``monitor`` milik ``fit_encoded``.
+    """
+
+    def __init__(self, n_clusters=8, max_iter=100, init="Cao", n_init=10, gamma=None,
+                 verbose=0, random_state=None, n_jobs=1, backend="serial", accelerate=True, tol=0., move_tol=0.):
+        self.n_clusters = n_clusters
+        self.max_iter = max_iter
+        self.init = init
+        self.n_init = n_init
+        self.gamma = gamma
+        self.verbose = verbose
+        self.random_state = random_state
+        self.n_jobs = n_jobs
+        self.backend = backend
+        self.accelerate = accelerate
+        self.tol = tol
+        self.move_tol = move_tol
+        if isinstance(self.init, (list, tuple)) and self.n_init > 1:
+            self.n_init = 1
+
+    def fit(self, X, y=None, categorical=None, progress=None):
+        if categorical is None or (not isinstance(categorical, (int, np.integer)) and not categorical):
+            raise NotImplementedError("Tidak ada kolom kategorikal; gunakan K-Means untuk data numerik saja.")
+        Xnum, Xcat = split_num_cat(X, categorical)
+        if Xnum.shape[1] == 0:
+            raise ValueError("Semua kolom kategorikal, gunakan K-Modes.")
+        Xcat, enc_map = encode_categorical(Xcat)
+        return self.fit_encoded(Xnum, Xcat, enc_map, progress=progress)
+
+    def fit_encoded(self, Xnum, Xcat, enc_map, progress=None, monitor=None):
+        random_state = check_random_state(self.random_state)
+        n_points = Xnum.shape[0]
+        if self.n_clusters > n_points:
+            raise ValueError(f"Jumlah klaster ({self.n_clusters}) melebihi jumlah data ({n_points}).")
+
+        n_clusters, max_iter, n_init, init = self.n_clusters, self.max_iter, self.n_init, self.init
+        # Jika baris unik tidak lebih banyak dari K, baris unik langsung dipakai sebagai centroid.
+        unique = np.unique(np.column_stack([Xnum, Xcat.astype(np.float64)]), axis=0)
+        if unique.shape[0] <= n_clusters:
+            max_iter, n_init, n_clusters = 0, 1, unique.shape[0]
+            init = [unique[:, :Xnum.shape[1]], unique[:, Xnum.shape[1]:].astype(Xcat.dtype)]
+
+        gamma = self.gamma
+        if gamma is None:
+            gamma = estimate_gamma(Xnum)
+
+        n_categories = max(len(c) for c in enc_map)
+        seeds = random_state.randint(np.iinfo(np.int32).max, size=n_init)
+        tasks = [(n_clusters, max_iter, gamma, init, seed, n_categories, init_no, monitor,
+                  self.accelerate, self.tol, self.move_tol)
+                 for init_no, seed in enumerate(seeds)]
+        # progress(restart_selesai, total_restart, cost_restart_tersebut)
+        on_done = progress_callback(progress, detail=lambda done, result: result[2])
+        results = run_parallel(kprototypes_single, (Xnum, Xcat), tasks,
+                               backend=self.backend, n_jobs=self.n_jobs, progress=on_done)
+        best = int(np.argmin([result[2] for result in results]))
+        return self.set_result(results[best], gamma, enc_map)
+
+    def set_result(self, result, gamma, enc_map):
+        # result: keluaran kprototypes_single untuk run yang dipilih.
+        (self._centroids_num, self._centroids_cat), self.labels_, self.cost_, \
+            self.n_iter_, self.epoch_costs_ = result
+        self._enc_map = enc_map
+        self.gamma = gamma
+        return self
+
+    def fit_predict(self, X, y=None, categorical=None, progress=None):
+        return self.fit(X, categorical=categorical, progress=progress).labels_
+
+    def predict(self, X, categorical=None):
+        if not hasattr(self, "_centroids_num"):
+            raise AttributeError("Model belum di-fit.")
+        Xnum, Xcat = split_num_cat(X, categorical)
+        Xcat, _ = encode_categorical(Xcat, enc_map=self._enc_map)
+        return self.predict_encoded(Xnum, Xcat)
+
+    def predict_encoded(self, Xnum, Xcat):
+        centroids_cat = self._centroids_cat
+        if Xcat.size and max(len(c) for c in self._enc_map) <= 2 and Xcat.max() <= 1:
+            # Semua atribut flag dan tidak ada kategori baru: jarak dihitung atas bitset.
+            Xcat, centroids_cat = pack_flags(Xcat), pack_flags(centroids_cat)
+        return labels_cost(Xnum, Xcat, self._centroids_num, centroids_cat, self.gamma)[0]
+
+    @property
+    def cluster_centroids_(self):
+        if hasattr(self, "_centroids_num"):
+            return np.hstack((self._centroids_num,
+                              decode_categorical(self._centroids_cat, self._enc_map)))
+        raise AttributeError("'KPrototypes' belum di-fit sehingga belum memiliki cluster_centroids_.")
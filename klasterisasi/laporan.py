@@ -0,0 +1,152 @@
+"""Laporan PDF profil siswa, satu per satu atau massal dalam satu ZIP."""
+
+import copy
+import itertools
+import re
+import zipfile
+from collections import deque
+
+from fpdf import FPDF
+
+from klasterisasi.paralel import iter_parallel
+from klasterisasi.skema import CATEGORICAL_COLS
+
+KETERANGAN_UMUM = (
+    "Laporan ini menyajikan profil detail siswa berdasarkan hasil pengelompokan "
+    "menggunakan Algoritma K-Prototype. Klasterisasi dilakukan berdasarkan "
+    "nilai akademik, kehadiran, dan partisipasi ekstrakurikuler siswa. "
+    "Informasi klaster ini dapat digunakan untuk memahami kebutuhan siswa dan "
+    "merancang strategi pembinaan yang sesuai."
+)
+
+# Jumlah siswa yang dirender satu worker per tugas pada pembuatan massal.
+PDF_CHUNK_SIZE = 50
+
+
+def _new_document():
+    # Bagian statis halaman (judul dan keterangan umum) sama untuk semua siswa.
+    pdf = FPDF()
+    pdf.add_page()
+    pdf.set_font("Arial", "B", 16)
+    pdf.set_text_color(44, 47, 127)
+    pdf.cell(0, 10, "PROFIL SISWA - HASIL KLASTERISASI", ln=True, align='C')
+    pdf.ln(10)
+
+    pdf.set_font("Arial", "", 10)
+    pdf.set_text_color(0, 0, 0)
+    pdf.multi_cell(0, 5, KETERANGAN_UMUM, align='J')
+    pdf.ln(5)
+    return pdf
+
+
+def _write_student(pdf, nama, data_siswa_dict, klaster, cluster_desc_map):
+    pdf.set_font("Arial", "B", 12)
+    pdf.cell(0, 8, f"Nama Siswa: {nama}", ln=True)
+    pdf.cell(0, 8, f"Klaster Hasil: {klaster}", ln=True)
+    pdf.ln(3)
+
+    klaster_desc = cluster_desc_map.get(klaster, "Deskripsi klaster tidak tersedia.")
+    pdf.set_font("Arial", "I", 10)
+    pdf.set_text_color(80, 80, 80)
+    pdf.multi_cell(0, 5, f"Karakteristik Klaster {klaster}: {klaster_desc}", align='J')
+    pdf.ln(5)
+
+    pdf.set_font("Arial", "", 10)
+    pdf.set_text_color(0, 0, 0)
+    ekskul_diikuti = []
+    for col in CATEGORICAL_COLS:
+        val = data_siswa_dict.get(col)
+        if val is not None and (val == 1 or str(val).strip() == '1'):
+            ekskul_diikuti.append(col.replace("Ekstrakurikuler ", ""))
+
+    kehadiran_val = data_siswa_dict.get('Kehadiran', 0)
+    nilai_akademik_val = data_siswa_dict.get('Rata Rata Nilai Akademik', 0)
+
+    display_data = {
+        "Nomor Induk": data_siswa_dict.get("No", "-"),
+        "Jenis Kelamin": data_siswa_dict.get("JK", "-"),
+        "Kelas": data_siswa_dict.get("Kelas", "-"),
+        "Rata-rata Nilai Akademik": f"{nilai_akademik_val:.2f}",
+        "Persentase Kehadiran": f"{kehadiran_val:.2%}",
+        "Ekstrakurikuler yang Diikuti": ", ".join(ekskul_diikuti) if ekskul_diikuti else "Tidak mengikuti ekstrakurikuler",
+    }
+    for key, val in display_data.items():
+        pdf.cell(0, 7, f"{key}: {val}", ln=True)
+
+
+def generate_pdf_profil_siswa(nama, data_siswa_dict, klaster, cluster_desc_map):
+    pdf = _new_document()
+    _write_student(pdf, nama, data_siswa_dict, klaster, cluster_desc_map)
+    # fpdf2 mengembalikan bytearray; karakter di luar latin-1 menimbulkan exception di sini.
+    return bytes(pdf.output())
+
+
+def render_profil_chunk(records, cluster_desc_map):
+    """Render PDF untuk sekumpulan baris siswa; mengembalikan daftar bytes.
+
+    Bagian statis dirender (termasuk pemenggalan baris paragrafnya) sekali
+    per chunk, lalu disalin untuk setiap siswa.
+    """
+    template = _new_document()
+    hasil = []
+    for record in records:
+        pdf = copy.deepcopy(template)
+        _write_student(pdf, record["Nama"], record, record["Klaster"], cluster_desc_map)
+        hasil.append(bytes(pdf.output()))
+    return hasil
+
+
+def pdf_file_name(nama, used=None):
+    # Nama file yang sama dengan unduhan satuan, dibuat unik di dalam satu ZIP.
+    base = "Profil_" + re.sub(r'[\\/:*?"<>|\s]+', "_", str(nama)).strip("_")
+    name, n = f"{base}.pdf", 2
+    while used is not None and name in used:
+        name, n = f"{base}_{n}.pdf", n + 1
+    if used is not None:
+        used.add(name)
+    return name
+
+
+def iter_records(df):
+    """Baris ``df`` sebagai dict satu per satu (tidak seperti ``to_dict("records")`` yang membuat semuanya sekaligus)."""
+    columns = list(df.columns)
+    for row in df.itertuples(index=False, name=None):
+        yield dict(zip(columns, row))
+
+
+def write_profil_zip(target, records, cluster_desc_map, backend="serial", n_jobs=1,
+                     chunk_size=PDF_CHUNK_SIZE, progress=None, total=None):
+    """Tulis PDF profil setiap baris ``records`` ke ZIP ``target`` (path atau file biner).
+
+    ``records`` boleh berupa iterator (mis. ``iter_records``): baris diambil
+    per chunk, dirender oleh ``iter_parallel`` dan langsung ditulis ke ZIP
+    sesuai urutan; hanya beberapa chunk yang berada di memori pada satu
+    waktu. ``progress(selesai, total)`` dipanggil setiap chunk, dengan
+    ``total`` dari ``len(records)`` bila tidak diberikan. Mengembalikan
+    jumlah PDF yang ditulis.
+    """
+    if total is None and hasattr(records, "__len__"):
+        total = len(records)
+    records = iter(records)
+    # Chunk yang sudah dikirim ke worker, menunggu hasilnya (iter_parallel mengembalikan sesuai urutan).
+    sent = deque()
+
+    def chunks():
+        while True:
+            chunk = list(itertools.islice(records, chunk_size))
+            if not chunk:
+                return
+            sent.append(chunk)
+            yield chunk, cluster_desc_map
+
+    used, done = set(), 0
+    # PDF dari fpdf2 sudah terkompresi, jadi entri ZIP cukup disimpan apa adanya.
+    with zipfile.ZipFile(target, "w", compression=zipfile.ZIP_STORED) as zf:
+        for pdfs in iter_parallel(render_profil_chunk, chunks(), backend=backend, n_jobs=n_jobs):
+            chunk = sent.popleft()
+            for record, pdf_bytes in zip(chunk, pdfs):
+                zf.writestr(pdf_file_name(record["Nama"], used), pdf_bytes)
+            done += len(chunk)
+            if progress is not None:
+                progress(done, total if total is not None else done)
+    return done
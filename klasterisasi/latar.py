@@ -0,0 +1,145 @@
+"""Klasterisasi K-Prototypes di thread latar belakang.
+
+Script Streamlit hanya mengirim fit dan menyimpan id handle-nya di session
+state; fit berjalan di pool thread milik proses (restart tetap memakai
+backend serial/thread/process seperti biasa). Setiap rerun membaca
+progres dari ``SharedProgress`` (restart, iterasi, cost), dapat
+membatalkan fit, dan mengambil hasilnya setelah selesai.
+"""
+
+import threading
+import time
+import uuid
+from concurrent.futures import ThreadPoolExecutor
+from contextlib import nullcontext
+
+from klasterisasi.kprototypes import MONITOR_FIELDS
+from klasterisasi.paralel import FitCancelled, SharedProgress
+from klasterisasi.pipeline import KPROTO_MOVE_TOL, KPROTO_N_INIT, KPROTO_RANDOM_STATE, KPROTO_TOL, cluster_data
+
+# Status handle.
+MENUNGGU, BERJALAN, SELESAI, GAGAL, DIBATALKAN = "menunggu", "berjalan", "selesai", "gagal", "dibatalkan"
+
+
+class BackgroundFit:
+    """Handle satu ``cluster_data`` yang berjalan di ``executor``.
+
+    ``tol``, ``move_tol`` dan ``accelerate`` diteruskan ke ``cluster_data``
+    seperti opsi CLI. ``context`` menyimpan data pemanggil yang dibutuhkan
+    saat hasilnya diambil (mis. kunci cache). Bila ``timer`` diberikan, fit
+    dicatat sebagai tahap "klasterisasi" di ``StageTimer`` tersebut.
+    """
+
+    def __init__(self, executor, df_preprocessed, n_clusters, n_init=KPROTO_N_INIT,
+                 random_state=KPROTO_RANDOM_STATE, backend="serial", n_jobs=1, tol=KPROTO_TOL,
+                 move_tol=KPROTO_MOVE_TOL, accelerate=True, timer=None, context=None):
+        self.id = uuid.uuid4().hex
+        self.n_clusters = n_clusters
+        self.n_init = n_init
+        self.timer = timer
+        self.context = context or {}
+        self.submitted = time.time()
+        self.started = None
+        self.finished = None
+        self._lock = threading.Lock()
+        self._final = None
+        self._monitor = SharedProgress(n_init, MONITOR_FIELDS)
+        params = {"n_init": n_init, "random_state": random_state, "backend": backend, "n_jobs": n_jobs, "tol": tol,
+                  "move_tol": move_tol, "accelerate": accelerate}
+        self._future = executor.submit(self._run, df_preprocessed, n_clusters, params)
+
+    def _run(self, df_preprocessed, n_clusters, params):
+        self.started = time.time()
+        stage = self.timer.stage("klasterisasi", rows=len(df_preprocessed)) if self.timer is not None else nullcontext()
+        try:
+            with stage:
+                return cluster_data(df_preprocessed, n_clusters, monitor=self._monitor, **params)
+        finally:
+            self.finished = time.time()
+            self._release()
+
+    def _release(self):
+        # Progres terakhir disalin sebelum shared memory dihapus.
+        with self._lock:
+            if self._final is None:
+                self._final = self._monitor.snapshot()
+                self._monitor.release()
+
+    def cancel(self):
+        """Batalkan fit; restart yang sedang berjalan berhenti setelah iterasinya selesai."""
+        if self._future.cancel():
+            self.finished = time.time()
+            self._release()
+            return
+        with self._lock:
+            if self._final is None:
+                self._monitor.cancel()
+
+    def done(self):
+        return self._future.done()
+
+    def result(self):
+        """(data + kolom Klaster, model, indeks kategorikal); melempar FitCancelled atau galat fit."""
+        if self._future.cancelled():
+            raise FitCancelled()
+        return self._future.result()
+
+    def status(self):
+        """Snapshot progres: status, restart selesai/total, cost terbaik, dan iterasi restart yang berjalan."""
+        with self._lock:
+            restarts = self._final if self._final is not None else self._monitor.snapshot()
+            cancelling = self._final is None and self._monitor.cancelled
+        finished = [row for row in restarts if row["selesai"]]
+        if self._future.cancelled():
+            state = DIBATALKAN
+        elif self._future.done():
+            error = self._future.exception()
+            state = SELESAI if error is None else DIBATALKAN if isinstance(error, FitCancelled) else GAGAL
+        else:
+            state = BERJALAN if self.started is not None else MENUNGGU
+        end = self.finished if self.finished is not None else time.time()
+        return {
+            "status": state,
+            "membatalkan": cancelling and state == BERJALAN,
+            "restart_selesai": len(finished),
+            "restart_total": self.n_init,
+            "cost_terbaik": min((row["cost"] for row in finished), default=None),
+            "berjalan": [{"restart": i + 1, "iterasi": int(row["iterasi"]), "cost": row["cost"]}
+                         for i, row in enumerate(restarts) if row["mulai"] and not row["selesai"]],
+            "detik": end - (self.started if self.started is not None else self.submitted),
+        }
+
+
+class FitRunner:
+    """Pool thread untuk ``BackgroundFit`` beserta daftar handle per id.
+
+    Handle dicari lewat id yang hanya disimpan sesi pembuatnya (id tidak
+    dibagikan lewat URL agar data fit tidak bocor ke sesi lain). Handle
+    yang sudah selesai tetapi belum diambil dibuang setelah ``keep`` fit
+    berikutnya.
+    """
+
+    def __init__(self, max_workers=2, keep=20):
+        self._executor = ThreadPoolExecutor(max_workers=max_workers, thread_name_prefix="klasterisasi")
+        self._handles = {}
+        self._lock = threading.Lock()
+        self.keep = keep
+
+    def submit(self, df_preprocessed, n_clusters, **kwargs):
+        handle = BackgroundFit(self._executor, df_preprocessed, n_clusters, **kwargs)
+        with self._lock:
+            self._handles[handle.id] = handle
+            finished = [fit_id for fit_id, other in self._handles.items() if other.done()]
+            for fit_id in finished[:max(len(self._handles) - self.keep, 0)]:
+                del self._handles[fit_id]
+        return handle
+
+    def get(self, fit_id):
+        with self._lock:
+            return self._handles.get(fit_id)
+
+    def discard(self, fit_id):
+        with self._lock:
+            handle = self._handles.pop(fit_id, None)
+        if handle is not None and not handle.done():
+            handle.cancel()
@@ -0,0 +1,242 @@
+"""K-Prototypes mini-batch untuk data siswa yang tidak muat di memori.
+
+File dibaca per potongan (``iter_students``) dalam tiga lintasan:
+
+1. pindai: statistik scaler (rata-rata dan varians berjalan), daftar kategori
+   flag, dan sampel acak seragam untuk inisialisasi centroid;
+2. mini-batch: setiap batch ditetapkan ke centroid terdekat, lalu centroid
+   numerik menjadi rata-rata berjalan anggotanya dan centroid kategorikal
+   menjadi modus dari frekuensi berjalan;
+3. penetapan: setiap baris diberi klaster dengan centroid yang sudah tetap.
+
+Yang berada di memori hanya satu potongan, sampel, dan label (2 byte per siswa).
+"""
+
+import json
+import os
+import tempfile
+
+import numpy as np
+import pandas as pd
+
+from klasterisasi.inkremental import ScalerStats
+from klasterisasi.kprototypes import KPrototypes, _category_counts, check_random_state, labels_cost
+from klasterisasi.artefak import MODEL_SUFFIX, save_model_artifact
+from klasterisasi.diagnostik import StageTimer
+from klasterisasi.pipeline import KPROTO_N_INIT, KPROTO_RANDOM_STATE, describe_cluster
+from klasterisasi.prediksi import encode_students
+from klasterisasi.skema import (ALL_FEATURES_FOR_CLUSTERING, CATEGORICAL_COLS, FLAG_DTYPE, NUMERIC_COLS,
+                                categorical_as_str, compact_students)
+from klasterisasi.unggah import STREAM_CHUNK_ROWS, iter_students
+
+MINIBATCH_SAMPLE_ROWS = 20_000
+MINIBATCH_BATCH_ROWS = 10_000
+
+
+def scan_students(chunks, sample_rows=MINIBATCH_SAMPLE_ROWS, random_state=None):
+    """Lintasan pertama atas potongan data siswa.
+
+    Mengembalikan (ScalerStats, enc_map, sampel fitur, jumlah baris). Sampel
+    dipilih seragam: setiap baris diberi kunci acak dan yang disimpan adalah
+    ``sample_rows`` baris dengan kunci terkecil.
+    """
+    random_state = check_random_state(random_state)
+    stats = ScalerStats(len(NUMERIC_COLS))
+    categories = [set() for _ in CATEGORICAL_COLS]
+    all_flags = True
+    sample, sample_keys = None, None
+    for chunk in chunks:
+        chunk = compact_students(chunk)
+        missing_cols = [col for col in ALL_FEATURES_FOR_CLUSTERING if col not in chunk.columns]
+        if missing_cols:
+            raise ValueError(f"Kolom-kolom berikut tidak ditemukan: {', '.join(missing_cols)}.")
+        stats.add_frame(chunk)
+        for col, seen in zip(CATEGORICAL_COLS, categories):
+            all_flags = all_flags and chunk[col].dtype == FLAG_DTYPE
+            seen.update(categorical_as_str(chunk[col]).unique().tolist())
+
+        features, keys = chunk[ALL_FEATURES_FOR_CLUSTERING], random_state.random_sample(len(chunk))
+        if sample is not None:
+            features, keys = pd.concat([sample, features]), np.concatenate([sample_keys, keys])
+        keep = np.sort(np.argsort(keys, kind="stable")[:sample_rows])
+        sample, sample_keys = features.iloc[keep], keys[keep]
+
+    if sample is None or stats.n_rows == 0:
+        raise ValueError("File tidak berisi data siswa.")
+    # Flag 0/1 di semua potongan dikodekan sebagai uint8 seperti encode_features.
+    if all_flags:
+        enc_map = [np.array(sorted(int(v) for v in seen), dtype=FLAG_DTYPE) for seen in categories]
+    else:
+        enc_map = [np.array(sorted(seen), dtype=object) for seen in categories]
+    return stats, enc_map, sample, stats.n_rows
+
+
+def _batches(encoded_chunks, batch_rows):
+    # Batch tepat batch_rows baris lintas batas potongan (kecuali yang terakhir), seperti satu file utuh.
+    parts, n_pending = [], 0
+    for Xnum, Xcat in encoded_chunks:
+        start = 0
+        while start < len(Xnum):
+            stop = min(start + batch_rows - n_pending, len(Xnum))
+            parts.append((Xnum[start:stop], Xcat[start:stop]))
+            n_pending += stop - start
+            start = stop
+            if n_pending == batch_rows:
+                yield _concat(parts)
+                parts, n_pending = [], 0
+    if parts:
+        yield _concat(parts)
+
+
+def _concat(parts):
+    if len(parts) == 1:
+        return parts[0]
+    return np.concatenate([num for num, _ in parts]), np.concatenate([cat for _, cat in parts])
+
+
+def fit_minibatch(chunk_source, n_clusters, batch_rows=MINIBATCH_BATCH_ROWS, n_epochs=1,
+                  sample_rows=MINIBATCH_SAMPLE_ROWS, n_init=KPROTO_N_INIT, random_state=KPROTO_RANDOM_STATE,
+                  backend="serial", n_jobs=1, on_labels=None, timer=None):
+    """Fit K-Prototypes mini-batch atas data yang dibaca bertahap.
+
+    ``chunk_source()`` harus mengembalikan iterator potongan DataFrame yang
+    baru setiap kali dipanggil (data dibaca 2 + ``n_epochs`` kali). Centroid
+    awal diambil dari fit K-Prototypes biasa (init Huang, ``n_init``
+    restart) atas sampel. Batch mini-batch berisi ``batch_rows`` baris
+    berurutan tanpa memandang batas potongan, sehingga hasilnya sama untuk
+    ukuran potongan berapa pun. Pada lintasan terakhir ``on_labels(potongan,
+    label)`` dipanggil untuk setiap potongan, misalnya untuk menulis hasil.
+    Mengembalikan dict berisi model, scaler, peringatan, jumlah anggota dan
+    deskripsi per klaster.
+    """
+    timer = timer if timer is not None else StageTimer()
+    with timer.stage("pindai") as info:
+        stats, enc_map, sample, n_rows = scan_students(chunk_source(), sample_rows, random_state)
+        info["baris"] = n_rows
+        scaler = stats.to_scaler()
+
+        def encode(df):
+            return encode_students(df, scaler, enc_map, NUMERIC_COLS, CATEGORICAL_COLS)
+
+        Xnum, Xcat = encode(sample)
+        model = KPrototypes(n_clusters=n_clusters, init='Huang', n_init=n_init, random_state=random_state,
+                            n_jobs=n_jobs, backend=backend).fit_encoded(Xnum, Xcat, enc_map)
+
+    gamma, n_categories = model.gamma, max(len(c) for c in enc_map)
+    centroids_num, centroids_cat = model._centroids_num, model._centroids_cat
+    n_clusters = centroids_num.shape[0]
+    # Anggota sampel menjadi bobot awal rata-rata dan frekuensi berjalan.
+    memb = model.labels_.astype(np.intp)
+    cl_memb_sum = np.bincount(memb, minlength=n_clusters).astype(np.float64)
+    cl_attr_sum = np.column_stack([np.bincount(memb, weights=Xnum[:, i], minlength=n_clusters)
+                                   for i in range(Xnum.shape[1])])
+    cl_attr_freq = _category_counts(Xcat, memb, n_clusters, n_categories)
+
+    with timer.stage("mini-batch", rows=n_rows * n_epochs):
+        for _ in range(n_epochs):
+            encoded = (encode(compact_students(chunk)) for chunk in chunk_source())
+            for batch_num, batch_cat in _batches(encoded, batch_rows):
+                memb = labels_cost(batch_num, batch_cat, centroids_num, centroids_cat, gamma)[0].astype(np.intp)
+                cl_memb_sum += np.bincount(memb, minlength=n_clusters)
+                for i in range(batch_num.shape[1]):
+                    cl_attr_sum[:, i] += np.bincount(memb, weights=batch_num[:, i], minlength=n_clusters)
+                cl_attr_freq += _category_counts(batch_cat, memb, n_clusters, n_categories)
+                centroids_num = cl_attr_sum / cl_memb_sum[:, None]
+                centroids_cat = cl_attr_freq.argmax(axis=2).astype(batch_cat.dtype)
+
+    with timer.stage("penetapan", rows=n_rows):
+        labels = np.empty(n_rows, dtype=np.uint16)
+        counts = np.zeros(n_clusters, dtype=np.int64)
+        num_sum = np.zeros((n_clusters, len(NUMERIC_COLS)))
+        freq = np.zeros((n_clusters, len(CATEGORICAL_COLS), n_categories), dtype=np.int64)
+        cost, pos = 0., 0
+        for chunk in chunk_source():
+            chunk = compact_students(chunk)
+            Xnum, Xcat = encode(chunk)
+            chunk_labels, chunk_cost = labels_cost(Xnum, Xcat, centroids_num, centroids_cat, gamma)
+            labels[pos:pos + len(chunk)] = chunk_labels
+            pos += len(chunk)
+            cost += chunk_cost
+            memb = chunk_labels.astype(np.intp)
+            counts += np.bincount(memb, minlength=n_clusters)
+            for i in range(Xnum.shape[1]):
+                num_sum[:, i] += np.bincount(memb, weights=Xnum[:, i], minlength=n_clusters)
+            freq += _category_counts(Xcat, memb, n_clusters, n_categories)
+            if on_labels is not None:
+                on_labels(chunk, chunk_labels)
+
+    model.set_result(((centroids_num, centroids_cat), labels[:pos], cost, n_epochs, [cost]), gamma, enc_map)
+
+    # Deskripsi dari agregat berjalan: rata-rata ternormalisasi dan modus (kode terkecil bila seri).
+    cluster_characteristics_map = {}
+    for k in np.flatnonzero(counts):
+        means = dict(zip(NUMERIC_COLS, num_sum[k] / counts[k]))
+        modes = {col: enc_map[i][freq[k, i].argmax()] for i, col in enumerate(CATEGORICAL_COLS)}
+        cluster_characteristics_map[int(k)] = describe_cluster(means, modes)
+
+    warnings = [f"Nilai kosong pada kolom '{col}' diisi dengan rata-rata: {mean_val:.2f}."
+                for col, n_valid, mean_val in zip(NUMERIC_COLS, stats.count, stats.mean) if n_valid < stats.n_rows]
+    return {
+        "model": model,
+        "scaler": scaler,
+        "warnings": warnings,
+        "jumlah_per_klaster": counts,
+        "cluster_characteristics_map": cluster_characteristics_map,
+        "waktu_detik": timer.timings,
+        "diagnostik": timer.to_record(),
+    }
+
+
+def run_streaming_pipeline(input_path, n_clusters, out_dir, chunk_rows=STREAM_CHUNK_ROWS,
+                           batch_rows=MINIBATCH_BATCH_ROWS, n_epochs=1, n_init=KPROTO_N_INIT,
+                           random_state=KPROTO_RANDOM_STATE, backend="serial", n_jobs=1, timer=None,
+                           save_model=False):
+    """Seperti ``run_pipeline``, tetapi file dibaca bertahap dan diklaster dengan mini-batch.
+
+    Hasil ditulis per potongan ke ``<nama>_klaster.csv`` (xlsx tidak dapat
+    ditulis bertahap), bersama ``<nama>_ringkasan.json`` dan, bila
+    ``save_model``, artefak model ``<nama>_model.kproto``.
+    """
+    timer = timer if timer is not None else StageTimer(label=os.path.basename(input_path))
+    stem = os.path.splitext(os.path.basename(input_path))[0]
+    os.makedirs(out_dir, exist_ok=True)
+    hasil_path = os.path.join(out_dir, f"{stem}_klaster.csv")
+
+    fd, tmp_path = tempfile.mkstemp(dir=out_dir, suffix=".tmp")
+    try:
+        with os.fdopen(fd, "w", encoding="utf-8", newline="") as f:
+            def write_chunk(chunk, labels):
+                chunk.assign(Klaster=labels).to_csv(f, index=False, header=f.tell() == 0)
+
+            result = fit_minibatch(lambda: iter_students(input_path, chunk_rows=chunk_rows), n_clusters,
+                                   batch_rows=batch_rows, n_epochs=n_epochs, n_init=n_init,
+                                   random_state=random_state, backend=backend, n_jobs=n_jobs,
+                                   on_labels=write_chunk, timer=timer)
+        os.replace(tmp_path, hasil_path)
+    except BaseException:
+        if os.path.exists(tmp_path):
+            os.remove(tmp_path)
+        raise
+
+    model = result["model"]
+    summary = {
+        "input": os.path.abspath(input_path),
+        "hasil": os.path.abspath(hasil_path),
+        "mode": "mini-batch",
+        "n_siswa": len(model.labels_),
+        "n_clusters": n_clusters,
+        "cost": float(model.cost_),
+        "iterasi": int(model.n_iter_),
+        "jumlah_per_klaster": {str(k): int(v) for k, v in enumerate(result["jumlah_per_klaster"])},
+        "deskripsi_klaster": {str(k): v for k, v in result["cluster_characteristics_map"].items()},
+        "peringatan": result["warnings"],
+        "waktu_detik": result["waktu_detik"],
+        "diagnostik": result["diagnostik"],
+    }
+    if save_model:
+        summary["model"] = os.path.abspath(save_model_artifact(
+            os.path.join(out_dir, f"{stem}_model{MODEL_SUFFIX}"), model, result["scaler"],
+            result["cluster_characteristics_map"]))
+    with open(os.path.join(out_dir, f"{stem}_ringkasan.json"), "w", encoding="utf-8") as f:
+        json.dump(summary, f, ensure_ascii=False, indent=2)
+    return summary
@@ -0,0 +1,260 @@
+"""Eksekusi restart K-Prototypes secara serial, thread pool, atau process pool."""
+
+import itertools
+import multiprocessing
+import os
+from collections import deque
+from concurrent.futures import ProcessPoolExecutor, ThreadPoolExecutor, as_completed
+from multiprocessing import shared_memory
+
+import numpy as np
+
+BACKENDS = ("serial", "thread", "process")
+
+
+def resolve_n_jobs(n_jobs, n_tasks):
+    n_cpus = os.cpu_count() or 1
+    if n_jobs is None:
+        n_jobs = 1
+    elif n_jobs < 0:
+        # Sama seperti joblib: -1 = semua CPU, -2 = semua CPU kecuali satu, dst.
+        n_jobs = max(n_cpus + 1 + n_jobs, 1)
+    return max(1, min(n_jobs, n_tasks))
+
+
+def mp_context():
+    # forkserver menghindari fork dari proses server Streamlit yang multithread.
+    methods = multiprocessing.get_all_start_methods()
+    return multiprocessing.get_context("forkserver" if "forkserver" in methods else "spawn")
+
+
+def share_array(arr):
+    """Salin array ke shared memory; kembalikan (handle, spec) untuk worker."""
+    arr = np.ascontiguousarray(arr)
+    shm = shared_memory.SharedMemory(create=True, size=max(arr.nbytes, 1))
+    view = np.ndarray(arr.shape, dtype=arr.dtype, buffer=shm.buf)
+    view[...] = arr
+    return shm, (shm.name, arr.shape, arr.dtype.str)
+
+
+def attach_array(spec):
+    name, shape, dtype = spec
+    # Worker berbagi resource tracker dengan proses induk; unlink segmen
+    # tetap menjadi tugas proses induk.
+    shm = shared_memory.SharedMemory(name=name)
+    return shm, np.ndarray(shape, dtype=np.dtype(dtype), buffer=shm.buf)
+
+
+class SharedArrays:
+    """Context manager yang menaruh beberapa array di shared memory."""
+
+    def __init__(self, *arrays):
+        self._arrays = arrays
+        self._handles = []
+        self.specs = []
+
+    def __enter__(self):
+        for arr in self._arrays:
+            shm, spec = share_array(arr)
+            self._handles.append(shm)
+            self.specs.append(spec)
+        return self
+
+    def __exit__(self, *exc):
+        for shm in self._handles:
+            shm.close()
+            shm.unlink()
+        self._handles = []
+        return False
+
+
+class FitCancelled(Exception):
+    """Dilempar di dalam tugas setelah ``SharedProgress.cancel`` dipanggil."""
+
+
+class SharedProgress:
+    """Progres per tugas di shared memory yang ditulis worker dan dibaca proses induk.
+
+    ``values[i]`` berisi ``fields`` tugas ke-i; flag batal disimpan di baris
+    terakhir. Objek dapat di-pickle ke worker proses: segmen yang sama
+    dipasang ulang berdasarkan namanya. Pembuatnya memanggil ``release``
+    (atau memakai ``with``) untuk menghapus segmen.
+    """
+
+    def __init__(self, n_tasks, fields):
+        self.fields = tuple(fields)
+        self._shm, self._spec = share_array(np.zeros((n_tasks + 1, len(self.fields)), dtype=np.float64))
+        self._view = np.ndarray((n_tasks + 1, len(self.fields)), dtype=np.float64, buffer=self._shm.buf)
+        self._owner = True
+
+    def __getstate__(self):
+        return {"fields": self.fields, "spec": self._spec}
+
+    def __setstate__(self, state):
+        self.fields, self._spec = state["fields"], state["spec"]
+        self._shm, self._view = attach_array(self._spec)
+        self._owner = False
+
+    @property
+    def values(self):
+        return self._view[:-1]
+
+    def update(self, task, **values):
+        for name, value in values.items():
+            self._view[task, self.fields.index(name)] = value
+
+    def cancel(self):
+        self._view[-1, 0] = 1.
+
+    @property
+    def cancelled(self):
+        return bool(self._view[-1, 0])
+
+    def check_cancelled(self):
+        if self._view[-1, 0]:
+            raise FitCancelled()
+
+    def snapshot(self):
+        """Salinan ``values`` sebagai list dict (aman dibaca setelah ``release``)."""
+        return [dict(zip(self.fields, row)) for row in self.values.tolist()]
+
+    def _detach(self):
+        if self._view is not None:
+            self._view = None
+            self._shm.close()
+
+    def close(self):
+        """Dipanggil tugas setelah selesai; hanya melepas salinan yang dipasang di worker proses."""
+        if not self._owner:
+            self._detach()
+
+    def release(self):
+        if self._owner and self._view is not None:
+            self._detach()
+            try:
+                self._shm.unlink()
+            except FileNotFoundError:
+                pass
+
+    def __enter__(self):
+        return self
+
+    def __exit__(self, *exc):
+        self.release()
+        return False
+
+
+def call_with_shared(func, specs, *args, **kwargs):
+    """Dijalankan di worker: pasang array dari shared memory lalu panggil ``func``."""
+    handles, arrays = zip(*(attach_array(spec) for spec in specs))
+    try:
+        return func(*arrays, *args, **kwargs)
+    finally:
+        # View harus dilepas sebelum shared memory ditutup.
+        del arrays
+        for shm in handles:
+            shm.close()
+
+
+def progress_callback(progress, total=None, detail=None):
+    """Adaptor ``progress`` pemanggil menjadi callback ``run_parallel``; None bila ``progress`` None.
+
+    Callback memanggil ``progress(selesai, total)``, atau
+    ``progress(selesai, total, detail(selesai, hasil))`` bila ``detail``
+    diberikan. Tanpa ``total``, jumlah tugas ``run_parallel`` yang dipakai.
+    """
+    if progress is None:
+        return None
+
+    def on_done(done, n_tasks, result):
+        steps = n_tasks if total is None else total
+        if detail is None:
+            progress(done, steps)
+        else:
+            progress(done, steps, detail(done, result))
+    return on_done
+
+
+def run_parallel(func, arrays, task_args, backend="serial", n_jobs=1, progress=None):
+    """Jalankan ``func(*arrays, *args)`` untuk setiap ``args`` di ``task_args``.
+
+    Hasil dikembalikan sesuai urutan ``task_args`` apa pun backend-nya,
+    sehingga pemilihan hasil terbaik tetap deterministik. ``progress``
+    dipanggil di thread pemanggil sebagai ``progress(selesai, total, hasil)``.
+    """
+    if backend not in BACKENDS:
+        raise ValueError(f"Backend '{backend}' tidak dikenal. Pilihan: {', '.join(BACKENDS)}.")
+    task_args = list(task_args)
+    total = len(task_args)
+    n_workers = resolve_n_jobs(n_jobs, total)
+    results = [None] * total
+
+    if backend == "serial" or n_workers == 1:
+        for idx, args in enumerate(task_args):
+            results[idx] = func(*arrays, *args)
+            if progress is not None:
+                progress(idx + 1, total, results[idx])
+        return results
+
+    if backend == "thread":
+        with ThreadPoolExecutor(max_workers=n_workers) as pool:
+            futures = {pool.submit(func, *arrays, *args): idx for idx, args in enumerate(task_args)}
+            _collect(futures, results, total, progress)
+        return results
+
+    with SharedArrays(*arrays) as shared, \
+            ProcessPoolExecutor(max_workers=n_workers, mp_context=mp_context()) as pool:
+        futures = {pool.submit(call_with_shared, func, shared.specs, *args): idx
+                   for idx, args in enumerate(task_args)}
+        _collect(futures, results, total, progress)
+    return results
+
+
+def _collect(futures, results, total, progress):
+    done = 0
+    for future in as_completed(futures):
+        results[futures[future]] = future.result()
+        done += 1
+        if progress is not None:
+            progress(done, total, results[futures[future]])
+
+
+def iter_parallel(func, task_args, backend="serial", n_jobs=1, max_pending=None):
+    """Hasilkan ``func(*args)`` satu per satu sesuai urutan ``task_args``.
+
+    Berbeda dengan ``run_parallel``, hasil tidak dikumpulkan: paling banyak
+    ``max_pending`` tugas (bawaan 2x jumlah worker) yang berjalan atau
+    menunggu diambil, sehingga memori tetap terbatas untuk hasil yang besar.
+    ``task_args`` boleh berupa generator; argumen tugas juga hanya dibuat
+    saat akan dikirim ke worker.
+    """
+    if backend not in BACKENDS:
+        raise ValueError(f"Backend '{backend}' tidak dikenal. Pilihan: {', '.join(BACKENDS)}.")
+    # Jumlah tugas dari generator tidak diketahui; worker cukup dibatasi n_jobs.
+    n_workers = resolve_n_jobs(n_jobs, len(task_args) if hasattr(task_args, "__len__") else os.cpu_count() or 1)
+
+    if backend == "serial" or n_workers == 1:
+        for args in task_args:
+            yield func(*args)
+        return
+
+    max_pending = max_pending or 2 * n_workers
+    if backend == "thread":
+        executor = ThreadPoolExecutor(max_workers=n_workers)
+    else:
+        executor = ProcessPoolExecutor(max_workers=n_workers, mp_context=mp_context())
+    with executor:
+        pending = deque()
+        tasks = iter(task_args)
+        for args in itertools.islice(tasks, max_pending):
+            pending.append(executor.submit(func, *args))
+        try:
+            while pending:
+                result = pending.popleft().result()
+                for args in itertools.islice(tasks, 1):
+                    pending.append(executor.submit(func, *args))
+                yield result
+        finally:
+            # Konsumen berhenti lebih awal (atau terjadi error): batalkan tugas yang belum mulai.
+            for future in pending:
+                future.cancel()
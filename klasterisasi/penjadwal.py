@@ -0,0 +1,388 @@
+"""Antrian klasterisasi banyak sekolah yang dijalankan di pool worker terbatas.
+
+Setiap pekerjaan memproses satu roster sekolah (baca -> praproses ->
+klasterisasi -> deskripsi) di proses worker, lalu mempublikasikan hasilnya
+ke ``ResultStore`` milik sekolah tersebut (satu folder versi per snapshot).
+Susunan folder ``root``::
+
+    <sekolah>/            hasil per sekolah (lihat ResultStore)
+    <sekolah>/NAMA        nama sekolah seperti yang dimasukkan ke antrian
+    .antrian/<id>.json    status pekerjaan (ditulis atomik oleh worker dan penjadwal)
+    .antrian/<id>.kunci   kunci selama status sedang diperbarui
+    .antrian/<id>.<ext>   salinan file roster selama pekerjaan belum selesai
+    .antrian/<id>.batal   penanda pembatalan untuk pekerjaan yang sedang berjalan
+
+Status dibaca dari file sehingga semua sesi (dan proses) melihat antrian
+yang sama, dan pekerjaan yang berjalan tidak membebani proses web.
+Penjadwal pemilik pekerjaan mencatat pid dan detak (heartbeat) berkala di
+file status; pekerjaan hanya dianggap yatim bila pemiliknya sudah mati
+atau detaknya berhenti.
+"""
+
+import json
+import os
+import re
+import socket
+import tempfile
+import threading
+import time
+import uuid
+from concurrent.futures import ProcessPoolExecutor, ThreadPoolExecutor
+from contextlib import contextmanager
+
+from klasterisasi.paralel import mp_context, resolve_n_jobs
+from klasterisasi.publikasi import ResultStore
+
+JOBS_DIR = ".antrian"
+NAME_FILE = "NAMA"
+# Status pekerjaan.
+MENUNGGU, BERJALAN, SELESAI, GAGAL, DIBATALKAN = "menunggu", "berjalan", "selesai", "gagal", "dibatalkan"
+FINAL_STATES = (SELESAI, GAGAL, DIBATALKAN)
+# Bagian progres yang dipakai tahap klasterisasi (sisanya untuk baca, praproses, deskripsi, publikasi).
+_CLUSTER_SHARE = (0.2, 0.9)
+# Detik antar-detak penjadwal; pekerjaan yang detaknya lebih tua dari HEARTBEAT_STALE dianggap yatim.
+HEARTBEAT_SECONDS = 10
+HEARTBEAT_STALE = 60
+# Kunci status yang lebih tua dari ini ditinggalkan proses yang mati di tengah pembaruan.
+LOCK_STALE = 10
+
+
+class JobCancelled(Exception):
+    pass
+
+
+def school_key(name):
+    """Nama folder yang aman untuk nama sekolah (huruf kecil, selain huruf/angka menjadi "-")."""
+    key = re.sub(r"[^0-9a-z]+", "-", str(name).strip().lower()).strip("-")
+    if not key:
+        raise ValueError("Nama sekolah tidak boleh kosong.")
+    return key
+
+
+def _write_json(path, data):
+    fd, tmp_path = tempfile.mkstemp(dir=os.path.dirname(path), suffix=".tmp")
+    try:
+        with os.fdopen(fd, "w", encoding="utf-8") as f:
+            json.dump(data, f, ensure_ascii=False)
+        os.replace(tmp_path, path)
+    except BaseException:
+        if os.path.exists(tmp_path):
+            os.remove(tmp_path)
+        raise
+
+
+def _read_json(path):
+    try:
+        with open(path, encoding="utf-8") as f:
+            return json.load(f)
+    except (OSError, ValueError):
+        return None
+
+
+def _pid_alive(pid):
+    if os.name == "nt":
+        # os.kill di Windows menghentikan proses; hanya detak yang dipakai di sana.
+        return True
+    try:
+        os.kill(pid, 0)
+    except ProcessLookupError:
+        return False
+    except PermissionError:
+        return True
+    return True
+
+
+def list_schools(root):
+    """Dict folder ``ResultStore`` -> nama sekolah untuk sekolah di ``root`` yang sudah memiliki hasil.
+
+    Hanya membaca folder hasil (tanpa file status antrian), sehingga murah
+    dipanggil halaman baca-saja seperti dasbor Kepala Sekolah.
+    """
+    schools = {}
+    try:
+        entries = sorted(os.listdir(root))
+    except FileNotFoundError:
+        return schools
+    for entry in entries:
+        directory = os.path.join(root, entry)
+        if entry.startswith(".") or not os.path.isdir(directory) or ResultStore(directory).latest() is None:
+            continue
+        try:
+            with open(os.path.join(directory, NAME_FILE), encoding="utf-8") as f:
+                schools[directory] = f.read().strip() or entry
+        except FileNotFoundError:
+            schools[directory] = entry
+    return schools
+
+
+class _JobFiles:
+    """Akses file status dan penanda batal satu pekerjaan (dipakai worker dan penjadwal)."""
+
+    def __init__(self, jobs_dir, job_id):
+        self.status_path = os.path.join(jobs_dir, f"{job_id}.json")
+        self.lock_path = os.path.join(jobs_dir, f"{job_id}.kunci")
+        self.cancel_path = os.path.join(jobs_dir, f"{job_id}.batal")
+
+    @contextmanager
+    def _locked(self):
+        # Lockfile O_EXCL (juga berfungsi di Windows): hanya satu proses yang membaca-ubah-tulis status.
+        while True:
+            try:
+                os.close(os.open(self.lock_path, os.O_CREAT | os.O_EXCL | os.O_WRONLY))
+                break
+            except FileExistsError:
+                try:
+                    if time.time() - os.path.getmtime(self.lock_path) > LOCK_STALE:
+                        os.remove(self.lock_path)
+                        continue
+                except FileNotFoundError:
+                    continue
+                time.sleep(0.01)
+        try:
+            yield
+        finally:
+            try:
+                os.remove(self.lock_path)
+            except FileNotFoundError:
+                pass
+
+    def update(self, when=None, **fields):
+        """Perbarui ``fields`` di file status dan kembalikan status terbaru.
+
+        Status akhir (``FINAL_STATES``) tidak pernah diubah lagi, dan bila
+        ``when(status)`` bernilai False file dibiarkan; keduanya diperiksa
+        di dalam kunci.
+        """
+        with self._locked():
+            status = _read_json(self.status_path) or {}
+            if status.get("status") in FINAL_STATES or (when is not None and not when(status)):
+                return status
+            status.update(fields, diperbarui=time.strftime("%Y-%m-%d %H:%M:%S"))
+            _write_json(self.status_path, status)
+        return status
+
+    def check_cancelled(self):
+        if os.path.exists(self.cancel_path):
+            raise JobCancelled()
+
+
+def run_school_job(jobs_dir, job_id, input_path, store_dir, n_clusters, n_init, random_state, keep):
+    """Dijalankan di worker: proses satu roster sekolah dan publikasikan hasilnya.
+
+    Status dan progres ditulis ke file status setelah setiap tahap dan
+    setiap restart K-Prototypes; penanda batal diperiksa pada titik yang
+    sama. Mengembalikan status akhir.
+    """
+    # Diimpor di worker agar proses web tidak perlu memuat mesin klasterisasi.
+    from klasterisasi.pipeline import cluster_data, generate_cluster_descriptions, preprocess
+    from klasterisasi.profil import build_cluster_profile
+    from klasterisasi.skema import CATEGORICAL_COLS, NUMERIC_COLS, compact_students
+    from klasterisasi.unggah import read_students
+
+    files = _JobFiles(jobs_dir, job_id)
+    try:
+        files.check_cancelled()
+        files.update(status=BERJALAN, mulai=time.strftime("%Y-%m-%d %H:%M:%S"), pid=os.getpid(),
+                     tahap="baca", progres=0.)
+        df_original = compact_students(read_students(input_path))
+
+        files.check_cancelled()
+        files.update(tahap="praproses", progres=0.1, n_siswa=len(df_original))
+        df_preprocessed, _, warnings = preprocess(df_original)
+
+        files.check_cancelled()
+        files.update(tahap="klasterisasi", progres=_CLUSTER_SHARE[0], peringatan=warnings)
+        best_cost = [None]
+
+        def on_restart(done, total, cost):
+            best_cost[0] = cost if best_cost[0] is None else min(best_cost[0], cost)
+            start, stop = _CLUSTER_SHARE
+            files.update(progres=start + (stop - start) * done / total,
+                         pesan=f"Restart {done}/{total} selesai (cost terbaik: {best_cost[0]:.2f})")
+            files.check_cancelled()
+
+        # None = bawaan pipeline (KPROTO_N_INIT / KPROTO_RANDOM_STATE).
+        params = {key: value for key, value in (("n_init", n_init), ("random_state", random_state))
+                  if value is not None}
+        df_clustered_normalized, model, _ = cluster_data(df_preprocessed, n_clusters, progress=on_restart, **params)
+
+        files.check_cancelled()
+        files.update(tahap="deskripsi", progres=_CLUSTER_SHARE[1])
+        profil = build_cluster_profile(df_clustered_normalized, n_clusters, NUMERIC_COLS, CATEGORICAL_COLS)
+        descriptions = generate_cluster_descriptions(df_clustered_normalized, n_clusters, profil)
+        df_final = df_original.assign(Klaster=df_clustered_normalized["Klaster"])
+        versi = ResultStore(store_dir, keep=keep).publish(df_final, df_clustered_normalized, n_clusters,
+                                                          descriptions)
+        return files.update(status=SELESAI, tahap="selesai", progres=1., versi=versi, cost=float(model.cost_),
+                            selesai=time.strftime("%Y-%m-%d %H:%M:%S"), pesan=None)
+    except JobCancelled:
+        return files.update(status=DIBATALKAN, selesai=time.strftime("%Y-%m-%d %H:%M:%S"), pesan=None)
+    except Exception as e:
+        return files.update(status=GAGAL, selesai=time.strftime("%Y-%m-%d %H:%M:%S"),
+                            pesan=f"{type(e).__name__}: {e}")
+    finally:
+        for path in (input_path, files.cancel_path):
+            try:
+                os.remove(path)
+            except FileNotFoundError:
+                pass
+
+
+class JobScheduler:
+    """Antrian pekerjaan klasterisasi per sekolah dengan paling banyak ``max_workers`` fit bersamaan.
+
+    ``submit`` menyalin roster ke folder antrian dan mengembalikan id
+    pekerjaan; ``jobs`` membaca status semua pekerjaan (``batal_diminta``
+    bernilai True selama pekerjaan berjalan menunggu dibatalkan); ``cancel``
+    membatalkan pekerjaan yang belum mulai atau menandai yang sedang
+    berjalan agar berhenti pada restart berikutnya. Selama pekerjaan
+    belum selesai, penjadwal memperbarui detaknya setiap
+    ``HEARTBEAT_SECONDS``; saat penjadwal dibuat, pekerjaan yang masih
+    menunggu/berjalan milik penjadwal yang prosesnya sudah mati atau
+    detaknya berhenti (mis. server dimulai ulang) ditandai gagal.
+    Penjadwal lain yang masih hidup di folder yang sama tidak diganggu.
+    """
+
+    def __init__(self, root, max_workers=2, backend="process", keep=3, max_jobs=200):
+        self.root = root
+        self.jobs_dir = os.path.join(root, JOBS_DIR)
+        self.keep = keep
+        self.max_jobs = max_jobs
+        os.makedirs(self.jobs_dir, exist_ok=True)
+        self._owner = uuid.uuid4().hex
+        self._host = socket.gethostname()
+        self._futures = {}
+        self._lock = threading.Lock()
+        self._stop = threading.Event()
+        n_workers = resolve_n_jobs(max_workers, os.cpu_count() or 1)
+        if backend == "thread":
+            self._executor = ThreadPoolExecutor(max_workers=n_workers)
+        else:
+            self._executor = ProcessPoolExecutor(max_workers=n_workers, mp_context=mp_context())
+        self._mark_orphans()
+        self._heartbeat_thread = threading.Thread(target=self._heartbeat, name="penjadwal-detak", daemon=True)
+        self._heartbeat_thread.start()
+
+    def _heartbeat(self):
+        while not self._stop.wait(HEARTBEAT_SECONDS):
+            with self._lock:
+                job_ids = list(self._futures)
+            for job_id in job_ids:
+                try:
+                    _JobFiles(self.jobs_dir, job_id).update(detak=time.time())
+                except OSError:
+                    pass
+
+    def _is_orphan(self, status):
+        if status.get("status") in FINAL_STATES or status.get("penjadwal") == self._owner:
+            return False
+        if time.time() - status.get("detak", 0.) > HEARTBEAT_STALE:
+            return True
+        # pid hanya bermakna di mesin yang sama (folder antrian dapat berupa folder jaringan).
+        pid = status.get("penjadwal_pid")
+        return status.get("host") == self._host and pid is not None and not _pid_alive(pid)
+
+    def _mark_orphans(self):
+        for status in self.jobs():
+            if self._is_orphan(status):
+                _JobFiles(self.jobs_dir, status["id"]).update(
+                    when=self._is_orphan, status=GAGAL,
+                    pesan="Penjadwal berhenti sebelum pekerjaan selesai; kirim ulang roster.")
+
+    def submit(self, school, source, file_name, n_clusters, n_init=None, random_state=None):
+        """Masukkan roster ``source`` (bytes, objek file, atau path) sekolah ``school`` ke antrian."""
+        key = school_key(school)
+        job_id = f"{time.strftime('%Y%m%d-%H%M%S')}-{uuid.uuid4().hex[:8]}"
+        ext = os.path.splitext(str(file_name))[1].lower()
+        input_path = os.path.join(self.jobs_dir, f"{job_id}{ext}")
+        if isinstance(source, (bytes, bytearray)):
+            data = source
+        elif hasattr(source, "read"):
+            source.seek(0)
+            data = source.read()
+        else:
+            with open(source, "rb") as f:
+                data = f.read()
+        with open(input_path, "wb") as f:
+            f.write(data)
+
+        store_dir = os.path.join(self.root, key)
+        os.makedirs(store_dir, exist_ok=True)
+        with open(os.path.join(store_dir, NAME_FILE), "w", encoding="utf-8") as f:
+            f.write(str(school).strip())
+
+        files = _JobFiles(self.jobs_dir, job_id)
+        files.update(id=job_id, sekolah=str(school).strip(), kunci=key, file=os.path.basename(str(file_name)),
+                     k=int(n_clusters), status=MENUNGGU, tahap=None, progres=0., pesan=None,
+                     dibuat=time.strftime("%Y-%m-%d %H:%M:%S"), antri=time.time(), penjadwal=self._owner,
+                     penjadwal_pid=os.getpid(), host=self._host, detak=time.time())
+        future = self._executor.submit(run_school_job, self.jobs_dir, job_id, input_path, store_dir,
+                                       int(n_clusters), n_init, random_state, self.keep)
+        with self._lock:
+            self._futures[job_id] = future
+        future.add_done_callback(lambda f, job_id=job_id: self._on_done(job_id, f))
+        self._prune()
+        return job_id
+
+    def _on_done(self, job_id, future):
+        with self._lock:
+            self._futures.pop(job_id, None)
+        if future.cancelled():
+            return
+        error = future.exception()
+        if error is not None:
+            # Worker mati sebelum sempat menulis status akhir (mis. kehabisan memori).
+            _JobFiles(self.jobs_dir, job_id).update(status=GAGAL, pesan=f"{type(error).__name__}: {error}",
+                                                    selesai=time.strftime("%Y-%m-%d %H:%M:%S"))
+
+    def cancel(self, job_id):
+        files = _JobFiles(self.jobs_dir, job_id)
+        with self._lock:
+            future = self._futures.get(job_id)
+        if future is not None and future.cancel():
+            files.update(status=DIBATALKAN, selesai=time.strftime("%Y-%m-%d %H:%M:%S"))
+            for ext in (".xlsx", ".csv", ".parquet"):
+                try:
+                    os.remove(os.path.join(self.jobs_dir, f"{job_id}{ext}"))
+                except FileNotFoundError:
+                    pass
+            return True
+        status = _read_json(files.status_path)
+        if status is None or status["status"] in FINAL_STATES:
+            return False
+        # Status tidak ditulis di sini agar tidak berebut dengan worker; jobs() melaporkan penandanya.
+        with open(files.cancel_path, "w"):
+            pass
+        return True
+
+    def jobs(self):
+        """Status semua pekerjaan, yang paling baru dibuat lebih dulu."""
+        statuses = []
+        with os.scandir(self.jobs_dir) as it:
+            for entry in it:
+                if entry.name.endswith(".json"):
+                    status = _read_json(entry.path)
+                    if status is not None and "id" in status:
+                        status["batal_diminta"] = os.path.exists(_JobFiles(self.jobs_dir, status["id"]).cancel_path)
+                        statuses.append(status)
+        return sorted(statuses, key=lambda status: status["antri"], reverse=True)
+
+    def _prune(self):
+        # Hanya status pekerjaan yang sudah selesai yang dihapus.
+        finished = [status for status in self.jobs() if status["status"] in FINAL_STATES]
+        for status in finished[self.max_jobs:]:
+            try:
+                os.remove(_JobFiles(self.jobs_dir, status["id"]).status_path)
+            except FileNotFoundError:
+                pass
+
+    def schools(self):
+        """Dict kunci sekolah -> nama sekolah untuk sekolah yang sudah memiliki hasil."""
+        return {os.path.basename(directory): name for directory, name in list_schools(self.root).items()}
+
+    def result_store(self, key):
+        return ResultStore(os.path.join(self.root, key), keep=self.keep)
+
+    def shutdown(self, wait=False):
+        self._stop.set()
+        self._executor.shutdown(wait=wait, cancel_futures=True)
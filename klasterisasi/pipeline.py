@@ -0,0 +1,191 @@
+"""Pipeline unggah -> praproses -> klasterisasi -> laporan tanpa Streamlit.
+
+Fungsi di sini tidak menampilkan pesan; kesalahan dilempar sebagai exception
+dan peringatan dikembalikan sebagai daftar teks agar pemanggil (aplikasi
+Streamlit atau CLI) yang memutuskan cara menampilkannya.
+"""
+
+import json
+import os
+
+import numpy as np
+import pandas as pd
+from sklearn.preprocessing import StandardScaler
+
+from klasterisasi.artefak import MODEL_SUFFIX, save_model_artifact
+from klasterisasi.diagnostik import StageTimer
+from klasterisasi.kprototypes import KPrototypes, encode_categorical
+from klasterisasi.profil import build_cluster_profile, profile_summary
+from klasterisasi.skema import (ALL_FEATURES_FOR_CLUSTERING, CATEGORICAL_COLS, FLAG_DTYPE, NUMERIC_COLS,
+                                NUMERIC_DTYPE, compact_students, label_dtype)
+from klasterisasi.unggah import read_students
+
+KPROTO_N_INIT = 10
+KPROTO_RANDOM_STATE = 42
+# Toleransi konvergensi (lihat kprototypes_single); 0 = berhenti hanya bila tidak ada perbaikan.
+KPROTO_TOL = 0.
+KPROTO_MOVE_TOL = 0.
+
+
+def preprocess(df):
+    """Bersihkan dan normalisasi fitur klasterisasi.
+
+    Mengembalikan (data ternormalisasi, scaler, daftar peringatan). Data
+    ternormalisasi bertipe ringkas: fitur numerik float32 dan flag uint8.
+    Melempar ValueError bila ada kolom fitur yang tidak ditemukan.
+    """
+    df_processed = compact_students(df[[col for col in df.columns if str(col).strip() in ALL_FEATURES_FOR_CLUSTERING]])
+
+    missing_cols = [col for col in ALL_FEATURES_FOR_CLUSTERING if col not in df_processed.columns]
+    if missing_cols:
+        raise ValueError(f"Kolom-kolom berikut tidak ditemukan: {', '.join(missing_cols)}.")
+
+    warnings = []
+    numeric = {}
+    for col in NUMERIC_COLS:
+        numeric[col] = pd.to_numeric(df_processed[col], errors="coerce").astype(np.float64)
+        if numeric[col].isnull().any():
+            mean_val = numeric[col].mean()
+            numeric[col] = numeric[col].fillna(mean_val)
+            warnings.append(f"Nilai kosong pada kolom '{col}' diisi dengan rata-rata: {mean_val:.2f}.")
+
+    # Scaler di-fit dengan float64; hanya hasil normalisasinya yang disimpan sebagai float32.
+    scaler = StandardScaler()
+    scaled = scaler.fit_transform(pd.DataFrame(numeric)).astype(NUMERIC_DTYPE)
+    df_clean_for_clustering = pd.DataFrame(
+        {**{col: scaled[:, i] for i, col in enumerate(NUMERIC_COLS)},
+         **{col: df_processed[col] for col in CATEGORICAL_COLS}},
+        index=df_processed.index)
+
+    return df_clean_for_clustering, scaler, warnings
+
+
+def encode_features(df_preprocessed):
+    """Pisahkan data praproses menjadi (Xnum, Xcat terkode, enc_map, indeks kolom kategorikal).
+
+    Kolom dibaca langsung dari tipe ringkasnya (tanpa array object);
+    ``enc_map`` flag 0/1 berisi nilai uint8.
+    """
+    categorical_feature_indices = [ALL_FEATURES_FOR_CLUSTERING.index(c) for c in CATEGORICAL_COLS]
+    Xnum = np.ascontiguousarray(df_preprocessed[NUMERIC_COLS].to_numpy(dtype=np.float64))
+    if all(df_preprocessed[col].dtype == FLAG_DTYPE for col in CATEGORICAL_COLS):
+        Xcat = df_preprocessed[CATEGORICAL_COLS].to_numpy()
+    else:
+        Xcat = df_preprocessed[CATEGORICAL_COLS].to_numpy(dtype=object)
+    Xcat, enc_map = encode_categorical(Xcat)
+    return Xnum, Xcat, enc_map, categorical_feature_indices
+
+
+def attach_labels(df, labels, n_clusters):
+    """Tambahkan kolom Klaster (bilangan bulat ringkas) tanpa menyalin kolom lain."""
+    return df.assign(Klaster=np.asarray(labels).astype(label_dtype(n_clusters)))
+
+
+def cluster_data(df_preprocessed, n_clusters, n_init=KPROTO_N_INIT, random_state=KPROTO_RANDOM_STATE,
+                 backend="serial", n_jobs=1, progress=None, monitor=None, tol=KPROTO_TOL, move_tol=KPROTO_MOVE_TOL,
+                 accelerate=True):
+    """Fit K-Prototypes (init Huang); mengembalikan (data + kolom Klaster, model, indeks kategorikal).
+
+    ``tol`` dan ``move_tol`` menghentikan setiap restart lebih awal bila cost
+    turun tidak lebih dari ``tol`` (relatif) atau titik yang pindah tidak
+    lebih dari ``move_tol`` (proporsi); ``accelerate`` memakai batas jarak
+    (partisinya sama). ``monitor`` (``SharedProgress`` dengan
+    ``MONITOR_FIELDS``, satu baris per restart) menerima iterasi dan cost
+    setiap restart dan dapat membatalkan fit.
+    """
+    Xnum, Xcat, enc_map, categorical_feature_indices = encode_features(df_preprocessed)
+
+    kproto = KPrototypes(n_clusters=n_clusters, init='Huang', n_init=n_init, verbose=0, random_state=random_state,
+                         n_jobs=n_jobs, backend=backend, tol=tol, move_tol=move_tol, accelerate=accelerate)
+    kproto.fit_encoded(Xnum, Xcat, enc_map, progress=progress, monitor=monitor)
+
+    return attach_labels(df_preprocessed, kproto.labels_, n_clusters), kproto, categorical_feature_indices
+
+
+def generate_cluster_descriptions(df_clustered_normalized, n_clusters, profil=None):
+    # Rata-rata dan modus dibaca dari profil klaster (satu groupby), bukan disaring per klaster.
+    if profil is None:
+        profil = build_cluster_profile(df_clustered_normalized, n_clusters, NUMERIC_COLS, CATEGORICAL_COLS)
+    return {i: describe_cluster(profil["rata_rata"].loc[i], profil["modus"].loc[i])
+            for i in range(n_clusters) if profil["jumlah"][i] > 0}
+
+
+def describe_cluster(avg_scaled_values, mode_values):
+    """Deskripsi teks satu klaster dari rata-rata fitur numerik ternormalisasi dan modus flag."""
+    desc = ""
+    # Deskripsi Nilai Akademik
+    if avg_scaled_values["Rata Rata Nilai Akademik"] > 0.75: desc += "Nilai akademik sangat tinggi. "
+    elif avg_scaled_values["Rata Rata Nilai Akademik"] > 0.25: desc += "Nilai akademik di atas rata-rata. "
+    elif avg_scaled_values["Rata Rata Nilai Akademik"] < -0.75: desc += "Nilai akademik sangat rendah. "
+    elif avg_scaled_values["Rata Rata Nilai Akademik"] < -0.25: desc += "Nilai akademik di bawah rata-rata. "
+    else: desc += "Nilai akademik rata-rata. "
+
+    # Deskripsi Kehadiran
+    if avg_scaled_values["Kehadiran"] > 0.75: desc += "Kehadiran sangat tinggi. "
+    elif avg_scaled_values["Kehadiran"] > 0.25: desc += "Kehadiran di atas rata-rata. "
+    elif avg_scaled_values["Kehadiran"] < -0.75: desc += "Kehadiran sangat rendah. "
+    elif avg_scaled_values["Kehadiran"] < -0.25: desc += "Kehadiran di bawah rata-rata. "
+    else: desc += "Kehadiran rata-rata. "
+    
+    ekskul_aktif_modes = [col for col in CATEGORICAL_COLS if str(mode_values[col]) == '1']
+    if ekskul_aktif_modes:
+        desc += f"Aktif di ekstrakurikuler: {', '.join([c.replace('Ekstrakurikuler ', '') for c in ekskul_aktif_modes])}."
+    else:
+        desc += "Cenderung tidak aktif di ekstrakurikuler."
+    return desc
+
+
+def run_pipeline(input_path, n_clusters, out_dir, n_init=KPROTO_N_INIT, random_state=KPROTO_RANDOM_STATE,
+                 backend="serial", n_jobs=1, cache_dir=None, timer=None, save_model=False, tol=KPROTO_TOL,
+                 move_tol=KPROTO_MOVE_TOL):
+    """Proses satu file data siswa dan tulis hasilnya ke ``out_dir``.
+
+    Menulis ``<nama>_klaster.xlsx`` (data asli + kolom Klaster) dan
+    ``<nama>_ringkasan.json`` (deskripsi, jumlah anggota, statistik per klaster,
+    cost, waktu dan catatan diagnostik per tahap). ``cache_dir`` adalah folder
+    cache kolom hasil pembacaan file (lihat ``read_students``); ``timer`` adalah
+    ``StageTimer`` yang dipakai bila pemanggil ingin menyimpan catatannya.
+    Bila ``save_model``, artefak model untuk prediksi ditulis ke
+    ``<nama>_model.kproto``. Mengembalikan isi ringkasan tersebut.
+    """
+    timer = timer if timer is not None else StageTimer(label=os.path.basename(input_path))
+    with timer.stage("baca") as info:
+        df_original = read_students(input_path, cache_dir=cache_dir)
+        info["baris"] = len(df_original)
+    with timer.stage("praproses", rows=len(df_original)):
+        df_preprocessed, scaler, warnings = preprocess(df_original)
+    with timer.stage("klasterisasi", rows=len(df_preprocessed)):
+        df_clustered_normalized, kproto_model, _ = cluster_data(df_preprocessed, n_clusters, n_init=n_init,
+                                                                random_state=random_state, backend=backend,
+                                                                n_jobs=n_jobs, tol=tol, move_tol=move_tol)
+    with timer.stage("deskripsi", rows=len(df_clustered_normalized)):
+        profil = build_cluster_profile(df_clustered_normalized, n_clusters, NUMERIC_COLS, CATEGORICAL_COLS)
+        cluster_characteristics_map = generate_cluster_descriptions(df_clustered_normalized, n_clusters, profil)
+
+    stem = os.path.splitext(os.path.basename(input_path))[0]
+    os.makedirs(out_dir, exist_ok=True)
+    hasil_path = os.path.join(out_dir, f"{stem}_klaster.xlsx")
+    with timer.stage("tulis", rows=len(df_original)):
+        df_final = compact_students(df_original).assign(Klaster=df_clustered_normalized["Klaster"])
+        df_final.to_excel(hasil_path, index=False, engine='openpyxl')
+
+    summary = {
+        "input": os.path.abspath(input_path),
+        "hasil": os.path.abspath(hasil_path),
+        "n_siswa": len(df_original),
+        "n_clusters": n_clusters,
+        "cost": float(kproto_model.cost_),
+        "iterasi": int(kproto_model.n_iter_),
+        "jumlah_per_klaster": {str(k): int(v) for k, v in profil["jumlah"].items()},
+        "deskripsi_klaster": {str(k): v for k, v in cluster_characteristics_map.items()},
+        "profil_klaster": profile_summary(profil),
+        "peringatan": warnings,
+        "waktu_detik": timer.timings,
+        "diagnostik": timer.to_record(),
+    }
+    if save_model:
+        summary["model"] = os.path.abspath(save_model_artifact(
+            os.path.join(out_dir, f"{stem}_model{MODEL_SUFFIX}"), kproto_model, scaler, cluster_characteristics_map))
+    with open(os.path.join(out_dir, f"{stem}_ringkasan.json"), "w", encoding="utf-8") as f:
+        json.dump(summary, f, ensure_ascii=False, indent=2)
+    return summary
@@ -0,0 +1,51 @@
+"""Prediksi klaster untuk banyak siswa baru sekaligus (dapat dipakai tanpa Streamlit)."""
+
+import numpy as np
+import pandas as pd
+
+from klasterisasi.kprototypes import encode_categorical
+from klasterisasi.skema import NUMERIC_DTYPE, as_flag, categorical_as_str
+
+
+def transform_features(df_new, scaler, model, numeric_cols, categorical_cols):
+    """Ubah data mentah menjadi (Xnum ternormalisasi, Xcat terkode) dalam satu langkah vektor.
+
+    Nilai numerik yang kosong diisi rata-rata data latih (``scaler.mean_``).
+    Hasil normalisasi dibulatkan ke float32 seperti data latih, dan flag
+    dikodekan dengan tipe yang sama dengan ``enc_map`` model.
+    """
+    return encode_students(df_new, scaler, model._enc_map, numeric_cols, categorical_cols)
+
+
+def encode_students(df_new, scaler, enc_map, numeric_cols, categorical_cols):
+    # Sama dengan transform_features, tetapi kategori diambil langsung dari enc_map.
+    df_new = df_new.rename(columns=lambda c: str(c).strip())
+    missing_cols = [col for col in numeric_cols + categorical_cols if col not in df_new.columns]
+    if missing_cols:
+        raise ValueError(f"Kolom-kolom berikut tidak ditemukan: {', '.join(missing_cols)}.")
+
+    mean = np.asarray(scaler.mean_, dtype=np.float64)
+    scale = np.asarray(scaler.scale_, dtype=np.float64)
+    num = df_new[numeric_cols].apply(pd.to_numeric, errors="coerce").to_numpy(dtype=np.float64)
+    num = np.where(np.isnan(num), mean, num)
+    Xnum = np.ascontiguousarray(((num - mean) / scale).astype(NUMERIC_DTYPE), dtype=np.float64)
+
+    columns = []
+    for col, categories in zip(categorical_cols, enc_map):
+        # Model lama (cache) menyimpan kategori sebagai teks "0"/"1".
+        values = as_flag(df_new[col]) if categories.dtype.kind in "biu" else categorical_as_str(df_new[col])
+        columns.append(values.to_numpy())
+    cat = np.column_stack(columns) if columns else np.empty((len(df_new), 0))
+    Xcat, _ = encode_categorical(cat.reshape(len(df_new), len(categorical_cols)), enc_map=enc_map)
+    return Xnum, Xcat
+
+
+def predict_students(df_new, scaler, model, numeric_cols, categorical_cols, cluster_descriptions=None):
+    """Kembalikan salinan ``df_new`` dengan kolom "Klaster" (dan deskripsinya bila tersedia)."""
+    Xnum, Xcat = transform_features(df_new, scaler, model, numeric_cols, categorical_cols)
+    df_result = df_new.copy()
+    df_result["Klaster"] = model.predict_encoded(Xnum, Xcat) if len(df_new) else np.empty(0, dtype=np.uint16)
+    if cluster_descriptions is not None:
+        df_result["Karakteristik Klaster"] = df_result["Klaster"].map(
+            lambda k: cluster_descriptions.get(int(k), "Deskripsi tidak ada."))
+    return df_result
@@ -0,0 +1,97 @@
+"""Artefak profil klaster yang dihitung sekali setelah klasterisasi."""
+
+import hashlib
+
+import numpy as np
+import pandas as pd
+
+# Statistik fitur numerik per klaster (nama kunci di profil["statistik"]).
+NUMERIC_STATISTICS = ["mean", "std", "min", "q25", "median", "q75", "max"]
+
+
+def build_cluster_profile(df_clustered_normalized, n_clusters, numeric_cols, categorical_cols):
+    """Hitung semua agregat per klaster dari satu objek groupby.
+
+    Hasilnya berisi jumlah anggota, statistik fitur numerik (rata-rata,
+    simpangan baku, min, kuartil, maks), frekuensi setiap kategori, dan modus
+    kategorikal. Deskripsi klaster, grafik profil dan laporan membaca tabel
+    ini alih-alih menyaring data per klaster. ``versi`` profil adalah hash
+    label dan fitur, sehingga tampilan (dan cache grafik) mengetahui kapan
+    profil berganti, sedangkan data dan label yang sama selalu memberi versi
+    yang sama.
+    """
+    clusters = range(n_clusters)
+    grouped = df_clustered_normalized.groupby("Klaster", sort=True)
+    counts = grouped.size().reindex(clusters, fill_value=0)
+
+    # Semua reduksi memakai pengelompokan yang sama (label difaktorkan sekali oleh groupby).
+    numeric = grouped[numeric_cols]
+    # Ketiga kuartil dihitung dalam satu pengurutan per klaster.
+    quartiles = numeric.quantile([0.25, 0.5, 0.75])
+    statistics = {
+        "mean": numeric.mean(),
+        "std": numeric.std(),
+        "min": numeric.min(),
+        "q25": quartiles.xs(0.25, level=1),
+        "median": quartiles.xs(0.5, level=1),
+        "q75": quartiles.xs(0.75, level=1),
+        "max": numeric.max(),
+    }
+    statistics = {name: table.reindex(clusters) for name, table in statistics.items()}
+
+    # Frekuensi kategori: satu bincount atas (label, kode kategori) per kolom.
+    labels = df_clustered_normalized["Klaster"].to_numpy().astype(np.intp)
+    frequencies, modes = {}, {}
+    for col in categorical_cols:
+        codes, categories = pd.factorize(df_clustered_normalized[col], sort=True)
+        valid = codes >= 0
+        counts_flat = np.bincount(labels[valid] * len(categories) + codes[valid],
+                                  minlength=n_clusters * len(categories))
+        freq = pd.DataFrame(counts_flat.reshape(n_clusters, len(categories)), index=pd.Index(clusters, name="Klaster"),
+                            columns=categories)
+        frequencies[col] = freq
+        freq = freq[freq.sum(axis=1) > 0]
+        # Kolom terurut naik, jadi idxmax memilih nilai terkecil bila frekuensinya sama (seperti .mode()).
+        # object agar klaster kosong (NaN) tidak mengubah modus klaster lain menjadi float.
+        modes[col] = freq.idxmax(axis=1).astype(object)
+    modes = pd.DataFrame(modes, columns=categorical_cols).reindex(clusters)
+
+    return {
+        "versi": _profile_version(df_clustered_normalized, n_clusters, numeric_cols, categorical_cols),
+        "n_clusters": n_clusters,
+        "df_normalized": df_clustered_normalized,
+        "jumlah": counts,
+        "rata_rata": statistics["mean"],
+        "statistik": statistics,
+        "frekuensi": frequencies,
+        "modus": modes,
+    }
+
+
+def _profile_version(df, n_clusters, numeric_cols, categorical_cols):
+    h = hashlib.blake2b(digest_size=16)
+    h.update(repr((n_clusters, len(df), numeric_cols, categorical_cols)).encode())
+    for col in ["Klaster"] + numeric_cols + categorical_cols:
+        series = df[col]
+        if pd.api.types.is_numeric_dtype(series.dtype) and not isinstance(series.dtype, pd.CategoricalDtype):
+            # Kolom numerik (termasuk flag) di-hash langsung dari isi array-nya.
+            values = np.ascontiguousarray(series.to_numpy())
+            h.update(values.dtype.str.encode())
+        else:
+            values = pd.util.hash_pandas_object(series, index=False).to_numpy()
+        h.update(values.data)
+    return h.hexdigest()
+
+
+def profile_summary(profil):
+    """Profil dalam bentuk dict siap-JSON: {klaster: {jumlah, numerik: {kolom: {statistik}}, frekuensi}}."""
+    summary = {}
+    for k in range(profil["n_clusters"]):
+        if profil["jumlah"][k] == 0:
+            continue
+        numeric = {col: {name: float(table.loc[k, col]) for name, table in profil["statistik"].items()}
+                   for col in profil["rata_rata"].columns}
+        frequencies = {col: {str(category): int(n) for category, n in freq.loc[k].items()}
+                       for col, freq in profil["frekuensi"].items()}
+        summary[str(k)] = {"jumlah": int(profil["jumlah"][k]), "numerik": numeric, "frekuensi": frequencies}
+    return summary
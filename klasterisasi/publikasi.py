@@ -0,0 +1,161 @@
+"""Tempat hasil klasterisasi yang dipublikasikan, dipakai bersama oleh semua sesi dan proses.
+
+Setiap publikasi adalah satu folder versi yang tidak pernah diubah lagi:
+kolom tabel disimpan sebagai file ``.npy`` terpisah sehingga kolom numerik
+dapat dibuka dengan memory-map (tanpa salinan; halaman file dibagi lewat
+page cache OS),
+ditambah ``meta.json`` berisi deskripsi klaster dan daftar kolom. File
+``TERBARU`` menunjuk ke versi yang paling baru dipublikasikan. Analisis
+yang dijalankan belakangan atas satu versi (mis. stabilitas klaster)
+disimpan sebagai lampiran ``lampiran_<nama>.npz`` di folder versinya;
+tabel versi itu sendiri tidak berubah.
+"""
+
+import json
+import os
+import shutil
+import tempfile
+import time
+import uuid
+
+import numpy as np
+import pandas as pd
+
+# Naikkan bila format folder versi berubah sehingga publikasi lama tidak lagi valid.
+STORE_VERSION = 1
+LATEST_FILE = "TERBARU"
+
+
+def _save_frame(directory, prefix, df):
+    # Kolom numerik disimpan apa adanya; kolom teks/kategori sebagai kode + daftar kategori.
+    columns = []
+    for i, col in enumerate(df.columns):
+        series = df[col]
+        spec = {"nama": col, "file": f"{prefix}_{i}.npy"}
+        if isinstance(series.dtype, pd.CategoricalDtype) or not pd.api.types.is_numeric_dtype(series.dtype) \
+                or pd.api.types.is_bool_dtype(series.dtype):
+            spec["tipe"] = "category" if isinstance(series.dtype, pd.CategoricalDtype) else "str"
+            values = series if spec["tipe"] == "category" else series.astype("category")
+            spec["kategori"] = [str(c) for c in values.cat.categories]
+            array = values.cat.codes.to_numpy()
+        else:
+            spec["tipe"] = "array"
+            array = series.to_numpy()
+        np.save(os.path.join(directory, spec["file"]), np.ascontiguousarray(array), allow_pickle=False)
+        columns.append(spec)
+    return columns
+
+
+def _load_frame(directory, columns):
+    data = {}
+    for spec in columns:
+        array = np.load(os.path.join(directory, spec["file"]), mmap_mode="r", allow_pickle=False)
+        if spec["tipe"] == "array":
+            data[spec["nama"]] = array
+            continue
+        values = pd.Categorical.from_codes(array, categories=spec["kategori"])
+        # Kolom teks/kategori dibangun ulang sekali per proses (kodenya hanya 1-4 byte per baris).
+        data[spec["nama"]] = values if spec["tipe"] == "category" else pd.Series(values).astype(str).where(array >= 0)
+    return pd.DataFrame(data, copy=False)
+
+
+class ResultStore:
+    """Publikasikan dan baca hasil klasterisasi berversi di ``directory``.
+
+    ``publish`` menulis folder versi baru secara atomik (folder sementara
+    lalu rename) dan memindahkan penunjuk ``TERBARU``; hanya ``keep`` versi
+    terakhir yang disimpan. Pembaca cukup memanggil ``latest`` lalu ``load``.
+    """
+
+    def __init__(self, directory, keep=3):
+        self.directory = directory
+        self.keep = keep
+
+    def publish(self, df_clustered, df_normalized, n_clusters, cluster_characteristics_map):
+        os.makedirs(self.directory, exist_ok=True)
+        # Nama versi terurut sesuai waktu publikasi (sampai mikrodetik), yang dipakai _prune.
+        now = time.time()
+        stamp = time.strftime("%Y%m%d-%H%M%S", time.localtime(now))
+        versi = f"{stamp}-{int(now * 1e6) % 1_000_000:06d}-{uuid.uuid4().hex[:8]}"
+        tmp_dir = tempfile.mkdtemp(dir=self.directory, prefix=".tmp-")
+        try:
+            meta = {
+                "format": STORE_VERSION,
+                "versi": versi,
+                "waktu": time.strftime("%Y-%m-%d %H:%M:%S"),
+                "n_clusters": int(n_clusters),
+                "cluster_characteristics_map": {str(k): v for k, v in cluster_characteristics_map.items()},
+                "siswa": _save_frame(tmp_dir, "siswa", df_clustered),
+                "normal": _save_frame(tmp_dir, "normal", df_normalized),
+            }
+            with open(os.path.join(tmp_dir, "meta.json"), "w", encoding="utf-8") as f:
+                json.dump(meta, f, ensure_ascii=False)
+            os.rename(tmp_dir, os.path.join(self.directory, versi))
+        except BaseException:
+            shutil.rmtree(tmp_dir, ignore_errors=True)
+            raise
+
+        fd, tmp_path = tempfile.mkstemp(dir=self.directory, suffix=".tmp")
+        with os.fdopen(fd, "w", encoding="utf-8") as f:
+            f.write(versi)
+        os.replace(tmp_path, os.path.join(self.directory, LATEST_FILE))
+        self._prune(keep=versi)
+        return versi
+
+    def latest(self):
+        try:
+            with open(os.path.join(self.directory, LATEST_FILE), encoding="utf-8") as f:
+                return f.read().strip() or None
+        except FileNotFoundError:
+            return None
+
+    def load(self, versi):
+        """Baca satu versi; kolom numerik berupa memory-map read-only."""
+        directory = os.path.join(self.directory, versi)
+        with open(os.path.join(directory, "meta.json"), encoding="utf-8") as f:
+            meta = json.load(f)
+        if meta.get("format") != STORE_VERSION:
+            raise ValueError(f"Format hasil versi {versi} tidak dikenali.")
+        return {
+            "versi": meta["versi"],
+            "waktu": meta["waktu"],
+            "n_clusters": meta["n_clusters"],
+            "cluster_characteristics_map": {int(k): v for k, v in meta["cluster_characteristics_map"].items()},
+            "df_clustered": _load_frame(directory, meta["siswa"]),
+            "df_normalized": _load_frame(directory, meta["normal"]),
+        }
+
+    def attach(self, versi, name, meta, arrays=None):
+        """Simpan lampiran ``name`` (dict siap-JSON dan array opsional) untuk versi yang sudah dipublikasikan.
+
+        Ditulis atomik; lampiran lama dengan nama yang sama ditimpa.
+        Melempar FileNotFoundError bila versinya sudah tidak ada.
+        """
+        directory = os.path.join(self.directory, versi)
+        fd, tmp_path = tempfile.mkstemp(dir=directory, suffix=".tmp")
+        try:
+            with os.fdopen(fd, "wb") as f:
+                np.savez(f, meta=np.array(json.dumps(meta, ensure_ascii=False)), **(arrays or {}))
+            os.replace(tmp_path, os.path.join(directory, f"lampiran_{name}.npz"))
+        except BaseException:
+            if os.path.exists(tmp_path):
+                os.remove(tmp_path)
+            raise
+
+    def load_attachment(self, versi, name):
+        """Lampiran ``name`` sebagai (meta, dict array), atau None bila belum ada."""
+        try:
+            with np.load(os.path.join(self.directory, versi, f"lampiran_{name}.npz"), allow_pickle=False) as data:
+                return json.loads(str(data["meta"])), {key: data[key] for key in data.files if key != "meta"}
+        except FileNotFoundError:
+            return None
+
+    def _prune(self, keep=None):
+        versions = sorted(name for name in os.listdir(self.directory)
+                          if not name.startswith(".") and os.path.isdir(os.path.join(self.directory, name)))
+        for name in versions[:-self.keep] if self.keep > 0 else versions:
+            if name == keep:
+                continue
+            # File yang masih di-memory-map proses lain tetap terbaca sampai ditutup (POSIX);
+            # di Windows penghapusan gagal dan dicoba lagi pada publikasi berikutnya.
+            shutil.rmtree(os.path.join(self.directory, name), ignore_errors=True)
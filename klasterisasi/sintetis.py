@@ -0,0 +1,68 @@
+"""Data siswa sintetis dengan skema template (ID_COLS + NUMERIC_COLS + CATEGORICAL_COLS).
+
+Dipakai untuk tolok ukur dan uji coba tanpa data sekolah asli. Setiap siswa
+diambil dari salah satu ``n_clusters`` kelompok: nilai dan kehadiran
+berdistribusi normal di sekitar pusat kelompok, dan flag ekstrakurikuler
+mengikuti pola kelompok dengan peluang ``flip`` untuk dibalik.
+"""
+
+import numpy as np
+import pandas as pd
+
+from klasterisasi.kprototypes import check_random_state
+from klasterisasi.skema import CATEGORICAL_COLS, FLAG_DTYPE, ID_COLS, NUMERIC_COLS
+
+NILAI_MIN, NILAI_MAX = 0., 100.
+KELAS = ["X", "XI", "XII"]
+
+
+def generate_roster(n_rows, n_clusters=4, separation=1.0, flip=0.1, missing=0.0, random_state=None,
+                    return_labels=False):
+    """Buat tabel siswa mentah sebanyak ``n_rows`` baris.
+
+    ``separation`` mengatur jarak antarpusat kelompok dibanding sebarannya
+    (0 = tanpa struktur klaster). ``missing`` adalah proporsi nilai numerik
+    yang dikosongkan agar jalur pengisian rata-rata ikut teruji.
+    Bila ``return_labels``, kelompok asal setiap siswa ikut dikembalikan.
+    """
+    random_state = check_random_state(random_state)
+    labels = random_state.randint(n_clusters, size=n_rows)
+
+    # Pusat kelompok disebar di sekitar nilai 75 dan kehadiran 0.9.
+    nilai_pusat = 75. + separation * 10. * random_state.uniform(-1., 1., n_clusters)
+    hadir_pusat = 0.9 + separation * 0.05 * random_state.uniform(-1., 1., n_clusters)
+    nilai = np.clip(nilai_pusat[labels] + random_state.normal(0., 5., n_rows), NILAI_MIN, NILAI_MAX)
+    hadir = np.clip(hadir_pusat[labels] + random_state.normal(0., 0.03, n_rows), 0., 1.)
+
+    pola = random_state.rand(n_clusters, len(CATEGORICAL_COLS)) < 0.5
+    flags = pola[labels] ^ (random_state.rand(n_rows, len(CATEGORICAL_COLS)) < flip)
+
+    if missing > 0:
+        nilai[random_state.rand(n_rows) < missing] = np.nan
+        hadir[random_state.rand(n_rows) < missing] = np.nan
+
+    nomor = np.arange(1, n_rows + 1)
+    df = pd.DataFrame({
+        ID_COLS[0]: nomor,
+        ID_COLS[1]: pd.Series(nomor).map("Siswa {:07d}".format),
+        ID_COLS[2]: pd.Categorical.from_codes(random_state.randint(2, size=n_rows), categories=["L", "P"]),
+        ID_COLS[3]: pd.Categorical.from_codes(random_state.randint(len(KELAS), size=n_rows), categories=KELAS),
+        NUMERIC_COLS[0]: nilai.round(2),
+        NUMERIC_COLS[1]: hadir.round(4),
+        **{col: flags[:, i].astype(FLAG_DTYPE) for i, col in enumerate(CATEGORICAL_COLS)},
+    })
+    return (df, labels) if return_labels else df
+
+
+def write_roster(df, path):
+    """Tulis tabel siswa ke ``path`` sesuai ekstensinya (.xlsx, .csv atau .parquet)."""
+    lower = str(path).lower()
+    if lower.endswith(".csv"):
+        df.to_csv(path, index=False)
+    elif lower.endswith(".parquet"):
+        df.to_parquet(path, index=False)
+    elif lower.endswith(".xlsx"):
+        df.to_excel(path, index=False, engine="openpyxl")
+    else:
+        raise ValueError(f"Format file '{path}' tidak didukung. Gunakan .xlsx, .csv atau .parquet.")
+    return path
@@ -0,0 +1,82 @@
+"""Nama kolom dan tipe data siswa yang dipakai oleh aplikasi dan pipeline tanpa antarmuka.
+
+Data kerja disimpan dalam tipe ringkas: fitur numerik ternormalisasi
+float32, flag ekstrakurikuler uint8 (0/1), JK dan Kelas bertipe category,
+dan Klaster bilangan bulat tak bertanda.
+
+Daftar kegiatan ekstrakurikuler dapat diganti lewat variabel lingkungan
+``KPROTO_EKSKUL`` (nama kegiatan dipisah koma, mis. "Komputer,Pramuka,Paskibra");
+setiap kegiatan menjadi kolom flag "Ekstrakurikuler <nama>". Variabel ini
+dibaca saat modul diimpor sehingga berlaku sama untuk aplikasi, CLI dan
+worker prosesnya.
+"""
+
+import os
+
+import numpy as np
+import pandas as pd
+
+EKSKUL_PREFIX = "Ekstrakurikuler "
+DEFAULT_EKSKUL = ["Komputer", "Pertanian", "Menjahit", "Pramuka"]
+
+
+def ekskul_columns(names):
+    """Nama kolom flag untuk daftar kegiatan (nama yang sudah berawalan "Ekstrakurikuler " dipakai apa adanya)."""
+    names = [name.strip() for name in names if name.strip()]
+    return [name if name.startswith(EKSKUL_PREFIX) else EKSKUL_PREFIX + name for name in names]
+
+
+ID_COLS = ["No", "Nama", "JK", "Kelas"]
+NUMERIC_COLS = ["Rata Rata Nilai Akademik", "Kehadiran"]
+CATEGORICAL_COLS = ekskul_columns(os.environ.get("KPROTO_EKSKUL", "").split(",")) or ekskul_columns(DEFAULT_EKSKUL)
+ALL_FEATURES_FOR_CLUSTERING = NUMERIC_COLS + CATEGORICAL_COLS
+INPUT_COLS = ID_COLS + ALL_FEATURES_FOR_CLUSTERING
+
+GROUP_COLS = ["JK", "Kelas"]
+NUMERIC_DTYPE = np.float32
+FLAG_DTYPE = np.uint8
+
+
+def categorical_as_str(series):
+    # Nilai kosong dianggap 0 lalu dibandingkan sebagai teks.
+    # Angka bulat ditulis tanpa ".0" agar 1, 1.0 dan "1" menjadi kategori yang sama.
+    values = series.fillna(0)
+    numeric = pd.to_numeric(values, errors="coerce")
+    if numeric.notna().all() and (numeric == numeric.round()).all():
+        values = numeric.astype(np.int64)
+    return values.astype(str)
+
+
+def as_flag(series):
+    """Flag 0/1 (kosong dianggap 0) sebagai uint8.
+
+    Kolom yang berisi nilai selain 0/1 tetap dipakai sebagai kategori teks
+    (dtype category) agar data di luar template tidak ditolak.
+    """
+    numeric = pd.to_numeric(series.fillna(0), errors="coerce")
+    if numeric.isin([0, 1]).all():
+        return numeric.astype(FLAG_DTYPE)
+    return categorical_as_str(series).astype("category")
+
+
+def label_dtype(n_clusters):
+    return np.uint8 if n_clusters <= np.iinfo(np.uint8).max + 1 else np.uint16
+
+
+def compact_students(df):
+    """Ubah tabel siswa hasil pembacaan file ke tipe ringkas (kolom yang ada saja).
+
+    Nama kolom dirapikan (spasi di tepi dibuang). Nilai numerik mentah tetap
+    float64 agar tampilan dan file unduhan tidak berubah; yang float32 adalah
+    data ternormalisasi hasil praproses.
+    """
+    df = df.rename(columns=lambda c: str(c).strip())
+    columns = {}
+    for col in df.columns:
+        if col in GROUP_COLS:
+            columns[col] = df[col].astype("category")
+        elif col in CATEGORICAL_COLS:
+            columns[col] = as_flag(df[col])
+        else:
+            columns[col] = df[col]
+    return pd.DataFrame(columns, index=df.index)
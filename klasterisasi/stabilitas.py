@@ -0,0 +1,151 @@
+"""Analisis stabilitas klaster dengan resampling (subsampel atau bootstrap) yang dijalankan paralel.
+
+Setiap resampling mengambil sebagian siswa, melakukan fit K-Prototypes
+dengan K yang sama, lalu menetapkan semua siswa ke centroid hasil fit
+tersebut. Partisi itu dibandingkan dengan partisi acuan (hasil yang
+ditampilkan) lewat tabel kontingensi K x K dari satu ``bincount``:
+
+* Jaccard per klaster (seperti ``clusterboot`` Hennig): untuk klaster
+  acuan C, max_j |C n D_j| / |C u D_j| atas klaster resampling D_j,
+  dihitung pada siswa yang ikut tersampel. Rata-rata >= 0.85 berarti
+  sangat stabil, < 0.6 berarti klaster tersebut kemungkinan tidak nyata.
+* Frekuensi ko-penugasan per siswa: proporsi teman seklaster acuannya
+  yang tetap berada satu klaster dengannya, dirata-ratakan atas semua
+  resampling. Nilai rendah menandai siswa di perbatasan antarklaster.
+
+Matriks fitur dan label acuan dibagi ke worker lewat shared memory
+(``run_parallel``); setiap worker mengembalikan hasil yang sudah
+diringkas sehingga proses induk hanya menjumlahkan.
+"""
+
+import warnings
+
+import numpy as np
+
+from klasterisasi.kprototypes import KPrototypes, check_random_state
+from klasterisasi.paralel import progress_callback, run_parallel
+
+STABILITY_N_BOOT = 20
+STABILITY_SAMPLE_FRAC = 0.8
+STABILITY_N_INIT = 1
+# Fit resampling berhenti lebih awal (lihat kprototypes_single); partisinya hampir sama dengan fit penuh.
+STABILITY_TOL = 1e-3
+# Batas rata-rata Jaccard (Hennig) dari yang tertinggi; label dipakai di laporan dan dasbor.
+JACCARD_LEVELS = [(0.85, "Sangat stabil"), (0.75, "Stabil"), (0.6, "Lemah"), (0., "Tidak stabil")]
+# Siswa dengan frekuensi ko-penugasan di bawah nilai ini dianggap ambigu.
+AMBIGUOUS_BELOW = 0.5
+
+
+def resample_indices(n_points, random_state, sample_frac=STABILITY_SAMPLE_FRAC, replace=False):
+    """Indeks siswa satu resampling (terurut): subsampel tanpa pengembalian, atau bootstrap bila ``replace``."""
+    random_state = check_random_state(random_state)
+    size = n_points if replace else max(int(round(n_points * sample_frac)), 1)
+    return np.sort(random_state.choice(n_points, size=size, replace=replace))
+
+
+def contingency(ref_labels, labels, n_ref, n_labels, weights=None):
+    """Tabel (n_ref, n_labels): banyaknya siswa per pasangan (klaster acuan, klaster resampling)."""
+    keys = ref_labels.astype(np.intp) * n_labels + labels
+    table = np.bincount(keys, weights=weights, minlength=n_ref * n_labels)
+    return table.reshape(n_ref, n_labels)
+
+
+def jaccard_per_cluster(table):
+    """Jaccard terbaik setiap klaster acuan (baris) terhadap klaster resampling; NaN bila klaster kosong."""
+    union = table.sum(axis=1)[:, None] + table.sum(axis=0)[None, :] - table
+    jaccard = np.divide(table, union, out=np.zeros(table.shape), where=union > 0)
+    return np.where(table.sum(axis=1) > 0, jaccard.max(axis=1), np.nan)
+
+
+def _fit_resample(Xnum, Xcat, ref_labels, seed, n_clusters, enc_map, gamma, sample_frac, replace, n_init,
+                  max_iter, tol):
+    # Dijalankan di worker: fit pada resampling, prediksi semua siswa, lalu ringkas lewat tabel kontingensi.
+    random_state = check_random_state(seed)
+    idx = resample_indices(Xnum.shape[0], random_state, sample_frac, replace)
+    model = KPrototypes(n_clusters=n_clusters, init="Huang", n_init=n_init, max_iter=max_iter, gamma=gamma,
+                        random_state=random_state.randint(np.iinfo(np.int32).max), tol=tol)
+    try:
+        model.fit_encoded(Xnum[idx], Xcat[idx], enc_map)
+    except ValueError:
+        # Inisialisasi gagal pada resampling ini (mis. terlalu sedikit baris unik): dilewati.
+        return None
+    labels = model.predict_encoded(Xnum, Xcat).astype(np.intp)
+    n_labels = int(labels.max()) + 1
+
+    # Jaccard dihitung pada siswa yang tersampel (duplikat bootstrap dihitung sekali).
+    sampled = np.zeros(Xnum.shape[0], dtype=bool)
+    sampled[idx] = True
+    jaccard = jaccard_per_cluster(contingency(ref_labels[sampled], labels[sampled], n_clusters, n_labels))
+
+    # Ko-penugasan: teman seklaster acuan (tanpa diri sendiri) yang berada di klaster resampling yang sama.
+    table = contingency(ref_labels, labels, n_clusters, n_labels)
+    ref_sizes = table.sum(axis=1)
+    together = table[ref_labels, labels] - 1
+    coassign = np.divide(together, ref_sizes[ref_labels] - 1, out=np.ones(len(labels)),
+                         where=ref_sizes[ref_labels] > 1).astype(np.float32)
+    return jaccard, coassign, float(model.cost_)
+
+
+def stability_level(jaccard):
+    """Label ``JACCARD_LEVELS`` untuk rata-rata Jaccard satu klaster."""
+    if np.isnan(jaccard):
+        return "-"
+    return next(label for bound, label in JACCARD_LEVELS if jaccard >= bound)
+
+
+def cluster_stability(Xnum, Xcat, enc_map, ref_labels, n_clusters, gamma, n_boot=STABILITY_N_BOOT,
+                      sample_frac=STABILITY_SAMPLE_FRAC, replace=False, n_init=STABILITY_N_INIT, max_iter=100,
+                      tol=STABILITY_TOL, random_state=None, backend="serial", n_jobs=1, progress=None):
+    """Jalankan ``n_boot`` resampling secara paralel dan ringkas stabilitas partisi ``ref_labels``.
+
+    ``gamma`` sebaiknya sama dengan model acuan agar jaraknya sebanding.
+    Seed setiap resampling diambil dari ``random_state`` sebelum eksekusi,
+    jadi hasilnya sama untuk semua backend. ``progress(selesai, total)``
+    dipanggil setiap satu resampling selesai. Mengembalikan dict berisi
+    ``jaccard`` (n_boot_berhasil, K), ``jaccard_rata_rata`` dan
+    ``jaccard_min`` per klaster, ``ko_penugasan`` per siswa (float32),
+    ``ambigu`` (proporsi siswa ambigu per klaster) dan parameter analisis.
+    Melempar ValueError bila tidak ada resampling yang berhasil.
+    """
+    ref_labels = np.ascontiguousarray(ref_labels, dtype=np.intp)
+    seeds = check_random_state(random_state).randint(np.iinfo(np.int32).max, size=n_boot)
+    tasks = [(seed, n_clusters, enc_map, gamma, sample_frac, replace, n_init, max_iter, tol) for seed in seeds]
+    results = [result for result in run_parallel(_fit_resample, (Xnum, Xcat, ref_labels), tasks, backend=backend,
+                                                 n_jobs=n_jobs, progress=progress_callback(progress))
+               if result is not None]
+    if not results:
+        raise ValueError("Semua resampling gagal di-fit; data terlalu sedikit atau kurang bervariasi.")
+
+    jaccard = np.vstack([result[0] for result in results])
+    coassign = np.zeros(len(ref_labels))
+    for result in results:
+        coassign += result[1]
+    coassign = (coassign / len(results)).astype(np.float32)
+    sizes = np.bincount(ref_labels, minlength=n_clusters)
+    ambiguous = np.bincount(ref_labels, weights=coassign < AMBIGUOUS_BELOW, minlength=n_clusters)
+    with warnings.catch_warnings():
+        # Klaster acuan yang kosong bernilai NaN di semua resampling.
+        warnings.simplefilter("ignore", RuntimeWarning)
+        mean_jaccard, min_jaccard = np.nanmean(jaccard, axis=0), np.nanmin(jaccard, axis=0)
+    return {
+        "n_boot": len(results),
+        "n_gagal": n_boot - len(results),
+        "metode": "bootstrap" if replace else "subsampel",
+        "proporsi_sampel": 1. if replace else sample_frac,
+        "jaccard": jaccard,
+        "jaccard_rata_rata": mean_jaccard,
+        "jaccard_min": min_jaccard,
+        "ko_penugasan": coassign,
+        "ambigu": np.divide(ambiguous, sizes, out=np.zeros(n_clusters), where=sizes > 0),
+        "cost": np.array([result[2] for result in results]),
+    }
+
+
+def stability_table(stabilitas):
+    """Ringkasan per klaster sebagai list dict (siap untuk tabel atau JSON)."""
+    rows = []
+    for k, (mean, minimum, ambiguous) in enumerate(zip(stabilitas["jaccard_rata_rata"], stabilitas["jaccard_min"],
+                                                       stabilitas["ambigu"])):
+        rows.append({"Klaster": k, "Jaccard Rata-rata": float(mean), "Jaccard Minimum": float(minimum),
+                     "Status": stability_level(mean), "Siswa Ambigu": float(ambiguous)})
+    return rows
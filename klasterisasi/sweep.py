@@ -0,0 +1,136 @@
+"""Sweep jumlah klaster K: semua K di-fit dalam satu pekerjaan paralel."""
+
+import time
+
+import numpy as np
+
+from klasterisasi.kprototypes import (CHUNK_ROWS, KPrototypes, check_random_state, estimate_gamma,
+                                      kprototypes_single, mixed_dissim)
+from klasterisasi.paralel import progress_callback, run_parallel
+
+
+def timed_single(Xnum, Xcat, *args):
+    start = time.perf_counter()
+    result = kprototypes_single(Xnum, Xcat, *args)
+    return result, time.perf_counter() - start
+
+
+def simplified_silhouette(Xnum, Xcat, centroids_num, centroids_cat, gamma, labels):
+    """Silhouette berbasis centroid dengan jarak campuran, rata-rata semua titik.
+
+    a = jarak ke centroid sendiri, b = jarak ke centroid terdekat lainnya,
+    s = (b - a) / max(a, b). Kompleksitasnya O(N*K), bukan O(N^2).
+    """
+    n_points = Xnum.shape[0]
+    if centroids_num.shape[0] < 2 or n_points == 0:
+        return float("nan")
+    total = 0.
+    for start in range(0, n_points, CHUNK_ROWS):
+        stop = min(start + CHUNK_ROWS, n_points)
+        dist = mixed_dissim(Xnum[start:stop], Xcat[start:stop], centroids_num, centroids_cat, gamma)
+        rows = np.arange(stop - start)
+        own = labels[start:stop].astype(np.intp)
+        a = dist[rows, own]
+        dist[rows, own] = np.inf
+        b = dist.min(axis=1)
+        denom = np.maximum(a, b)
+        total += np.divide(b - a, denom, out=np.zeros_like(a), where=denom > 0).sum()
+    return float(total / n_points)
+
+
+def _warm_start_init(Xnum, Xcat, centroids_num, centroids_cat, gamma):
+    # Centroid K-1 ditambah titik yang paling jauh dari centroidnya sendiri.
+    farthest, farthest_dist = 0, -1.
+    for start in range(0, Xnum.shape[0], CHUNK_ROWS):
+        stop = min(start + CHUNK_ROWS, Xnum.shape[0])
+        dist = mixed_dissim(Xnum[start:stop], Xcat[start:stop], centroids_num, centroids_cat, gamma).min(axis=1)
+        idx = int(dist.argmax())
+        if dist[idx] > farthest_dist:
+            farthest, farthest_dist = start + idx, dist[idx]
+    return [np.vstack([centroids_num, Xnum[farthest]]),
+            np.vstack([centroids_cat, Xcat[farthest]])]
+
+
+def sweep_k(Xnum, Xcat, enc_map, k_values, init="Huang", n_init=10, max_iter=100, gamma=None,
+            random_state=None, backend="serial", n_jobs=1, warm_start=True, progress=None):
+    """Fit K-Prototypes untuk setiap K di ``k_values``.
+
+    Restart Huang untuk semua K dikirim sebagai satu batch ke ``run_parallel``
+    (matriks fitur dibagi sekali lewat shared memory). Seed tiap K diambil dari
+    ``random_state`` yang sama seperti fit tunggal dengan K tersebut. Setelah
+    itu, rantai warm start berjalan serial dari K terkecil: setiap K > K
+    terkecil mendapat satu run tambahan yang di-warm-start dari centroid
+    terpilih K sebelumnya (yang bisa berasal dari warm start juga), dan run
+    terbaik dipilih berdasarkan cost. Rantai ini tidak menggantikan restart
+    Huang: rantai murni memaksa semua K berjalan berurutan dan mewarisi
+    optimum lokal K sebelumnya, sedangkan dengan restart Huang cost setiap K
+    tidak pernah lebih buruk dari fit tunggal dengan ``n_init`` yang sama.
+    Mengembalikan (daftar ringkasan per K, dict K -> model ter-fit).
+    """
+    k_values = sorted(set(int(k) for k in k_values))
+    if gamma is None:
+        gamma = estimate_gamma(Xnum)
+    n_categories = max(len(c) for c in enc_map)
+    # K yang tidak lebih kecil dari jumlah baris unik ditangani fit biasa (tanpa iterasi).
+    n_unique = np.unique(np.column_stack([Xnum, Xcat.astype(np.float64)]), axis=0).shape[0]
+    trivial_k = [k for k in k_values if k >= n_unique]
+    k_values = [k for k in k_values if k < n_unique]
+
+    tasks = []
+    for k in k_values:
+        seeds = check_random_state(random_state).randint(np.iinfo(np.int32).max, size=n_init)
+        tasks += [(k, max_iter, gamma, init, seed, n_categories, init_no)
+                  for init_no, seed in enumerate(seeds)]
+    total_steps = len(tasks) + (len(k_values) - 1 if warm_start else 0)
+
+    on_done = progress_callback(progress, total_steps, lambda done, result: f"{done}/{len(tasks)} restart selesai")
+    timed = run_parallel(timed_single, (Xnum, Xcat), tasks, backend=backend, n_jobs=n_jobs,
+                         progress=on_done)
+
+    rows, models = [], {}
+    previous = None
+    for ik, k in enumerate(k_values):
+        runs = timed[ik * n_init:(ik + 1) * n_init]
+        candidates = [result for result, _ in runs]
+        fit_seconds = sum(seconds for _, seconds in runs)
+        if warm_start and previous is not None:
+            try:
+                warm_init = _warm_start_init(Xnum, Xcat, *previous, gamma)
+                (warm_result, seconds) = timed_single(Xnum, Xcat, k, max_iter, gamma, warm_init, 0,
+                                                      n_categories)
+                candidates.append(warm_result)
+                fit_seconds += seconds
+            except ValueError:
+                # Warm start menghasilkan klaster kosong; cukup pakai restart Huang.
+                pass
+            if progress is not None:
+                progress(len(tasks) + ik, total_steps, f"Warm start K={k} selesai")
+        best = int(np.argmin([result[2] for result in candidates]))
+        warm_used = best == n_init
+
+        model = KPrototypes(n_clusters=k, max_iter=max_iter, init=init, n_init=n_init,
+                            random_state=random_state, n_jobs=n_jobs, backend=backend)
+        model.set_result(candidates[best], gamma, enc_map)
+        models[k] = model
+        previous = (model._centroids_num, model._centroids_cat)
+        rows.append(_summary_row(Xnum, Xcat, k, model, fit_seconds, warm_used))
+
+    for k in trivial_k:
+        start = time.perf_counter()
+        model = KPrototypes(n_clusters=k, max_iter=max_iter, init=init, n_init=n_init, gamma=gamma,
+                            random_state=random_state).fit_encoded(Xnum, Xcat, enc_map)
+        models[k] = model
+        rows.append(_summary_row(Xnum, Xcat, k, model, time.perf_counter() - start, False))
+    return rows, models
+
+
+def _summary_row(Xnum, Xcat, k, model, fit_seconds, warm_used):
+    return {
+        "K": k,
+        "cost": float(model.cost_),
+        "silhouette": simplified_silhouette(Xnum, Xcat, model._centroids_num,
+                                            model._centroids_cat, model.gamma, model.labels_),
+        "iterasi": int(model.n_iter_),
+        "waktu_fit_detik": fit_seconds,
+        "warm_start_terpilih": warm_used,
+    }
@@ -0,0 +1,218 @@
+"""Tolok ukur tahap pipeline pada data siswa sintetis berbagai ukuran.
+
+Setiap ukuran data dibangkitkan dengan ``generate_roster``, ditulis ke file
+sementara, lalu tahap baca, praproses, klasterisasi, prediksi massal dan
+PDF profil diukur berurutan (keluaran satu tahap menjadi masukan tahap
+berikutnya). Waktu diambil dari ``repeat`` pengulangan tanpa tracemalloc
+(yang tercepat dilaporkan); puncak memori diukur pada satu lintasan
+tambahan dengan tracemalloc agar tidak mengotori pengukuran waktu. Hasil
+disimpan sebagai JSON yang dapat dibandingkan antar-commit dengan
+``compare_results``.
+"""
+
+import json
+import os
+import platform
+import subprocess
+import sys
+import tempfile
+import time
+
+import numpy as np
+import pandas as pd
+
+from klasterisasi.diagnostik import StageTimer
+from klasterisasi.laporan import render_profil_chunk
+from klasterisasi.pipeline import (KPROTO_N_INIT, KPROTO_RANDOM_STATE, cluster_data, generate_cluster_descriptions,
+                                   preprocess)
+from klasterisasi.prediksi import predict_students
+from klasterisasi.sintetis import generate_roster, write_roster
+from klasterisasi.skema import CATEGORICAL_COLS, NUMERIC_COLS, compact_students
+from klasterisasi.unggah import read_students
+
+# Naikkan bila susunan file hasil berubah.
+RESULT_VERSION = 1
+STAGES = ("baca", "praproses", "klasterisasi", "prediksi", "pdf")
+# PDF diukur pada sebagian siswa saja; throughput-nya tetap per siswa.
+PDF_ROWS = 200
+# Modul yang tidak boleh termuat hanya untuk menampilkan halaman login.
+HEAVY_MODULES = ("sklearn", "matplotlib", "seaborn", "fpdf", "kmodes", "klasterisasi.pipeline")
+
+# Dijalankan di interpreter baru: waktu impor streamlit, lalu eksekusi app.py sampai halaman login selesai.
+_STARTUP_SCRIPT = """
+import json, os, runpy, sys, time
+app_path = sys.argv[1]
+sys.path.insert(0, os.path.dirname(app_path))
+start = time.perf_counter()
+import streamlit
+loaded = time.perf_counter()
+runpy.run_path(app_path, run_name="__main__")
+done = time.perf_counter()
+heavy = [name for name in json.loads(sys.argv[2]) if name in sys.modules]
+print(json.dumps({"streamlit": loaded - start, "app": done - loaded, "modul_berat": heavy}))
+"""
+
+
+def _git_commit():
+    try:
+        out = subprocess.run(["git", "rev-parse", "--short", "HEAD"], capture_output=True, text=True, timeout=10,
+                             cwd=os.path.dirname(os.path.abspath(__file__)))
+    except (OSError, subprocess.SubprocessError):
+        return None
+    return out.stdout.strip() or None
+
+
+def environment():
+    return {
+        "commit": _git_commit(),
+        "waktu": time.strftime("%Y-%m-%d %H:%M:%S"),
+        "python": platform.python_version(),
+        "numpy": np.__version__,
+        "pandas": pd.__version__,
+        "platform": platform.platform(),
+        "cpu": os.cpu_count(),
+    }
+
+
+def _stage_functions(path, n_clusters, n_init, random_state, backend, n_jobs, pdf_rows):
+    # Setiap fungsi menerima state (dict) dan mengembalikan (jumlah baris, keluaran baru).
+    def baca(state):
+        df = compact_students(read_students(path))
+        return len(df), {"df": df}
+
+    def praproses(state):
+        df_preprocessed, scaler, _ = preprocess(state["df"])
+        return len(df_preprocessed), {"df_preprocessed": df_preprocessed, "scaler": scaler}
+
+    def klasterisasi(state):
+        df_clustered_normalized, model, _ = cluster_data(state["df_preprocessed"], n_clusters, n_init=n_init,
+                                                         random_state=random_state, backend=backend, n_jobs=n_jobs)
+        descriptions = generate_cluster_descriptions(df_clustered_normalized, n_clusters)
+        return len(df_clustered_normalized), {"model": model, "labels": df_clustered_normalized["Klaster"],
+                                              "descriptions": descriptions}
+
+    def prediksi(state):
+        df_pred = predict_students(state["df"], state["scaler"], state["model"], NUMERIC_COLS, CATEGORICAL_COLS,
+                                   state["descriptions"])
+        return len(df_pred), {}
+
+    def pdf(state):
+        records = state["df"].iloc[:pdf_rows].assign(Klaster=state["labels"].iloc[:pdf_rows]).to_dict("records")
+        return len(render_profil_chunk(records, state["descriptions"])), {}
+
+    return {"baca": baca, "praproses": praproses, "klasterisasi": klasterisasi, "prediksi": prediksi, "pdf": pdf}
+
+
+def benchmark_size(n_rows, n_clusters=4, stages=STAGES, repeat=1, measure_memory=True, file_format="csv",
+                   separation=1.0, n_init=KPROTO_N_INIT, random_state=KPROTO_RANDOM_STATE, backend="serial",
+                   n_jobs=1, pdf_rows=PDF_ROWS, work_dir=None):
+    """Ukur ``stages`` pada satu roster sintetis ``n_rows`` baris; mengembalikan satu baris hasil per tahap.
+
+    Tahap yang dibutuhkan tahap lain (mis. baca dan praproses untuk
+    klasterisasi) tetap dijalankan, tetapi hanya yang ada di ``stages`` yang
+    diukur dan dilaporkan.
+    """
+    df, truth = generate_roster(n_rows, n_clusters=n_clusters, separation=separation, random_state=random_state,
+                                return_labels=True)
+    needed = max(STAGES.index(name) for name in stages)
+    rows = []
+    with tempfile.TemporaryDirectory(dir=work_dir) as tmp:
+        path = write_roster(df, os.path.join(tmp, f"roster_{n_rows}.{file_format}"))
+        del df
+        functions = _stage_functions(path, n_clusters, n_init, random_state, backend, n_jobs, pdf_rows)
+        state = {}
+        for name in STAGES[:needed + 1]:
+            func = functions[name]
+            if name not in stages:
+                state.update(func(state)[1])
+                continue
+            times, cpu_times = [], []
+            for _ in range(max(repeat, 1)):
+                timer = StageTimer(source="tolok-ukur")
+                with timer.stage(name) as info:
+                    n_done, output = func(state)
+                times.append(info["waktu_detik"])
+                cpu_times.append(info["cpu_detik"])
+            row = {"n_siswa": n_rows, "tahap": name, "baris": n_done, "waktu_detik": min(times),
+                   "waktu_semua_detik": times, "cpu_detik": min(cpu_times),
+                   "baris_per_detik": n_done / min(times) if min(times) > 0 else None}
+            if measure_memory:
+                timer = StageTimer(source="tolok-ukur", trace_memory=True)
+                with timer.stage(name) as info:
+                    func(state)
+                row["memori_puncak_mb"] = info["memori_puncak_mb"]
+            state.update(output)
+            if name == "klasterisasi":
+                row["cost"] = float(state["model"].cost_)
+                row["akurasi_pemulihan"] = _recovery(truth, state["model"].labels_)
+            rows.append(row)
+    return rows
+
+
+def measure_startup(app_path, repeat=3):
+    """Ukur cold start ``app_path`` (halaman login) di interpreter baru sebanyak ``repeat`` kali.
+
+    Mengembalikan dua baris hasil: impor streamlit saja dan eksekusi app.py
+    setelahnya (yang tercepat), beserta modul berat yang ikut termuat.
+    """
+    app_path = os.path.abspath(app_path)
+    runs = []
+    for _ in range(max(repeat, 1)):
+        out = subprocess.run([sys.executable, "-c", _STARTUP_SCRIPT, app_path, json.dumps(HEAVY_MODULES)],
+                             capture_output=True, text=True, cwd=os.path.dirname(app_path), check=True)
+        runs.append(json.loads(out.stdout.strip().splitlines()[-1]))
+    rows = []
+    for key in ("streamlit", "app"):
+        times = [run[key] for run in runs]
+        rows.append({"n_siswa": 0, "tahap": f"startup {key}", "baris": 0, "waktu_detik": min(times),
+                     "waktu_semua_detik": times, "baris_per_detik": None})
+    rows[-1]["modul_berat"] = runs[-1]["modul_berat"]
+    return rows
+
+
+def _recovery(truth, labels):
+    # Proporsi siswa yang klasternya cocok dengan kelompok asal setelah tiap klaster dipetakan ke kelompok mayoritasnya.
+    labels = np.asarray(labels, dtype=np.intp)
+    n_truth = int(truth.max()) + 1
+    table = np.bincount(labels * n_truth + truth, minlength=(int(labels.max()) + 1) * n_truth).reshape(-1, n_truth)
+    return float(table.max(axis=1).sum() / max(len(truth), 1))
+
+
+def run_benchmark(sizes, progress=None, startup_app=None, **kwargs):
+    """Jalankan ``benchmark_size`` untuk setiap ukuran; mengembalikan dict siap-JSON.
+
+    Bila ``startup_app`` (path app.py) diberikan, cold start aplikasi ikut diukur.
+    """
+    results = measure_startup(startup_app, repeat=kwargs.get("repeat", 1)) if startup_app else []
+    if startup_app and progress is not None:
+        progress(0, results)
+    for n_rows in sizes:
+        results.extend(benchmark_size(int(n_rows), **kwargs))
+        if progress is not None:
+            progress(n_rows, results)
+    params = {key: value for key, value in kwargs.items() if key != "work_dir"}
+    return {"format": RESULT_VERSION, "lingkungan": environment(), "parameter": params, "hasil": results}
+
+
+def compare_results(old, new):
+    """Bandingkan dua hasil ``run_benchmark`` per (ukuran, tahap).
+
+    ``rasio_waktu`` > 1 berarti hasil baru lebih lambat; ``rasio_memori``
+    sama untuk puncak memori. Pasangan yang hanya ada di salah satu hasil
+    dilewati.
+    """
+    old_rows = {(row["n_siswa"], row["tahap"]): row for row in old["hasil"]}
+    comparison = []
+    for row in new["hasil"]:
+        before = old_rows.get((row["n_siswa"], row["tahap"]))
+        if before is None:
+            continue
+        item = {"n_siswa": row["n_siswa"], "tahap": row["tahap"], "waktu_lama": before["waktu_detik"],
+                "waktu_baru": row["waktu_detik"],
+                "rasio_waktu": row["waktu_detik"] / before["waktu_detik"] if before["waktu_detik"] > 0 else None}
+        if "memori_puncak_mb" in row and "memori_puncak_mb" in before:
+            item["memori_lama_mb"], item["memori_baru_mb"] = before["memori_puncak_mb"], row["memori_puncak_mb"]
+            item["rasio_memori"] = (row["memori_puncak_mb"] / before["memori_puncak_mb"]
+                                    if before["memori_puncak_mb"] > 0 else None)
+        comparison.append(item)
+    return comparison
@@ -0,0 +1,238 @@
+"""Pembacaan file data siswa (xlsx, CSV, Parquet) hanya untuk kolom yang dipakai.
+
+File xlsx dibaca baris demi baris dengan openpyxl mode read-only, dan hanya
+sel pada kolom yang dibutuhkan yang diteruskan ke parser pandas. Hasil pembacaan
+disimpan sebagai file kolom ``.npz`` yang dialamatkan dengan hash isi file,
+sehingga unggahan ulang file yang sama tidak perlu di-parse lagi.
+"""
+
+import hashlib
+import io
+import itertools
+import json
+import os
+import tempfile
+
+import numpy as np
+import pandas as pd
+from pandas.io.parsers import TextParser
+
+from klasterisasi.cache import evict_lru
+from klasterisasi.skema import INPUT_COLS
+
+# Naikkan bila cara pembacaan berubah sehingga cache lama tidak lagi valid.
+INGEST_VERSION = 2
+SUPPORTED_TYPES = ("xlsx", "csv", "parquet")
+# Jumlah baris per potongan saat file dibaca bertahap (iter_students).
+STREAM_CHUNK_ROWS = 50_000
+
+
+def file_type(name):
+    ext = os.path.splitext(str(name))[1].lower().lstrip(".")
+    if ext not in SUPPORTED_TYPES:
+        raise ValueError(f"Format file '.{ext}' tidak didukung. Gunakan: {', '.join(SUPPORTED_TYPES)}.")
+    return ext
+
+
+def _xlsx_rows(source, columns):
+    # Generator: judul kolom terlebih dahulu, lalu nilai sel setiap baris data.
+    # Baris kosong ditahan sampai ada baris berisi sesudahnya sehingga baris
+    # kosong di akhir sheet tidak pernah dikeluarkan (seperti pd.read_excel).
+    from openpyxl import load_workbook
+
+    wanted = set(columns)
+    workbook = load_workbook(source, read_only=True, data_only=True)
+    try:
+        rows = workbook.worksheets[0].iter_rows(values_only=True)
+        first = next(rows, None)
+        if first is None:
+            return
+        header = {i: str(name).strip() for i, name in enumerate(first)
+                  if name is not None and str(name).strip() in wanted}
+        if not header:
+            return
+        yield list(header.values())
+        pending_blank = 0
+        for row in rows:
+            if all(value is None or value == "" for value in row):
+                pending_blank += 1
+                continue
+            for _ in range(pending_blank):
+                yield [""] * len(header)
+            pending_blank = 0
+            yield [_cell_value(row[i]) if i < len(row) else "" for i in header]
+    finally:
+        workbook.close()
+
+
+def _cell_value(value):
+    # Konversi sel sama dengan pembaca openpyxl di pandas: kosong -> "", float bulat -> int.
+    if value is None:
+        return ""
+    if isinstance(value, float) and value.is_integer():
+        return int(value)
+    return value
+
+
+def read_xlsx(source, columns):
+    """Baca kolom ``columns`` dari sheet pertama file xlsx (path atau file biner).
+
+    Aturannya mengikuti ``pd.read_excel``: baris 1 adalah judul kolom, baris
+    kosong di tengah menjadi NaN, baris kosong di akhir dibuang, lalu tipe
+    kolom ditentukan oleh parser teks pandas (sel tanggal tetap berupa
+    tanggal). Berbeda dengan ``pd.read_excel``, baris dibaca bertahap
+    sehingga kolom lain tidak pernah dimuat.
+    """
+    rows = _xlsx_rows(source, columns)
+    header = next(rows, None)
+    if header is None:
+        return pd.DataFrame()
+    return TextParser([header] + list(rows), header=0).read()
+
+
+def read_csv(source, columns):
+    wanted = set(columns)
+    return pd.read_csv(source, usecols=lambda c: str(c).strip() in wanted)
+
+
+def read_parquet(source, columns):
+    try:
+        import pyarrow.parquet as pq
+    except ImportError as e:
+        raise ValueError("Membaca file Parquet memerlukan paket 'pyarrow'.") from e
+    wanted = set(columns)
+    parquet_file = pq.ParquetFile(source)
+    names = [name for name in parquet_file.schema_arrow.names if name.strip() in wanted]
+    return parquet_file.read(columns=names).to_pandas()
+
+
+def iter_students(source, name=None, columns=INPUT_COLS, chunk_rows=STREAM_CHUNK_ROWS):
+    """Baca file data siswa per potongan ``chunk_rows`` baris tanpa memuat seluruh isinya.
+
+    Setiap potongan adalah DataFrame dengan index lanjutan (0, 1, ... sampai
+    jumlah baris file). Tipe kolom ditentukan per potongan, sehingga pemanggil
+    sebaiknya mengubah tipenya sendiri (mis. lewat ``compact_students``).
+    """
+    kind = file_type(name if name is not None else getattr(source, "name", source))
+    if kind == "csv":
+        wanted = set(columns)
+        yield from pd.read_csv(source, usecols=lambda c: str(c).strip() in wanted, chunksize=chunk_rows)
+        return
+
+    if kind == "parquet":
+        try:
+            import pyarrow.parquet as pq
+        except ImportError as e:
+            raise ValueError("Membaca file Parquet memerlukan paket 'pyarrow'.") from e
+        wanted = set(columns)
+        parquet_file = pq.ParquetFile(source)
+        names = [name for name in parquet_file.schema_arrow.names if name.strip() in wanted]
+        chunks = (batch.to_pandas() for batch in parquet_file.iter_batches(batch_size=chunk_rows, columns=names))
+    else:
+        rows = _xlsx_rows(source, columns)
+        header = next(rows, None)
+        if header is None:
+            return
+        chunks = (TextParser([header] + batch, header=0).read()
+                  for batch in iter(lambda: list(itertools.islice(rows, chunk_rows)), []))
+
+    start = 0
+    for chunk in chunks:
+        chunk.index = pd.RangeIndex(start, start + len(chunk))
+        start += len(chunk)
+        yield chunk
+
+
+def _read(source, kind, columns):
+    if kind == "csv":
+        return read_csv(source, columns)
+    if kind == "parquet":
+        return read_parquet(source, columns)
+    return read_xlsx(source, columns)
+
+
+def _save_columns(path, df):
+    # Simpan per kolom tanpa pickle; kolom teks disimpan bersama mask nilai kosong.
+    meta, arrays = {"columns": []}, {}
+    for i, name in enumerate(df.columns):
+        series = df[name]
+        if series.dtype.kind in "biuf":
+            meta["columns"].append({"name": name, "jenis": "angka"})
+            arrays[f"kolom_{i}"] = series.to_numpy()
+            continue
+        mask = series.isna().to_numpy()
+        values = series.to_numpy(dtype=object)
+        if not all(isinstance(v, str) for v in values[~mask]):
+            # Kolom campuran (mis. angka dan teks) tidak bisa disimpan tanpa pickle.
+            return False
+        meta["columns"].append({"name": name, "jenis": "teks"})
+        arrays[f"kolom_{i}"] = np.where(mask, "", values).astype(str)
+        arrays[f"kosong_{i}"] = mask
+    arrays["meta"] = np.array(json.dumps(meta))
+
+    fd, tmp_path = tempfile.mkstemp(dir=os.path.dirname(path), suffix=".tmp")
+    try:
+        with os.fdopen(fd, "wb") as f:
+            np.savez(f, **arrays)
+        os.replace(tmp_path, path)
+    except BaseException:
+        if os.path.exists(tmp_path):
+            os.remove(tmp_path)
+        raise
+    return True
+
+
+def _load_columns(path):
+    try:
+        with np.load(path, allow_pickle=False) as data:
+            meta = json.loads(str(data["meta"]))
+            columns = {}
+            for i, col in enumerate(meta["columns"]):
+                values = data[f"kolom_{i}"]
+                if col["jenis"] == "teks":
+                    values = pd.Series(values.astype(object)).mask(data[f"kosong_{i}"])
+                columns[col["name"]] = values
+        os.utime(path)
+    except (OSError, ValueError, KeyError):
+        return None
+    return pd.DataFrame(columns)
+
+
+def read_students(source, name=None, columns=INPUT_COLS, cache_dir=None, max_bytes=256 * 1024 * 1024):
+    """Baca file data siswa, hanya kolom ``columns`` yang ada di file.
+
+    ``source`` berupa path atau objek file (mis. ``UploadedFile`` Streamlit);
+    untuk objek file, ``name`` (atau atribut ``.name``) menentukan formatnya.
+    Bila ``cache_dir`` diberikan, hasil disimpan/diambil dari cache kolom
+    berdasarkan hash isi file.
+    """
+    name = name or getattr(source, "name", None) or str(source)
+    kind = file_type(name)
+    if hasattr(source, "read"):
+        source.seek(0)
+        source = io.BytesIO(source.read())
+    if cache_dir is None:
+        return _read(source, kind, columns)
+
+    h = hashlib.blake2b(digest_size=20)
+    h.update(json.dumps({"versi": INGEST_VERSION, "jenis": kind, "kolom": list(columns)}).encode())
+    if isinstance(source, io.BytesIO):
+        h.update(source.getbuffer())
+    else:
+        with open(source, "rb") as f:
+            for block in iter(lambda: f.read(1 << 20), b""):
+                h.update(block)
+    cache_path = os.path.join(cache_dir, f"{h.hexdigest()}.npz")
+
+    df = _load_columns(cache_path)
+    if df is not None:
+        return df
+    df = _read(source, kind, columns)
+    try:
+        os.makedirs(cache_dir, exist_ok=True)
+        if _save_columns(cache_path, df):
+            evict_lru(cache_dir, max_bytes, keep=cache_path)
+    except OSError:
+        # Cache hanya mempercepat; kegagalan menulis tidak menggagalkan pembacaan.
+        pass
+    return df
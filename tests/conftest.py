@@ -0,0 +1,19 @@
+import pytest
+
+from klasterisasi.pipeline import encode_features, preprocess
+from klasterisasi.sintetis import generate_roster
+from klasterisasi.skema import compact_students
+
+
+@pytest.fixture(scope="session")
+def roster():
+    """Tabel siswa sintetis kecil (600 baris, 4 kelompok) dengan kolom No unik."""
+    return compact_students(generate_roster(600, random_state=3))
+
+
+@pytest.fixture(scope="session")
+def fitur(roster):
+    """(data praproses, scaler, Xnum, Xcat, enc_map) dari ``roster``."""
+    df_preprocessed, scaler, _ = preprocess(roster)
+    Xnum, Xcat, enc_map, _ = encode_features(df_preprocessed)
+    return df_preprocessed, scaler, Xnum, Xcat, enc_map
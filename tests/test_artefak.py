@@ -0,0 +1,52 @@
+import numpy as np
+import pandas as pd
+import pytest
+
+from klasterisasi.artefak import load_model_artifact, model_artifact_bytes, save_model_artifact
+from klasterisasi.pipeline import cluster_data, generate_cluster_descriptions
+
+
+@pytest.fixture(scope="module")
+def hasil_fit(roster, fitur):
+    df_preprocessed, scaler, _, _, _ = fitur
+    df_clustered, model, cat_idx = cluster_data(df_preprocessed, 3, n_init=2, random_state=0)
+    descriptions = generate_cluster_descriptions(df_clustered, 3)
+    return model, scaler, descriptions, cat_idx
+
+
+def _assert_same_model(artifact, model, scaler, descriptions):
+    np.testing.assert_array_equal(artifact.model._centroids_num, model._centroids_num)
+    np.testing.assert_array_equal(artifact.model._centroids_cat, model._centroids_cat)
+    assert artifact.model.gamma == model.gamma
+    assert artifact.model.cost_ == model.cost_
+    assert artifact.n_clusters == model.n_clusters
+    for loaded, original in zip(artifact.model._enc_map, model._enc_map):
+        np.testing.assert_array_equal(loaded, original)
+    np.testing.assert_array_equal(artifact.scaler.mean_, scaler.mean_)
+    np.testing.assert_array_equal(artifact.scaler.scale_, scaler.scale_)
+    assert artifact.cluster_characteristics_map == descriptions
+
+
+def test_round_trip_bytes(roster, hasil_fit):
+    model, scaler, descriptions, cat_idx = hasil_fit
+    artifact = load_model_artifact(model_artifact_bytes(model, scaler, descriptions, categorical_indices=cat_idx))
+    _assert_same_model(artifact, model, scaler, descriptions)
+    assert artifact.categorical_indices == cat_idx
+    np.testing.assert_array_equal(artifact.predict(roster, with_descriptions=False)["Klaster"], model.labels_)
+
+
+def test_round_trip_file(tmp_path, roster, hasil_fit):
+    model, scaler, descriptions, cat_idx = hasil_fit
+    path = save_model_artifact(str(tmp_path / "model.kproto"), model, scaler, descriptions,
+                               categorical_indices=cat_idx)
+    artifact = load_model_artifact(path)
+    _assert_same_model(artifact, model, scaler, descriptions)
+    predicted = artifact.predict(roster)
+    np.testing.assert_array_equal(predicted["Klaster"], model.labels_)
+    pd.testing.assert_frame_equal(predicted, load_model_artifact(open(path, "rb")).predict(roster))
+
+
+@pytest.mark.parametrize("data", [b"", b"bukan artefak", b"KPROTO"])
+def test_file_asing_ditolak(data):
+    with pytest.raises(ValueError):
+        load_model_artifact(data)
@@ -0,0 +1,53 @@
+import os
+
+import numpy as np
+import pytest
+
+from klasterisasi.cache import ModelCache
+from klasterisasi.kprototypes import KPrototypes
+
+PARAMS = dict(n_clusters=3, init="Huang", n_init=2, random_state=0, gamma=None, tol=0., move_tol=0., accelerate=True)
+
+
+@pytest.fixture(scope="module")
+def model(fitur):
+    _, _, Xnum, Xcat, enc_map = fitur
+    return KPrototypes(n_clusters=3, init="Huang", n_init=2, random_state=0).fit_encoded(Xnum, Xcat, enc_map)
+
+
+def _key(fitur, **changes):
+    _, _, Xnum, Xcat, enc_map = fitur
+    return ModelCache.make_key(Xnum, Xcat, enc_map, **{**PARAMS, **changes})
+
+
+def test_simpan_dan_muat(tmp_path, fitur, model):
+    cache = ModelCache(str(tmp_path))
+    key = _key(fitur)
+    cache.save(key, model, {0: "a", 1: "b", 2: "c"}, {"mean_": np.array([1., 2.])}, [2, 3])
+    cached = cache.load(key)
+    np.testing.assert_array_equal(cached["model"].labels_, model.labels_)
+    np.testing.assert_array_equal(cached["model"]._centroids_num, model._centroids_num)
+    assert cached["model"].cost_ == model.cost_
+    assert (cached["model"].tol, cached["model"].move_tol, cached["model"].accelerate) == (0., 0., True)
+    assert cached["cluster_characteristics_map"] == {0: "a", 1: "b", 2: "c"}
+    assert cached["categorical_indices"] == [2, 3]
+
+
+@pytest.mark.parametrize("changes", [{"tol": 1e-3}, {"move_tol": 0.01}, {"accelerate": False}, {"n_clusters": 4}])
+def test_parameter_fit_berbeda_tidak_memakai_cache(tmp_path, fitur, model, changes):
+    cache = ModelCache(str(tmp_path))
+    cache.save(_key(fitur), model)
+    assert _key(fitur, **changes) != _key(fitur)
+    assert cache.load(_key(fitur, **changes)) is None
+
+
+def test_entri_lama_dihapus(tmp_path, fitur, model):
+    cache = ModelCache(str(tmp_path))
+    keys = [_key(fitur, random_state=seed) for seed in range(3)]
+    for age, key in enumerate(keys[:2]):
+        cache.save(key, model)
+        os.utime(cache._path(key), (age, age))
+    # Batas dua entri: entri yang paling lama tidak dipakai dihapus saat entri ketiga disimpan.
+    cache.max_bytes = 2 * os.path.getsize(cache._path(keys[0]))
+    cache.save(keys[2], model)
+    assert sorted(os.listdir(str(tmp_path))) == sorted(f"{key}.npz" for key in keys[1:])
@@ -0,0 +1,82 @@
+import json
+import os
+
+import pytest
+
+from klasterisasi.diagnostik import LOG_VERSION, RunLog, StageTimer, stage_rows
+
+
+def _record(run_id, **fields):
+    return {"format": LOG_VERSION, "id": run_id, "mulai": "2026-01-01 00:00:00", "sumber": "cli",
+            "keterangan": None, "tahap": [], "total_detik": 0., **fields}
+
+
+def test_stage_timer():
+    timer = StageTimer(label="roster.csv", source="web")
+    with timer.stage("baca") as info:
+        info["baris"] = 10
+    with timer.stage("klasterisasi", rows=10):
+        sum(range(1000))
+    with pytest.raises(RuntimeError):
+        with timer.stage("baca"):
+            raise RuntimeError("gagal")
+    # Tahap yang gagal tetap tercatat.
+    assert [info["tahap"] for info in timer.stages] == ["baca", "klasterisasi", "baca"]
+    assert timer.stages[0]["baris"] == timer.stages[1]["baris"] == 10
+    assert all(info["waktu_detik"] >= 0 and info["cpu_detik"] >= 0 for info in timer.stages)
+    assert timer.timings["baca"] == pytest.approx(timer.stages[0]["waktu_detik"] + timer.stages[2]["waktu_detik"])
+
+    record = timer.to_record()
+    assert record["format"] == LOG_VERSION and record["id"] == timer.run_id
+    assert (record["sumber"], record["keterangan"], record["pid"]) == ("web", "roster.csv", os.getpid())
+    assert record["total_detik"] == pytest.approx(sum(timer.timings.values()))
+    json.dumps(record)
+
+
+def test_trace_memory():
+    timer = StageTimer(trace_memory=True)
+    with timer.stage("alokasi"):
+        data = bytearray(8 * 1024 * 1024)
+    del data
+    assert timer.stages[0]["memori_puncak_mb"] >= 7.
+
+
+def test_simpan_menimpa_secara_atomik(tmp_path):
+    log = RunLog(str(tmp_path))
+    log.save(_record("a", total_detik=1.))
+    log.save(_record("a", total_detik=2.))
+    assert os.listdir(str(tmp_path)) == ["a.json"]
+    assert [record["total_detik"] for record in log.recent()] == [2.]
+
+
+def test_hanya_keep_run_terbaru(tmp_path):
+    log = RunLog(str(tmp_path), keep=3)
+    for age, run_id in enumerate("abcde"):
+        log.save(_record(run_id))
+        os.utime(os.path.join(str(tmp_path), f"{run_id}.json"), (age, age))
+    # Run yang disimpan ulang menjadi yang terbaru dan tidak terhapus.
+    log.save(_record("c", keterangan="ulang"))
+    assert sorted(os.listdir(str(tmp_path))) == ["c.json", "d.json", "e.json"]
+    assert [record["id"] for record in log.recent()] == ["c", "e", "d"]
+    assert [record["id"] for record in log.recent(2)] == ["c", "e"]
+    assert [record["id"] for record in json.loads(log.export_json(1))] == ["c"]
+
+
+def test_format_lain_dan_file_rusak_dilewati(tmp_path):
+    log = RunLog(str(tmp_path))
+    log.save(_record("lama", format=LOG_VERSION - 1))
+    log.save(_record("baru"))
+    with open(os.path.join(str(tmp_path), "rusak.json"), "w", encoding="utf-8") as f:
+        f.write("{")
+    assert [record["id"] for record in log.recent()] == ["baru"]
+    assert RunLog(str(tmp_path / "tidak-ada")).recent() == []
+
+
+def test_stage_rows():
+    records = [_record("r1", tahap=[{"tahap": "baca", "waktu_detik": 1.}, {"tahap": "praproses", "waktu_detik": 2.}]),
+               _record("r2", sumber="web", keterangan="x.xlsx", tahap=[{"tahap": "baca", "baris": 5}])]
+    rows = stage_rows(records)
+    assert [(row["run"], row["tahap"]) for row in rows] == [("r1", "baca"), ("r1", "praproses"), ("r2", "baca")]
+    assert rows[2] == {"run": "r2", "mulai": "2026-01-01 00:00:00", "sumber": "web", "keterangan": "x.xlsx",
+                       "tahap": "baca", "baris": 5}
+    assert stage_rows([]) == []
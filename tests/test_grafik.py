@@ -0,0 +1,74 @@
+import threading
+
+import pytest
+
+from klasterisasi.grafik import PROFILE_LABELS, ChartCache, profile_values, render_profile_png
+from klasterisasi.profil import build_cluster_profile
+from klasterisasi.skema import CATEGORICAL_COLS, NUMERIC_COLS
+
+PNG_SIGNATURE = b"\x89PNG\r\n\x1a\n"
+
+
+class _Renderer:
+    def __init__(self, size):
+        self.size, self.calls = size, []
+
+    def __call__(self, key):
+        def render():
+            self.calls.append(key)
+            return bytes([len(self.calls) % 256]) * self.size
+        return render
+
+
+def test_hit_dan_miss():
+    cache, render = ChartCache(max_bytes=1000), _Renderer(10)
+    first = cache.get_or_render(("v1", 0), render(("v1", 0)))
+    assert cache.get_or_render(("v1", 0), render(("v1", 0))) is first
+    cache.get_or_render(("v2", 0), render(("v2", 0)))
+    assert render.calls == [("v1", 0), ("v2", 0)]
+
+
+def test_lru_menggusur_yang_paling_lama_tidak_dipakai():
+    cache, render = ChartCache(max_bytes=30), _Renderer(10)
+    for key in "abc":
+        cache.get_or_render(key, render(key))
+    cache.get_or_render("a", render("a"))  # "a" menjadi yang terbaru.
+    cache.get_or_render("d", render("d"))  # Melebihi batas: "b" tergusur.
+    assert render.calls == ["a", "b", "c", "d"]
+    for key in "acd":
+        cache.get_or_render(key, render(key))
+    assert render.calls == ["a", "b", "c", "d"]
+    cache.get_or_render("b", render("b"))
+    assert render.calls[-1] == "b"
+    assert cache._total <= 30
+
+
+def test_entri_lebih_besar_dari_batas_tetap_dikembalikan():
+    cache, render = ChartCache(max_bytes=5), _Renderer(10)
+    assert len(cache.get_or_render("besar", render("besar"))) == 10
+    assert len(cache._entries) == 1
+
+
+def test_aman_dipakai_banyak_thread():
+    cache, render = ChartCache(max_bytes=25), _Renderer(10)
+    threads = [threading.Thread(target=lambda i=i: cache.get_or_render(i % 4, render(i % 4))) for i in range(40)]
+    for thread in threads:
+        thread.start()
+    for thread in threads:
+        thread.join()
+    assert cache._total == sum(len(data) for data in cache._entries.values()) <= 25
+
+
+@pytest.fixture(scope="module")
+def profil(fitur):
+    df_preprocessed = fitur[0]
+    return build_cluster_profile(df_preprocessed.assign(Klaster=[i % 2 for i in range(len(df_preprocessed))]), 2,
+                                 NUMERIC_COLS, CATEGORICAL_COLS)
+
+
+def test_png_profil(profil):
+    png = render_profile_png(profil, 1, dpi=50)
+    assert png.startswith(PNG_SIGNATURE)
+    values = profile_values(profil, 1)
+    assert len(values) == len(PROFILE_LABELS)
+    assert set(values[len(NUMERIC_COLS):]) <= {0, 1}
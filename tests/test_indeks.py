@@ -0,0 +1,51 @@
+import numpy as np
+import pandas as pd
+
+from klasterisasi.indeks import StudentIndex
+
+
+def _tabel(no):
+    return pd.DataFrame({
+        "No": no,
+        "Nama": ["Ani", "Budi", "Ani", "Citra", "Dewi", "Eka"],
+        "Kelas": pd.Categorical(["X", "XI", "X", "XII", "XI", "X"]),
+        # Index bukan 0..n-1: posisi baris tetap yang dipakai.
+        "Klaster": [1, 0, 1, 2, 1, 0],
+    }, index=[10, 11, 12, 13, 14, 15])
+
+
+def test_indeks_dengan_no_unik():
+    df = _tabel([101, 102, 103, 104, 105, 106])
+    index = StudentIndex(df)
+    assert index.keys == [101, 102, 103, 104, 105, 106]
+    assert index.position(104) == 3
+    assert index.label(102) == "Budi"
+    assert [index.label(101), index.label(103)] == ["Ani (No 101)", "Ani (No 103)"]
+
+    assert {k: v.tolist() for k, v in index.by_cluster.items()} == {0: [1, 5], 1: [0, 2, 4], 2: [3]}
+    assert {k: v.tolist() for k, v in index.by_class.items()} == {"X": [0, 2, 5], "XI": [1, 4], "XII": [3]}
+    np.testing.assert_array_equal(index.cluster_members(1, exclude=2), [0, 4])
+    np.testing.assert_array_equal(index.positions_for("Klaster", [2, 0]), [1, 3, 5])
+    np.testing.assert_array_equal(index.positions_for("Kelas", ["XII", "X", "XIII"]), [0, 2, 3, 5])
+    assert index.positions_for("Kelas", []).size == 0
+    assert index.cluster_members(7).size == 0
+
+    # Hasilnya sama dengan penyaringan dengan mask.
+    for values in ([0], [1, 2]):
+        expected = np.flatnonzero(df["Klaster"].isin(values))
+        np.testing.assert_array_equal(index.positions_for("Klaster", values), expected)
+
+
+def test_no_ganda_memakai_posisi_baris():
+    index = StudentIndex(_tabel([101, 102, 101, 104, None, 106]))
+    assert index.keys == list(range(6))
+    assert index.position(4) == 4
+    assert [index.label(0), index.label(2), index.label(1)] == ["Ani (No 0)", "Ani (No 2)", "Budi"]
+    np.testing.assert_array_equal(index.positions_for("Klaster", [1]), [0, 2, 4])
+
+
+def test_tanpa_kolom_klaster_dan_nama():
+    index = StudentIndex(pd.DataFrame({"No": [5, 6]}))
+    assert index.by_cluster == {} and index.by_class == {}
+    assert index.label(6) == "6"
+    assert index.positions_for("Klaster", [0]).size == 0
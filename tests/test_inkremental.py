@@ -0,0 +1,86 @@
+import numpy as np
+import pandas as pd
+import pytest
+from sklearn.metrics import adjusted_rand_score
+
+from klasterisasi import inkremental
+from klasterisasi.inkremental import ScalerStats, recluster_incremental
+from klasterisasi.pipeline import cluster_data, preprocess
+from klasterisasi.prediksi import transform_features
+from klasterisasi.sintetis import generate_roster
+from klasterisasi.skema import CATEGORICAL_COLS, NUMERIC_COLS, compact_students
+
+
+@pytest.fixture(scope="module")
+def previous(roster, fitur):
+    df_preprocessed, scaler, _, _, _ = fitur
+    df_clustered, model, _ = cluster_data(df_preprocessed, 4, n_init=3, random_state=0)
+    return {"df": roster.assign(Klaster=df_clustered["Klaster"]), "model": model, "scaler": scaler,
+            "stats": ScalerStats.from_frame(roster)}
+
+
+def _roster_baru(roster, n_changed, n_added, n_removed):
+    df = roster.iloc[n_removed:].copy()
+    changed = df.index[:n_changed]
+    df.loc[changed, "Rata Rata Nilai Akademik"] = df.loc[changed, "Rata Rata Nilai Akademik"] + 5.
+    added = generate_roster(n_added, random_state=11)
+    added["No"] = np.arange(n_added) + roster["No"].max() + 1
+    return compact_students(pd.concat([df, added], ignore_index=True))
+
+
+def _encode(hasil, df_new):
+    return transform_features(df_new, hasil["scaler"], hasil["model"], NUMERIC_COLS, CATEGORICAL_COLS)
+
+
+def test_tanpa_perubahan(roster, previous):
+    hasil = recluster_incremental(previous, roster)
+    np.testing.assert_array_equal(hasil["model"].labels_, previous["model"].labels_)
+    assert hasil["ringkasan"]["pindah_klaster"] == 0
+    assert hasil["ringkasan"]["mode"] == "inkremental"
+    assert hasil["model"].cost_ == pytest.approx(previous["model"].cost_, rel=1e-5)
+
+
+def test_perubahan_kecil_sama_dengan_penuh(roster, previous, monkeypatch):
+    df_new = _roster_baru(roster, n_changed=10, n_added=15, n_removed=5)
+    hasil = recluster_incremental(previous, df_new)
+    assert hasil["ringkasan"]["mode"] == "inkremental"
+    assert (hasil["ringkasan"]["tambah"], hasil["ringkasan"]["hapus"], hasil["ringkasan"]["ubah"]) == (15, 5, 10)
+
+    # Hasil konvergen: setiap siswa berada di centroid terdekatnya.
+    Xnum, Xcat = _encode(hasil, df_new)
+    np.testing.assert_array_equal(hasil["model"].predict_encoded(Xnum, Xcat), hasil["model"].labels_)
+
+    # Jalur penuh (semua siswa ditetapkan ulang dari centroid lama) memberi partisi yang setara.
+    monkeypatch.setattr(inkremental, "INCREMENTAL_MAX_CHANGE", -1.)
+    penuh = recluster_incremental(previous, df_new)
+    assert penuh["ringkasan"]["mode"] == "penuh"
+    assert (hasil["model"].labels_ == penuh["model"].labels_).mean() >= 0.99
+    assert hasil["model"].cost_ == pytest.approx(penuh["model"].cost_, rel=1e-3)
+
+    # Klasterisasi ulang dari awal menemukan kelompok yang sama (nomor klaster boleh berbeda).
+    df_preprocessed, _, _ = preprocess(df_new)
+    df_refit, _, _ = cluster_data(df_preprocessed, 4, n_init=3, random_state=0)
+    assert adjusted_rand_score(df_refit["Klaster"], hasil["model"].labels_) >= 0.95
+
+
+def test_perubahan_besar_memakai_jalur_penuh(roster, previous):
+    df_new = _roster_baru(roster, n_changed=200, n_added=50, n_removed=0)
+    hasil = recluster_incremental(previous, df_new)
+    assert hasil["ringkasan"]["mode"] == "penuh"
+    Xnum, Xcat = _encode(hasil, df_new)
+    np.testing.assert_array_equal(hasil["model"].predict_encoded(Xnum, Xcat), hasil["model"].labels_)
+
+
+def test_scaler_sama_dengan_fit_ulang(roster, previous):
+    df_new = _roster_baru(roster, n_changed=20, n_added=30, n_removed=10)
+    hasil = recluster_incremental(previous, df_new)
+    _, scaler, _ = preprocess(df_new)
+    np.testing.assert_allclose(hasil["scaler"].mean_, scaler.mean_, rtol=1e-10)
+    np.testing.assert_allclose(hasil["scaler"].scale_, scaler.scale_, rtol=1e-10)
+
+
+def test_no_ganda_ditolak(roster, previous):
+    df_new = roster.copy()
+    df_new.loc[1, "No"] = df_new.loc[0, "No"]
+    with pytest.raises(ValueError):
+        recluster_incremental(previous, df_new)
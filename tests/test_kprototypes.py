@@ -0,0 +1,81 @@
+import numpy as np
+import pytest
+
+from klasterisasi.kprototypes import KPrototypes, kprototypes_resume, kprototypes_single
+
+
+def _mixed_data(n_points=300, seed=0):
+    rng = np.random.RandomState(seed)
+    num = np.vstack([rng.normal(center, 1., size=(n_points // 3, 2)) for center in (0., 4., 8.)])
+    cat = rng.randint(0, 3, size=(n_points, 3)).astype(str)
+    X = np.empty((n_points, 5), dtype=object)
+    X[:, :2], X[:, 2:] = num, cat
+    return X
+
+
+@pytest.mark.parametrize("init", ["Huang", "Cao"])
+@pytest.mark.parametrize("seed", [0, 7])
+def test_sama_dengan_kmodes(init, seed):
+    kprototypes = pytest.importorskip("kmodes.kprototypes")
+    X = _mixed_data(seed=seed)
+    expected = kprototypes.KPrototypes(n_clusters=3, init=init, n_init=3, random_state=seed).fit(X, categorical=[2, 3, 4])
+    model = KPrototypes(n_clusters=3, init=init, n_init=3, random_state=seed).fit(X, categorical=[2, 3, 4])
+    np.testing.assert_array_equal(model.labels_, expected.labels_)
+    assert model.cost_ == expected.cost_
+    assert model.n_iter_ == expected.n_iter_
+    np.testing.assert_array_equal(model.predict(X, categorical=[2, 3, 4]), expected.predict(X, categorical=[2, 3, 4]))
+
+
+def test_verbose_tidak_mencetak(capsys):
+    X = _mixed_data()
+    model = KPrototypes(n_clusters=3, init="Huang", n_init=2, random_state=0, verbose=2).fit(X, categorical=[2, 3, 4])
+    assert capsys.readouterr().out == ""
+    np.testing.assert_array_equal(model.fit_predict(X, categorical=[2, 3, 4]), model.labels_)
+
+
+@pytest.mark.parametrize("backend", ["thread", "process"])
+def test_backend_paralel_sama_dengan_serial(fitur, backend):
+    _, _, Xnum, Xcat, enc_map = fitur
+    serial = KPrototypes(n_clusters=3, init="Huang", n_init=3, random_state=2).fit_encoded(Xnum, Xcat, enc_map)
+    calls = []
+    parallel = KPrototypes(n_clusters=3, init="Huang", n_init=3, random_state=2, backend=backend,
+                           n_jobs=2).fit_encoded(Xnum, Xcat, enc_map, progress=lambda *args: calls.append(args))
+    np.testing.assert_array_equal(serial.labels_, parallel.labels_)
+    assert serial.cost_ == parallel.cost_
+    assert [call[:2] for call in calls] == [(1, 3), (2, 3), (3, 3)]
+    assert min(call[2] for call in calls) == parallel.cost_
+
+
+def test_resume_dari_partisi_konvergen(fitur):
+    _, _, Xnum, Xcat, enc_map = fitur
+    model = KPrototypes(n_clusters=4, init="Huang", n_init=2, random_state=0).fit_encoded(Xnum, Xcat, enc_map)
+    (_, _), labels, cost, _, _ = kprototypes_resume(Xnum, Xcat, model.labels_, 4, 100, model.gamma)
+    np.testing.assert_array_equal(labels, model.labels_)
+    assert cost == pytest.approx(model.cost_)
+
+
+def test_resume_menolak_klaster_kosong(fitur):
+    _, _, Xnum, Xcat, _ = fitur
+    with pytest.raises(ValueError):
+        kprototypes_resume(Xnum, Xcat, np.zeros(len(Xnum), dtype=np.intp), 2, 10, 0.5)
+
+
+@pytest.mark.parametrize("n_clusters", [2, 4, 6])
+def test_batas_jarak_tidak_mengubah_hasil(fitur, n_clusters):
+    _, _, Xnum, Xcat, enc_map = fitur
+    results = [KPrototypes(n_clusters=n_clusters, init="Huang", n_init=3, random_state=1, accelerate=accelerate)
+               .fit_encoded(Xnum, Xcat, enc_map) for accelerate in (True, False)]
+    np.testing.assert_array_equal(results[0].labels_, results[1].labels_)
+    np.testing.assert_array_equal(results[0]._centroids_num, results[1]._centroids_num)
+    assert results[0].cost_ == results[1].cost_
+    assert results[0].epoch_costs_ == results[1].epoch_costs_
+
+
+def test_bitset_sama_dengan_kode(fitur):
+    # Flag 0/1 memakai bitset; dengan kategori ketiga yang tidak pernah muncul, jalur kode per atribut yang dipakai.
+    _, _, Xnum, Xcat, _ = fitur
+    args = (Xnum, Xcat, 4, 100, 0.5, "Huang", 5)
+    bits = kprototypes_single(*args, n_categories=2)
+    codes = kprototypes_single(*args, n_categories=3)
+    np.testing.assert_array_equal(bits[1], codes[1])
+    assert bits[2] == codes[2]
@@ -0,0 +1,54 @@
+import io
+import zipfile
+
+import pytest
+
+from klasterisasi.laporan import iter_records, pdf_file_name, write_profil_zip
+
+
+@pytest.fixture(scope="module")
+def siswa(roster):
+    # Nama ganda dan karakter yang tidak boleh ada di nama file.
+    names = ["Ani", "Budi/Santoso", "Ani", "Citra  Dewi", "Ani"] + [f"Siswa {i}" for i in range(18)]
+    return roster.head(len(names)).assign(Nama=names, Klaster=[i % 3 for i in range(len(names))])
+
+
+def test_nama_file_unik():
+    used = set()
+    names = [pdf_file_name(nama, used) for nama in ["Ani", "Ani", "a/b c", "Ani", "Ani_2"]]
+    assert names == ["Profil_Ani.pdf", "Profil_Ani_2.pdf", "Profil_a_b_c.pdf", "Profil_Ani_3.pdf",
+                     "Profil_Ani_2_2.pdf"]
+    assert pdf_file_name("Ani") == "Profil_Ani.pdf"
+
+
+def test_iter_records(siswa):
+    assert list(iter_records(siswa)) == siswa.to_dict("records")
+
+
+@pytest.mark.parametrize("backend", ["serial", "thread", "process"])
+def test_zip_satu_pdf_per_siswa_sesuai_urutan(siswa, backend):
+    calls = []
+    target = io.BytesIO()
+    n_written = write_profil_zip(target, iter_records(siswa), {0: "nol", 1: "satu"}, backend=backend, n_jobs=2,
+                                 chunk_size=4, progress=lambda *args: calls.append(args), total=len(siswa))
+    n = len(siswa)
+    assert n_written == n
+
+    with zipfile.ZipFile(io.BytesIO(target.getvalue())) as zf:
+        entries = zf.namelist()
+        assert all(zf.read(name).startswith(b"%PDF") for name in entries)
+    used = set()
+    assert entries == [pdf_file_name(nama, used) for nama in siswa["Nama"]]
+    assert entries[:5] == ["Profil_Ani.pdf", "Profil_Budi_Santoso.pdf", "Profil_Ani_2.pdf", "Profil_Citra_Dewi.pdf",
+                           "Profil_Ani_3.pdf"]
+    assert calls == [(done, n) for done in (4, 8, 12, 16, 20, 23)]
+
+
+def test_zip_dari_list_tanpa_total(tmp_path, siswa):
+    calls = []
+    path = tmp_path / "profil.zip"
+    records = siswa.head(3).to_dict("records")
+    assert write_profil_zip(str(path), records, {}, chunk_size=2, progress=lambda *args: calls.append(args)) == 3
+    assert calls[-1] == (3, 3)
+    with zipfile.ZipFile(path) as zf:
+        assert len(zf.namelist()) == 3
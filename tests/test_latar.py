@@ -0,0 +1,84 @@
+import threading
+import time
+
+import numpy as np
+import pytest
+
+from klasterisasi.latar import BERJALAN, DIBATALKAN, MENUNGGU, SELESAI, FitRunner
+from klasterisasi.paralel import FitCancelled
+from klasterisasi.pipeline import cluster_data
+
+
+def _wait(condition, timeout=60):
+    deadline = time.time() + timeout
+    while not condition():
+        if time.time() > deadline:
+            raise AssertionError("Kondisi tidak tercapai.")
+        time.sleep(0.01)
+
+
+@pytest.fixture
+def runner():
+    runner = FitRunner(max_workers=1, keep=2)
+    yield runner
+    runner._executor.shutdown(wait=True)
+
+
+def test_hasil_sama_dengan_cluster_data(runner, fitur):
+    df_preprocessed = fitur[0]
+    handle = runner.submit(df_preprocessed, 3, n_init=3, random_state=1, tol=0.01, move_tol=0.02, accelerate=False,
+                           context={"kunci": "x"})
+    assert runner.get(handle.id) is handle
+    df_clustered, model, _ = handle.result()
+    expected, expected_model, _ = cluster_data(df_preprocessed, 3, n_init=3, random_state=1, tol=0.01, move_tol=0.02)
+    np.testing.assert_array_equal(df_clustered["Klaster"], expected["Klaster"])
+    assert (model.tol, model.move_tol, model.accelerate) == (0.01, 0.02, False)
+    assert model.cost_ == expected_model.cost_
+
+    status = handle.status()
+    assert status["status"] == SELESAI and not status["membatalkan"]
+    assert status["restart_selesai"] == status["restart_total"] == 3
+    assert status["cost_terbaik"] == pytest.approx(model.cost_)
+    assert status["berjalan"] == [] and handle.context == {"kunci": "x"}
+
+
+def test_batal_saat_berjalan(runner, fitur):
+    handle = runner.submit(fitur[0], 4, n_init=500, random_state=0)
+    _wait(lambda: handle.status()["restart_selesai"] >= 1)
+    assert handle.status()["status"] == BERJALAN
+    handle.cancel()
+    with pytest.raises(FitCancelled):
+        handle.result()
+    status = handle.status()
+    assert status["status"] == DIBATALKAN
+    assert 1 <= status["restart_selesai"] < 500
+
+
+def test_batal_saat_menunggu(runner, fitur):
+    release = threading.Event()
+    runner._executor.submit(release.wait)
+    try:
+        handle = runner.submit(fitur[0], 3, n_init=2)
+        assert handle.status()["status"] == MENUNGGU
+        handle.cancel()
+        assert handle.done() and handle.status()["status"] == DIBATALKAN
+        with pytest.raises(FitCancelled):
+            handle.result()
+    finally:
+        release.set()
+
+
+def test_handle_selesai_dibuang_setelah_keep_fit(runner, fitur):
+    handles = []
+    for _ in range(4):
+        handles.append(runner.submit(fitur[0], 2, n_init=1))
+        handles[-1].result()
+    # keep=2: dua handle selesai yang paling lama dibuang saat handle keempat dikirim.
+    assert [runner.get(handle.id) for handle in handles] == [None, None, handles[2], handles[3]]
+
+    runner.discard(handles[3].id)
+    assert runner.get(handles[3].id) is None
+    running = runner.submit(fitur[0], 4, n_init=500)
+    runner.discard(running.id)
+    with pytest.raises(FitCancelled):
+        running.result()
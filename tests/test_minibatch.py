@@ -0,0 +1,64 @@
+import json
+
+import numpy as np
+import pandas as pd
+import pytest
+from sklearn.metrics import adjusted_rand_score
+
+from klasterisasi.minibatch import _batches, fit_minibatch, run_streaming_pipeline
+from klasterisasi.sintetis import generate_roster, write_roster
+from klasterisasi.unggah import iter_students
+
+
+@pytest.fixture(scope="module")
+def roster_terpisah(tmp_path_factory):
+    df, labels = generate_roster(3000, n_clusters=3, separation=3., flip=0.02, random_state=5, return_labels=True)
+    path = str(tmp_path_factory.mktemp("minibatch") / "roster.csv")
+    write_roster(df, path)
+    return path, labels
+
+
+def _fit(path, chunk_rows):
+    labels = []
+    result = fit_minibatch(lambda: iter_students(path, chunk_rows=chunk_rows), 3, batch_rows=256, sample_rows=500,
+                           n_init=3, random_state=0, on_labels=lambda chunk, chunk_labels: labels.append(chunk_labels))
+    return result, np.concatenate(labels)
+
+
+def test_kelompok_asal_ditemukan(roster_terpisah):
+    path, expected = roster_terpisah
+    result, labels = _fit(path, 1000)
+    assert adjusted_rand_score(expected, labels) >= 0.95
+    np.testing.assert_array_equal(result["model"].labels_, labels)
+    assert result["jumlah_per_klaster"].sum() == 3000
+    assert sorted(result["cluster_characteristics_map"]) == [0, 1, 2]
+
+
+@pytest.mark.parametrize("chunk_rows", [97, 256, 3000])
+def test_tidak_bergantung_ukuran_potongan(roster_terpisah, chunk_rows):
+    path, _ = roster_terpisah
+    reference, reference_labels = _fit(path, 1000)
+    result, labels = _fit(path, chunk_rows)
+    np.testing.assert_array_equal(labels, reference_labels)
+    np.testing.assert_allclose(result["model"]._centroids_num, reference["model"]._centroids_num, rtol=1e-9)
+    np.testing.assert_array_equal(result["model"]._centroids_cat, reference["model"]._centroids_cat)
+    assert result["model"].cost_ == pytest.approx(reference["model"].cost_, rel=1e-9)
+
+
+def test_batch_lintas_potongan():
+    chunks = [(np.arange(n, dtype=np.float64)[:, None], np.zeros((n, 1), dtype=np.uint8)) for n in (3, 5, 1, 4)]
+    sizes = [len(num) for num, _ in _batches(iter(chunks), 4)]
+    assert sizes == [4, 4, 4, 1]
+    assert [len(num) for num, _ in _batches(iter(chunks), 20)] == [13]
+
+
+def test_pipeline_streaming(tmp_path, roster_terpisah):
+    path, _ = roster_terpisah
+    summary = run_streaming_pipeline(path, 3, str(tmp_path), chunk_rows=700, batch_rows=256, n_init=2,
+                                     save_model=True)
+    df = pd.read_csv(summary["hasil"])
+    assert len(df) == summary["n_siswa"] == 3000
+    assert df["Klaster"].value_counts().sort_index().tolist() == list(summary["jumlah_per_klaster"].values())
+    with open(tmp_path / "roster_ringkasan.json", encoding="utf-8") as f:
+        assert json.load(f)["mode"] == "mini-batch"
+    assert summary["model"].endswith(".kproto")
@@ -0,0 +1,112 @@
+import os
+import threading
+import time
+
+import pytest
+
+from klasterisasi import penjadwal
+from klasterisasi.penjadwal import (BERJALAN, DIBATALKAN, GAGAL, MENUNGGU, NAME_FILE, SELESAI, JobScheduler,
+                                    _JobFiles, list_schools, run_school_job)
+from klasterisasi.publikasi import ResultStore
+
+
+@pytest.fixture
+def roster_csv(tmp_path, roster):
+    path = tmp_path / "roster.csv"
+    roster.to_csv(path, index=False)
+    return str(path)
+
+
+@pytest.fixture
+def scheduler(tmp_path):
+    scheduler = JobScheduler(str(tmp_path / "hasil"), max_workers=1, backend="thread")
+    yield scheduler
+    scheduler.shutdown(wait=True)
+
+
+def _wait(scheduler, job_id, timeout=60):
+    deadline = time.time() + timeout
+    while time.time() < deadline:
+        status = next(status for status in scheduler.jobs() if status["id"] == job_id)
+        if status["status"] in penjadwal.FINAL_STATES:
+            return status
+        time.sleep(0.05)
+    raise AssertionError(f"Pekerjaan {job_id} tidak selesai dalam {timeout} detik.")
+
+
+def test_siklus_pekerjaan(scheduler, roster_csv):
+    job_id = scheduler.submit("SMA Negeri 1", roster_csv, "roster.csv", 3, n_init=2, random_state=0)
+    status = _wait(scheduler, job_id)
+    assert status["status"] == SELESAI, status.get("pesan")
+    assert status["progres"] == 1. and status["n_siswa"] == 600
+
+    store_dir = os.path.join(scheduler.root, "sma-negeri-1")
+    assert ResultStore(store_dir).latest() == status["versi"]
+    with open(os.path.join(store_dir, NAME_FILE), encoding="utf-8") as f:
+        assert f.read() == "SMA Negeri 1"
+    assert list_schools(scheduler.root) == {store_dir: "SMA Negeri 1"}
+    assert scheduler.schools() == {"sma-negeri-1": "SMA Negeri 1"}
+    # Salinan roster dihapus setelah pekerjaan selesai.
+    assert os.listdir(scheduler.jobs_dir) == [f"{job_id}.json"]
+
+
+def test_batal_saat_menunggu(scheduler, roster_csv):
+    # Satu-satunya worker ditahan sehingga pekerjaan berikutnya tetap menunggu.
+    release = threading.Event()
+    scheduler._executor.submit(release.wait)
+    try:
+        job_id = scheduler.submit("SMA 2", roster_csv, "roster.csv", 3)
+        assert scheduler.jobs()[0]["status"] == MENUNGGU
+        assert scheduler.cancel(job_id)
+        assert scheduler.jobs()[0]["status"] == DIBATALKAN
+        assert not scheduler.cancel(job_id)
+    finally:
+        release.set()
+    assert not os.path.exists(os.path.join(scheduler.jobs_dir, f"{job_id}.csv"))
+
+
+def test_batal_saat_berjalan(tmp_path, roster_csv):
+    # Worker memeriksa penanda batal sebelum setiap tahap.
+    jobs_dir = str(tmp_path)
+    files = _JobFiles(jobs_dir, "a")
+    files.update(id="a", status=BERJALAN, antri=time.time())
+    open(files.cancel_path, "w").close()
+    status = run_school_job(jobs_dir, "a", roster_csv, str(tmp_path / "sekolah"), 3, 2, 0, 3)
+    assert status["status"] == DIBATALKAN
+    assert not os.path.exists(files.cancel_path) and not os.path.exists(roster_csv)
+
+
+def _orphan_candidate(jobs_dir, job_id, **fields):
+    status = dict(id=job_id, status=BERJALAN, antri=time.time(), penjadwal="lain", host=penjadwal.socket.gethostname(),
+                  penjadwal_pid=os.getpid(), detak=time.time())
+    status.update(fields)
+    _JobFiles(jobs_dir, job_id).update(**status)
+
+
+def test_pekerjaan_yatim(tmp_path):
+    root = str(tmp_path)
+    jobs_dir = os.path.join(root, penjadwal.JOBS_DIR)
+    os.makedirs(jobs_dir)
+    _orphan_candidate(jobs_dir, "hidup")
+    _orphan_candidate(jobs_dir, "pid-mati", penjadwal_pid=2 ** 22 + 1)
+    _orphan_candidate(jobs_dir, "detak-lama", detak=time.time() - 2 * penjadwal.HEARTBEAT_STALE)
+    _orphan_candidate(jobs_dir, "host-lain", host="mesin-lain", penjadwal_pid=2 ** 22 + 1)
+    _orphan_candidate(jobs_dir, "selesai", status=SELESAI, detak=0.)
+
+    scheduler = JobScheduler(root, max_workers=1, backend="thread")
+    try:
+        statuses = {status["id"]: status["status"] for status in scheduler.jobs()}
+    finally:
+        scheduler.shutdown()
+    # Di Windows pid tidak diperiksa; pekerjaan hanya yatim bila detaknya berhenti.
+    assert statuses == {"hidup": BERJALAN, "pid-mati": BERJALAN if os.name == "nt" else GAGAL, "detak-lama": GAGAL, "host-lain": BERJALAN,
+                        "selesai": SELESAI}
+
+
+def test_status_akhir_tidak_diturunkan(tmp_path):
+    files = _JobFiles(str(tmp_path), "a")
+    files.update(id="a", status=BERJALAN)
+    assert files.update(status=SELESAI)["status"] == SELESAI
+    assert files.update(status=GAGAL, pesan="terlambat")["status"] == SELESAI
+    assert files.update(when=lambda status: False, tahap="x").get("tahap") is None
+    assert not os.path.exists(files.lock_path)
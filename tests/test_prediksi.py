@@ -0,0 +1,48 @@
+import numpy as np
+import pytest
+
+from klasterisasi.pipeline import cluster_data
+from klasterisasi.prediksi import predict_students
+from klasterisasi.skema import CATEGORICAL_COLS, NUMERIC_COLS
+
+
+@pytest.fixture(scope="module")
+def model(fitur):
+    df_preprocessed, scaler, _, _, _ = fitur
+    _, model, _ = cluster_data(df_preprocessed, 4, n_init=2, random_state=0)
+    return model, scaler
+
+
+def test_data_latih_mendapat_label_model(roster, model):
+    kproto, scaler = model
+    predicted = predict_students(roster, scaler, kproto, NUMERIC_COLS, CATEGORICAL_COLS, {0: "nol"})
+    np.testing.assert_array_equal(predicted["Klaster"], kproto.labels_)
+    assert (predicted["Karakteristik Klaster"] == "nol").sum() == (kproto.labels_ == 0).sum()
+    assert set(predicted["Karakteristik Klaster"]) <= {"nol", "Deskripsi tidak ada."}
+    assert list(predicted.columns) == list(roster.columns) + ["Klaster", "Karakteristik Klaster"]
+
+
+def test_nilai_kosong_dan_kategori_baru(roster, model):
+    kproto, scaler = model
+    df_new = roster.head(5).copy()
+    df_new[NUMERIC_COLS[0]] = df_new[NUMERIC_COLS[0]].astype(object)
+    df_new.loc[0, NUMERIC_COLS[0]] = None
+    df_new.loc[1, NUMERIC_COLS[0]] = "bukan angka"
+    df_new[CATEGORICAL_COLS[0]] = df_new[CATEGORICAL_COLS[0]].astype(object)
+    df_new.loc[2, CATEGORICAL_COLS[0]] = "Ya"
+    df_new.loc[3, CATEGORICAL_COLS[1]] = None
+    # Kolom berspasi di header tetap dikenali.
+    df_new = df_new.rename(columns={NUMERIC_COLS[1]: f" {NUMERIC_COLS[1]} "})
+
+    predicted = predict_students(df_new, scaler, kproto, NUMERIC_COLS, CATEGORICAL_COLS)
+    assert len(predicted) == 5
+    assert predicted["Klaster"].between(0, 3).all()
+    # Baris tanpa perubahan tetap mendapat label yang sama dengan data latih.
+    assert predicted["Klaster"].iloc[4] == kproto.labels_[4]
+
+
+def test_tabel_kosong_dan_kolom_hilang(roster, model):
+    kproto, scaler = model
+    assert len(predict_students(roster.head(0), scaler, kproto, NUMERIC_COLS, CATEGORICAL_COLS)) == 0
+    with pytest.raises(ValueError, match=NUMERIC_COLS[1]):
+        predict_students(roster.drop(columns=NUMERIC_COLS[1]), scaler, kproto, NUMERIC_COLS, CATEGORICAL_COLS)
@@ -0,0 +1,62 @@
+import numpy as np
+import pytest
+
+from klasterisasi.pipeline import cluster_data, describe_cluster, generate_cluster_descriptions
+from klasterisasi.profil import build_cluster_profile, profile_summary
+from klasterisasi.skema import CATEGORICAL_COLS, NUMERIC_COLS
+
+
+@pytest.fixture(scope="module")
+def clustered(fitur):
+    df_clustered, _, _ = cluster_data(fitur[0], 4, n_init=2, random_state=0)
+    return df_clustered
+
+
+def _profil(df, n_clusters=4):
+    return build_cluster_profile(df, n_clusters, NUMERIC_COLS, CATEGORICAL_COLS)
+
+
+def test_sama_dengan_penyaringan_per_klaster(clustered):
+    profil = _profil(clustered)
+    for k in range(4):
+        # Cara lama: saring baris klaster k lalu hitung agregatnya.
+        members = clustered[clustered["Klaster"] == k]
+        assert profil["jumlah"][k] == len(members)
+        np.testing.assert_allclose(profil["rata_rata"].loc[k], members[NUMERIC_COLS].mean(), rtol=1e-6)
+        np.testing.assert_allclose(profil["statistik"]["std"].loc[k], members[NUMERIC_COLS].std(), rtol=1e-5)
+        np.testing.assert_allclose(profil["statistik"]["median"].loc[k], members[NUMERIC_COLS].median(), rtol=1e-6)
+        np.testing.assert_allclose(profil["statistik"]["max"].loc[k], members[NUMERIC_COLS].max())
+        modes = members[CATEGORICAL_COLS].mode().iloc[0]
+        for col in CATEGORICAL_COLS:
+            assert profil["modus"].loc[k, col] == modes[col]
+            counts = members[col].value_counts()
+            assert profil["frekuensi"][col].loc[k].to_dict() == {value: counts.get(value, 0)
+                                                                   for value in profil["frekuensi"][col].columns}
+        assert generate_cluster_descriptions(clustered, 4, profil)[k] == \
+            describe_cluster(members[NUMERIC_COLS].mean(), modes)
+
+
+def test_klaster_kosong(clustered):
+    df = clustered.assign(Klaster=clustered["Klaster"].where(clustered["Klaster"] != 2, 0))
+    profil = _profil(df)
+    assert profil["jumlah"][2] == 0
+    assert profil["rata_rata"].loc[2].isna().all()
+    assert profil["frekuensi"][CATEGORICAL_COLS[0]].loc[2].sum() == 0
+    # Modus klaster lain tetap bertipe flag, bukan float.
+    assert all(isinstance(value, (int, np.integer)) for value in profil["modus"].loc[0])
+    assert sorted(generate_cluster_descriptions(df, 4, profil)) == [0, 1, 3]
+    assert sorted(profile_summary(profil)) == ["0", "1", "3"]
+
+
+def test_versi_deterministik(clustered):
+    versi = _profil(clustered)["versi"]
+    assert _profil(clustered.copy())["versi"] == versi
+    moved = clustered.copy()
+    moved.loc[moved.index[0], "Klaster"] = (moved["Klaster"].iloc[0] + 1) % 4
+    assert _profil(moved)["versi"] != versi
+    changed = clustered.copy()
+    changed[NUMERIC_COLS[0]] = changed[NUMERIC_COLS[0]] + np.float32(0.5)
+    assert _profil(changed)["versi"] != versi
+    assert _profil(clustered, 5)["versi"] != versi
+    text_flags = clustered.assign(**{col: clustered[col].astype(str) for col in CATEGORICAL_COLS})
+    assert _profil(text_flags)["versi"] == _profil(text_flags.copy())["versi"]
@@ -0,0 +1,77 @@
+import os
+
+import numpy as np
+import pandas as pd
+import pytest
+
+from klasterisasi.publikasi import LATEST_FILE, ResultStore
+
+
+def _memory_mapped(array):
+    while array is not None:
+        if isinstance(array, np.memmap):
+            return True
+        array = getattr(array, "base", None)
+    return False
+
+
+@pytest.fixture(scope="module")
+def hasil(roster, fitur):
+    df_preprocessed = fitur[0]
+    labels = np.arange(len(roster)) % 3
+    return roster.assign(Klaster=labels), df_preprocessed.assign(Klaster=labels)
+
+
+def test_publikasi_dan_muat(tmp_path, hasil):
+    df_clustered, df_normalized = hasil
+    store = ResultStore(str(tmp_path))
+    assert store.latest() is None
+    versi = store.publish(df_clustered, df_normalized, 3, {0: "nol", 2: "dua"})
+    assert store.latest() == versi
+
+    loaded = store.load(versi)
+    assert loaded["versi"] == versi and loaded["n_clusters"] == 3
+    assert loaded["cluster_characteristics_map"] == {0: "nol", 2: "dua"}
+    pd.testing.assert_frame_equal(loaded["df_clustered"].copy(), df_clustered)
+    pd.testing.assert_frame_equal(loaded["df_normalized"].copy(), df_normalized)
+    # Kolom numerik dibaca lewat memory-map read-only, kolom teks/kategori dibangun ulang.
+    for col in ("No", "Rata Rata Nilai Akademik", "Klaster"):
+        values = loaded["df_clustered"][col].to_numpy()
+        assert _memory_mapped(values) and not values.flags.writeable
+    assert not _memory_mapped(loaded["df_clustered"]["Nama"].to_numpy())
+
+
+def test_lampiran(tmp_path, hasil):
+    store = ResultStore(str(tmp_path))
+    versi = store.publish(*hasil, 3, {})
+    assert store.load_attachment(versi, "stabilitas") is None
+    store.attach(versi, "stabilitas", {"n": 1}, {"nilai": np.arange(3.)})
+    store.attach(versi, "stabilitas", {"n": 2, "teks": "ä"}, {"nilai": np.arange(4.)})
+    meta, arrays = store.load_attachment(versi, "stabilitas")
+    assert meta == {"n": 2, "teks": "ä"}
+    np.testing.assert_array_equal(arrays["nilai"], np.arange(4.))
+    # Lampiran tidak mengubah tabel versinya.
+    pd.testing.assert_frame_equal(store.load(versi)["df_clustered"].copy(), hasil[0])
+    with pytest.raises(FileNotFoundError):
+        store.attach("tidak-ada", "stabilitas", {})
+
+
+def test_hanya_keep_versi_disimpan(tmp_path, hasil):
+    store = ResultStore(str(tmp_path), keep=2)
+    # Beberapa publikasi dalam detik yang sama tetap terurut sesuai waktu publikasinya.
+    versions = [store.publish(*hasil, 3, {}) for _ in range(5)]
+    assert store.latest() == versions[-1]
+    assert sorted(name for name in os.listdir(str(tmp_path)) if name != LATEST_FILE) == versions[-2:]
+    assert store.load(versions[-2])["versi"] == versions[-2]
+
+
+def test_format_lain_ditolak(tmp_path, hasil):
+    store = ResultStore(str(tmp_path))
+    versi = store.publish(*hasil, 3, {})
+    path = os.path.join(str(tmp_path), versi, "meta.json")
+    with open(path, encoding="utf-8") as f:
+        text = f.read()
+    with open(path, "w", encoding="utf-8") as f:
+        f.write(text.replace('"format": 1', '"format": 99'))
+    with pytest.raises(ValueError):
+        store.load(versi)
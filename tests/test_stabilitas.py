@@ -0,0 +1,94 @@
+import numpy as np
+import pytest
+
+from klasterisasi.stabilitas import (
+    contingency, cluster_stability, jaccard_per_cluster, resample_indices, stability_level, stability_table,
+)
+
+
+def _separated(n_per_cluster=100, n_clusters=3, seed=0):
+    # Klaster yang terpisah sempurna: pusat numerik berjauhan dan kategori yang khas per klaster.
+    rng = np.random.RandomState(seed)
+    truth = np.repeat(np.arange(n_clusters), n_per_cluster)
+    Xnum = (truth[:, None] * 20. + rng.normal(size=(len(truth), 2))).astype(np.float64)
+    Xcat = np.column_stack([truth, (truth + 1) % n_clusters]).astype(np.uint8)
+    enc_map = [{k: k for k in range(n_clusters)}] * 2
+    return Xnum, Xcat, enc_map, truth
+
+
+def test_resample_indices():
+    subsample = resample_indices(1000, 0, sample_frac=0.8)
+    assert len(subsample) == 800 and len(np.unique(subsample)) == 800
+    bootstrap = resample_indices(1000, 0, replace=True)
+    assert len(bootstrap) == 1000 and len(np.unique(bootstrap)) < 1000
+    for idx in (subsample, bootstrap):
+        assert np.all(np.diff(idx) >= 0) and idx.min() >= 0 and idx.max() < 1000
+    np.testing.assert_array_equal(resample_indices(1000, 5), resample_indices(1000, 5))
+
+
+def test_contingency_dan_jaccard():
+    ref = np.array([0, 0, 0, 1, 1, 2])
+    labels = np.array([1, 1, 0, 0, 0, 0])
+    table = contingency(ref, labels, 3, 2)
+    np.testing.assert_array_equal(table, [[1, 2], [2, 0], [1, 0]])
+    # Klaster 0: |C n D_1| / |C u D_1| = 2/3; klaster 1: 2/4; klaster 2: 1/4.
+    np.testing.assert_allclose(jaccard_per_cluster(table), [2 / 3, 0.5, 0.25])
+    # Menukar nomor klaster resampling tidak mengubah Jaccard.
+    np.testing.assert_allclose(jaccard_per_cluster(table[:, ::-1]), jaccard_per_cluster(table))
+    empty = jaccard_per_cluster(contingency(ref, labels, 4, 2))
+    assert np.isnan(empty[3]) and not np.isnan(empty[:3]).any()
+
+
+@pytest.mark.parametrize("replace", [False, True])
+def test_klaster_terpisah_stabil(replace):
+    Xnum, Xcat, enc_map, truth = _separated()
+    result = cluster_stability(Xnum, Xcat, enc_map, truth, 3, 0.5, n_boot=6, n_init=3, replace=replace,
+                               random_state=0)
+    assert result["n_boot"] == 6 and result["n_gagal"] == 0
+    assert result["metode"] == ("bootstrap" if replace else "subsampel")
+    assert result["jaccard"].shape == (6, 3)
+    np.testing.assert_allclose(result["jaccard_rata_rata"], 1., atol=1e-3)
+    coassign = result["ko_penugasan"]
+    assert coassign.dtype == np.float32 and coassign.shape == truth.shape
+    assert coassign.min() >= 0. and coassign.max() <= 1.
+    np.testing.assert_allclose(coassign, 1., atol=1e-3)
+    np.testing.assert_array_equal(result["ambigu"], 0.)
+
+
+def test_label_acuan_dipermutasi():
+    Xnum, Xcat, enc_map, truth = _separated(seed=1)
+    rng = np.random.RandomState(1)
+    noisy = truth.copy()
+    flip = rng.choice(len(truth), size=60, replace=False)
+    noisy[flip] = rng.randint(3, size=60)
+    perm = np.array([2, 0, 1])
+    kwargs = dict(n_boot=5, n_init=2, random_state=3)
+    base = cluster_stability(Xnum, Xcat, enc_map, noisy, 3, 0.5, **kwargs)
+    permuted = cluster_stability(Xnum, Xcat, enc_map, perm[noisy], 3, 0.5, **kwargs)
+    np.testing.assert_allclose(permuted["jaccard_rata_rata"][perm], base["jaccard_rata_rata"])
+    np.testing.assert_allclose(permuted["ko_penugasan"], base["ko_penugasan"])
+    assert base["ko_penugasan"].min() >= 0. and base["ko_penugasan"].max() <= 1.
+    assert base["jaccard_rata_rata"].max() < 1.
+
+
+def test_backend_sama_dengan_serial(fitur):
+    _, _, Xnum, Xcat, enc_map = fitur
+    ref = np.arange(len(Xnum)) % 3
+    calls = []
+    serial = cluster_stability(Xnum, Xcat, enc_map, ref, 3, 0.5, n_boot=4, random_state=2,
+                               progress=lambda done, total: calls.append((done, total)))
+    threaded = cluster_stability(Xnum, Xcat, enc_map, ref, 3, 0.5, n_boot=4, random_state=2, backend="thread",
+                                 n_jobs=2)
+    np.testing.assert_array_equal(serial["jaccard"], threaded["jaccard"])
+    np.testing.assert_array_equal(serial["ko_penugasan"], threaded["ko_penugasan"])
+    assert calls[-1] == (4, 4)
+
+
+def test_stability_table():
+    stabilitas = {"jaccard_rata_rata": np.array([0.9, 0.7, np.nan]), "jaccard_min": np.array([0.8, 0.5, np.nan]),
+                  "ambigu": np.array([0., 0.25, 0.])}
+    rows = stability_table(stabilitas)
+    assert [row["Klaster"] for row in rows] == [0, 1, 2]
+    assert [row["Status"] for row in rows] == ["Sangat stabil", "Lemah", "-"]
+    assert rows[1]["Siswa Ambigu"] == 0.25 and isinstance(rows[0]["Jaccard Rata-rata"], float)
+    assert stability_level(0.75) == "Stabil" and stability_level(0.1) == "Tidak stabil"
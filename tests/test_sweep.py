@@ -0,0 +1,43 @@
+import numpy as np
+import pytest
+
+from klasterisasi.kprototypes import KPrototypes
+from klasterisasi.sweep import simplified_silhouette, sweep_k
+
+
+@pytest.fixture(scope="module")
+def sweep(fitur):
+    _, _, Xnum, Xcat, enc_map = fitur
+    calls = []
+    rows, models = sweep_k(Xnum, Xcat, enc_map, [4, 2, 3, 3, 5], n_init=3, random_state=4,
+                           progress=lambda *args: calls.append(args))
+    return rows, models, calls
+
+
+def test_satu_hasil_per_k(sweep):
+    rows, models, calls = sweep
+    assert [row["K"] for row in rows] == [2, 3, 4, 5]
+    assert sorted(models) == [2, 3, 4, 5]
+    for row in rows:
+        model = models[row["K"]]
+        assert row["cost"] == model.cost_
+        assert np.bincount(model.labels_, minlength=row["K"]).min() > 0
+        assert -1. <= row["silhouette"] <= 1.
+    # 4 K x 3 restart + 3 warm start.
+    assert calls[-1][:2] == (15, 15)
+
+
+def test_cost_tidak_lebih_buruk_dari_fit_tunggal(fitur, sweep):
+    _, _, Xnum, Xcat, enc_map = fitur
+    rows, models, _ = sweep
+    for row in rows:
+        single = KPrototypes(n_clusters=row["K"], init="Huang", n_init=3, random_state=4,
+                             gamma=models[row["K"]].gamma).fit_encoded(Xnum, Xcat, enc_map)
+        assert row["cost"] <= single.cost_
+        if not row["warm_start_terpilih"]:
+            np.testing.assert_array_equal(models[row["K"]].labels_, single.labels_)
+
+
+def test_silhouette_klaster_tunggal_nan(fitur):
+    _, _, Xnum, Xcat, _ = fitur
+    assert np.isnan(simplified_silhouette(Xnum, Xcat, Xnum[:1], Xcat[:1], 0.5, np.zeros(len(Xnum))))
@@ -0,0 +1,58 @@
+import datetime
+import io
+
+import pandas as pd
+import pytest
+from openpyxl import Workbook
+
+from klasterisasi.skema import INPUT_COLS
+from klasterisasi.unggah import iter_students, read_students, read_xlsx
+
+COLUMNS = ["No", "Nama", "Tanggal", "Aktif", "Nilai"]
+
+
+def _workbook_bytes(rows):
+    wb = Workbook()
+    for row in rows:
+        wb.active.append(row)
+    buffer = io.BytesIO()
+    wb.save(buffer)
+    return buffer.getvalue()
+
+
+def _read_excel(data, columns):
+    wanted = set(columns)
+    df = pd.read_excel(io.BytesIO(data), usecols=lambda c: str(c).strip() in wanted)
+    df.columns = [str(c).strip() for c in df.columns]
+    return df
+
+
+@pytest.mark.parametrize("rows", [
+    # Tanggal, boolean, sel kosong, baris kosong di tengah dan di akhir, header berspasi, kolom yang tidak diminta.
+    [["No", "Nama ", "Lain", "Tanggal", "Aktif", "Nilai"],
+     [1, "Ani", "x", datetime.datetime(2024, 1, 5), True, 80.5],
+     [2, "Budi", None, datetime.datetime(2024, 2, 6), False, 90.0],
+     [],
+     [None, None, "hanya-lain"],
+     [4, None, None, None, None, 70],
+     [],
+     []],
+    # Angka bulat tersimpan sebagai float dan teks berupa angka.
+    [["Nilai", "No", "Nama"], [75.0, 1, "001"], [80.25, 2, "Citra"], [None, 3, ""]],
+    # Hanya header.
+    [["No", "Nama", "Nilai"]],
+])
+def test_read_xlsx_sama_dengan_read_excel(rows):
+    data = _workbook_bytes(rows)
+    pd.testing.assert_frame_equal(read_xlsx(io.BytesIO(data), COLUMNS), _read_excel(data, COLUMNS))
+
+
+def test_roster_xlsx(tmp_path, roster):
+    path = tmp_path / "roster.xlsx"
+    roster.to_excel(path, index=False)
+    expected = _read_excel(path.read_bytes(), INPUT_COLS)
+    pd.testing.assert_frame_equal(read_students(str(path)), expected)
+
+    chunks = list(iter_students(str(path), chunk_rows=128))
+    assert [len(chunk) for chunk in chunks] == [128] * 4 + [88]
+    pd.testing.assert_frame_equal(pd.concat(chunks), expected)